@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Index of every Tailwind class token used in a className under src/.
+
+Each className attribute in the TSX files is tokenized. That covers
+"...", '...', and {...} expressions, where every string literal and every
+static part of a template literal is read. Comments and ${...}
+interpolations are skipped. Every token is stored with its file, line,
+column and offset.
+
+The index is kept in .classname-index.json and only re-reads files whose
+mtime or size changed. It maps each token to its locations, so queries and
+rewrites are lookups instead of text scans. A rewrite replaces exact tokens
+at their recorded offsets, so gap-4 never touches gap-40, md:gap-4, prose
+or comments.
+
+Usage:
+    python classname_index.py build
+    python classname_index.py query px-4 py-2 bg-slate-800
+    python classname_index.py rewrite gap-4 gap-2 [--dry-run]
+"""
+
+import argparse
+import bisect
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX_PATH = os.path.join(REPO_ROOT, ".classname-index.json")
+SOURCE_PATTERN = os.path.join("src", "**", "*.tsx")
+
+ATTRIBUTE = re.compile(r"\bclassName=")
+TOKEN = re.compile(r"\S+")
+
+
+def _skip_string(content, i, quote):
+    """Index just past the closing quote of the literal opening at i"""
+    i += 1
+    while i < len(content) and content[i] != quote:
+        i += 2 if content[i] == "\\" else 1
+    return i + 1
+
+
+def _template_spans(content, i, spans):
+    """Collect the static parts of the template literal opening at i; returns the index past it"""
+    i += 1
+    start = i
+    while i < len(content) and content[i] != "`":
+        if content[i] == "\\":
+            i += 2
+        elif content.startswith("${", i):
+            spans.append((start, i))
+            i = _expression_spans(content, i + 2, "}", spans)
+            start = i
+        else:
+            i += 1
+    spans.append((start, i))
+    return i + 1
+
+
+def _expression_spans(content, i, closing, spans):
+    """Collect string spans of a JS expression up to its unmatched closing bracket; returns the index past it"""
+    depth = 0
+    while i < len(content):
+        ch = content[i]
+        if ch in "\"'":
+            end = _skip_string(content, i, ch)
+            spans.append((i + 1, end - 1))
+            i = end
+        elif ch == "`":
+            i = _template_spans(content, i, spans)
+        elif content.startswith("//", i):
+            i = content.find("\n", i)
+            i = len(content) if i == -1 else i
+        elif content.startswith("/*", i):
+            i = content.find("*/", i)
+            i = len(content) if i == -1 else i + 2
+        elif ch in "{([":
+            depth += 1
+            i += 1
+        elif ch in "})]":
+            if depth == 0 and ch == closing:
+                return i + 1
+            depth -= 1
+            i += 1
+        else:
+            i += 1
+    return i
+
+
+def class_attributes(content):
+    """Yield (attribute offset, [(token, offset), ...]) for every className in a TSX source"""
+    for match in ATTRIBUTE.finditer(content):
+        i = match.end()
+        spans = []
+        if i < len(content) and content[i] in "\"'":
+            end = _skip_string(content, i, content[i])
+            spans.append((i + 1, end - 1))
+        elif content.startswith("{", i):
+            _expression_spans(content, i + 1, "}", spans)
+        tokens = [(token.group(), token.start())
+                  for start, end in spans for token in TOKEN.finditer(content, start, end)]
+        yield match.start(), tokens
+
+
+def index_file(path):
+    with open(path) as f:
+        content = f.read()
+    line_starts = [0] + [m.end() for m in re.finditer("\n", content)]
+
+    def position(offset):
+        line = bisect.bisect_right(line_starts, offset)
+        return line, offset - line_starts[line - 1] + 1
+
+    attributes = []
+    for offset, tokens in class_attributes(content):
+        attributes.append({
+            "position": position(offset),
+            "tokens": [[token, token_offset, *position(token_offset)] for token, token_offset in tokens],
+        })
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "attributes": attributes}
+
+
+class ClassIndex:
+    def __init__(self, files=None):
+        self.files = files or {}
+        self.tokens = {}
+        self._invert()
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f)["files"])
+
+    def save(self, path=INDEX_PATH):
+        with open(path, "w") as f:
+            json.dump({"version": 1, "files": self.files, "tokens": self.tokens}, f, separators=(",", ":"))
+
+    def update(self, pattern=SOURCE_PATTERN):
+        """Re-index new and modified files, drop deleted ones; returns the files re-read"""
+        paths = {os.path.relpath(p, REPO_ROOT): p
+                 for p in glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True)}
+        stale = []
+        for relative, path in paths.items():
+            entry = self.files.get(relative)
+            stat = os.stat(path)
+            if entry is None or (entry["mtime_ns"], entry["size"]) != (stat.st_mtime_ns, stat.st_size):
+                self.files[relative] = index_file(path)
+                stale.append(relative)
+        for relative in set(self.files) - set(paths):
+            del self.files[relative]
+        self._invert()
+        return stale
+
+    def _invert(self):
+        """token -> [[file, line, column, offset], ...]"""
+        self.tokens = {}
+        for relative, entry in sorted(self.files.items()):
+            for attribute in entry["attributes"]:
+                for token, offset, line, column in attribute["tokens"]:
+                    self.tokens.setdefault(token, []).append([relative, line, column, offset])
+
+    def query(self, tokens):
+        """className attributes that use every one of tokens, as (file, line, column, all tokens)"""
+        wanted = set(tokens)
+        # Only files that contain every token can have a matching attribute
+        candidates = set.intersection(*({location[0] for location in self.tokens.get(token, [])}
+                                        for token in wanted))
+        for relative in sorted(candidates):
+            for attribute in self.files[relative]["attributes"]:
+                used = [token for token, *_ in attribute["tokens"]]
+                if wanted <= set(used):
+                    yield relative, *attribute["position"], used
+
+    def rewrite(self, old, new, dry_run=False):
+        """Replace token old with new at its indexed positions; returns {file: replacements}"""
+        by_file = {}
+        for relative, _, _, offset in self.tokens.get(old, []):
+            by_file.setdefault(relative, []).append(offset)
+
+        changed = {}
+        for relative, offsets in sorted(by_file.items()):
+            path = os.path.join(REPO_ROOT, relative)
+            with open(path) as f:
+                content = f.read()
+            # Right to left, so earlier offsets stay valid
+            for offset in sorted(offsets, reverse=True):
+                if content[offset:offset + len(old)] != old:
+                    raise RuntimeError(f"{relative} changed since it was indexed; run build first")
+                content = content[:offset] + new + content[offset + len(old):]
+            changed[relative] = len(offsets)
+            if not dry_run:
+                with open(path, "w") as f:
+                    f.write(content)
+        if not dry_run:
+            self.update()
+        return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="className token index for src/**/*.tsx")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="index new and modified files")
+    query_parser = sub.add_parser("query", help="find className attributes using all the given tokens")
+    query_parser.add_argument("tokens", nargs="+")
+    rewrite_parser = sub.add_parser("rewrite", help="replace one class token at its exact positions")
+    rewrite_parser.add_argument("old")
+    rewrite_parser.add_argument("new")
+    rewrite_parser.add_argument("--dry-run", action="store_true", help="list the files that would change")
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    index = ClassIndex.load()
+    stale = index.update()
+
+    if args.command == "build":
+        print(f"Indexed {len(index.tokens)} distinct tokens in {len(index.files)} files "
+              f"({len(stale)} re-read) in {time.monotonic() - started:.2f}s")
+    elif args.command == "query":
+        matches = list(index.query(args.tokens))
+        for relative, line, column, used in matches:
+            print(f"{relative}:{line}:{column}: {' '.join(used)}")
+        print(f"{len(matches)} className attributes", file=sys.stderr)
+    else:
+        changed = index.rewrite(args.old, args.new, dry_run=args.dry_run)
+        for relative, count in changed.items():
+            print(f"{relative}: {count} x {args.old} -> {args.new}")
+        verb = "Would replace" if args.dry_run else "Replaced"
+        print(f"{verb} {sum(changed.values())} tokens in {len(changed)} files", file=sys.stderr)
+
+    index.save()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Dead-CSS report for the stylesheets and style modules under src/.
+
+The set of used class tokens is extracted the way Tailwind's content scanner
+does it: every quote-, space- or bracket-delimited candidate in src/**/*.{ts,tsx}.
+This set is broader than the className index in classname_index.py, because
+cn()/cva() strings and querySelector('.x') calls count as uses too. Against
+that set the script checks:
+
+  * stylesheets: every style rule whose selectors all need a class that is
+    never used. Selectors that are dead inside a live selector list are
+    reported separately. Classes built at runtime from a `prefix-${...}`
+    template count as used when they start with that prefix.
+  * custom properties: --vars declared in the stylesheets that no var(...)
+    in the CSS, tailwind.config.ts or src/ reads.
+  * style modules: exports of neo-styles.ts and neo-pop-styles.ts, and keys
+    inside their objects, that nothing outside their own dead entries uses.
+    These are inline-style constants, so they cost JS bundle bytes, not CSS.
+
+When a production build exists (.next/static/css/*.css), the bundle is what
+gets checked, so the byte counts are what removing the rules saves from the
+shipped stylesheet, raw and gzipped. Without a build, src/**/*.css is checked.
+
+Usage:
+    python dead_css.py
+    python dead_css.py --css 'src/**/*.css' --json dead-css.json
+    python dead_css.py --max-dead-bytes 2048    # exit 1 above the budget
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_PATTERN = os.path.join(".next", "static", "css", "*.css")
+SOURCE_CSS_PATTERN = os.path.join("src", "**", "*.css")
+SOURCE_PATTERNS = [os.path.join("src", "**", "*.ts"), os.path.join("src", "**", "*.tsx")]
+STYLE_MODULES = [os.path.join("src", "lib", "neo-styles.ts"), os.path.join("src", "lib", "neo-pop-styles.ts")]
+TAILWIND_CONFIG = "tailwind.config.ts"
+
+# Tailwind-style candidates: anything between quotes, backticks, whitespace, <> or {}
+CANDIDATE = re.compile(r"[^\s\"'`<>{}]+")
+DYNAMIC_PREFIX = re.compile(r"([A-Za-z][\w-]*-)\$\{")
+APPLY = re.compile(r"@apply\s+([^;}]+)")
+
+COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CLASS_SELECTOR = re.compile(r"\.((?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)")
+CSS_ESCAPE = re.compile(r"\\([0-9a-fA-F]{1,6}\s?|.)")
+# Classes under :not() don't have to be present for the selector to match
+NEGATION = re.compile(r":not\([^()]*\)")
+DECLARATION = re.compile(r"(--[\w-]+)\s*:[^;{}]*;?")
+VAR_USE = re.compile(r"var\(\s*(--[\w-]+)")
+GROUPING_AT_RULES = ("media", "supports", "layer", "container", "document")
+
+JS_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+IMPORT = re.compile(r"^\s*import\b[^;]*?\bfrom\s*['\"][^'\"]+['\"];?", re.M | re.S)
+IMPORT_NAMES = re.compile(r"import\s*(?:type\s*)?\{([^}]*)\}\s*from\s*['\"]([^'\"]+)['\"]")
+EXPORT = re.compile(r"^export const ([A-Za-z_$][\w$]*)\s*(?::[^=\n]+)?=\s*", re.M)
+OBJECT_KEY = re.compile(r"""(?:'([^']*)'|"([^"]*)"|([A-Za-z_$][\w$]*))\s*:""")
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def expand(patterns):
+    paths = set()
+    for pattern in patterns:
+        paths.update(glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True))
+    return sorted(paths)
+
+
+def _blank(match):
+    """Same-length whitespace, so offsets into the text stay valid"""
+    return re.sub(r"[^\n]", " ", match.group())
+
+
+# --- used tokens -------------------------------------------------------------
+
+def used_tokens(sources, stylesheets):
+    """(class tokens, dynamic class prefixes) referenced by the sources"""
+    tokens, prefixes = set(), set()
+    for text in sources.values():
+        for candidate in CANDIDATE.findall(text):
+            tokens.add(candidate)
+            # '.rounds-row.odd' in a querySelector
+            tokens.update(candidate.split("."))
+        prefixes.update(DYNAMIC_PREFIX.findall(text))
+    for text in stylesheets.values():
+        for applied in APPLY.findall(text):
+            tokens.update(applied.split())
+    return tokens, prefixes
+
+
+def is_used(name, tokens, prefixes):
+    return name in tokens or any(name.startswith(prefix) for prefix in prefixes)
+
+
+# --- stylesheets -------------------------------------------------------------
+
+def _unescape(name):
+    def char(match):
+        escaped = match.group(1)
+        if re.fullmatch(r"[0-9a-fA-F]{1,6}\s?", escaped):
+            return chr(int(escaped.strip(), 16))
+        return escaped
+    return CSS_ESCAPE.sub(char, name)
+
+
+def _skip_css_string(text, i):
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == "\\" else 1
+    return i + 1
+
+
+def _matching_brace(text, i):
+    """Index of the } closing the { at i"""
+    depth = 0
+    while i < len(text):
+        ch = text[i]
+        if ch in "\"'":
+            i = _skip_css_string(text, i)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text) - 1
+
+
+def _split_selectors(text, start, end):
+    """(selector, start, end) for each top-level comma-separated selector"""
+    selectors, depth, piece = [], 0, start
+    for i in range(start, end + 1):
+        ch = text[i] if i < end else ","
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            raw = text[piece:i]
+            stripped = raw.strip()
+            if stripped:
+                lead = len(raw) - len(raw.lstrip())
+                selectors.append((stripped, piece + lead, piece + lead + len(stripped)))
+            piece = i + 1
+    return selectors
+
+
+def css_rules(text, start=0, end=None, context=()):
+    """Yield each style rule as a dict with its selectors and offsets; text must be comment-free"""
+    end = len(text) if end is None else end
+    i = start
+    while i < end:
+        brace = text.find("{", i, end)
+        if brace == -1:
+            return
+        semicolon = text.find(";", i, brace)
+        if semicolon != -1 and text[i:semicolon].strip().startswith("@"):
+            # @import, @tailwind, @charset ...
+            i = semicolon + 1
+            continue
+        close = _matching_brace(text, brace)
+        prelude = text[i:brace]
+        head = prelude.strip()
+        rule_start = i + len(prelude) - len(prelude.lstrip())
+        if head.startswith("@"):
+            name = re.match(r"@([\w-]+)", head).group(1)
+            if name in GROUPING_AT_RULES:
+                yield from css_rules(text, brace + 1, close, context + (head,))
+        elif head:
+            yield {
+                "selectors": _split_selectors(text, rule_start, rule_start + len(head)),
+                "start": rule_start,
+                "end": close + 1,
+                "body": (brace + 1, close),
+                "context": context,
+            }
+        i = close + 1
+
+
+def selector_classes(selector):
+    return {_unescape(name) for name in CLASS_SELECTOR.findall(NEGATION.sub("", selector))}
+
+
+def analyze_stylesheet(text, tokens, prefixes):
+    """Dead rules and dead selectors of one stylesheet, with removal spans"""
+    text = COMMENT.sub(_blank, text)
+    dead_rules, dead_selectors, declarations, spans = [], [], [], []
+    for rule in css_rules(text):
+        verdicts = []
+        for selector, start, end in rule["selectors"]:
+            missing = sorted(name for name in selector_classes(selector) if not is_used(name, tokens, prefixes))
+            verdicts.append((selector, start, end, missing))
+        dead = [v for v in verdicts if v[3]]
+        if dead and len(dead) == len(verdicts):
+            dead_rules.append({
+                "selector": ", ".join(v[0] for v in verdicts),
+                "unused_classes": sorted({name for v in dead for name in v[3]}),
+                "context": list(rule["context"]),
+                "bytes": rule["end"] - rule["start"],
+            })
+            spans.append((rule["start"], rule["end"]))
+            continue
+        for selector, start, end, missing in dead:
+            dead_selectors.append({"selector": selector, "unused_classes": missing,
+                                   "context": list(rule["context"]), "bytes": end - start + 1})
+            spans.append((start, end + 1))
+        body_start, body_end = rule["body"]
+        for match in DECLARATION.finditer(text, body_start, body_end):
+            declarations.append((match.group(1), match.start(), match.end()))
+    return text, dead_rules, dead_selectors, declarations, spans
+
+
+def without_spans(text, spans):
+    """text with the (possibly nested) spans cut out"""
+    kept, position = [], 0
+    for start, end in sorted(spans):
+        if start < position:
+            continue
+        kept.append(text[position:start])
+        position = end
+    kept.append(text[position:])
+    return "".join(kept)
+
+
+def gzip_size(text):
+    return len(zlib.compress(text.encode("utf-8"), 9))
+
+
+# --- style modules -----------------------------------------------------------
+
+def _skip_js_string(text, i):
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote:
+        i += 2 if text[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_value(text, i):
+    """Index of the top-level , or } ending the object value starting at i"""
+    depth = 0
+    while i < len(text):
+        ch = text[i]
+        if ch in "\"'`":
+            i = _skip_js_string(text, i)
+            continue
+        if ch in "{([":
+            depth += 1
+        elif ch in "})]":
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == "," and depth == 0:
+            return i
+        i += 1
+    return i
+
+
+def _object_entries(text, i, path, entries):
+    """Collect (path, start, end) for the keys of the object whose { is just before i"""
+    while i < len(text):
+        while i < len(text) and text[i] in " \t\r\n,":
+            i += 1
+        if i >= len(text) or text[i] == "}":
+            return i + 1
+        key = OBJECT_KEY.match(text, i)
+        if not key:
+            # spread or computed key: not tracked
+            i = _skip_value(text, i)
+            continue
+        name = next(group for group in key.groups() if group is not None)
+        start, i = i, key.end()
+        while text[i] in " \t\r\n":
+            i += 1
+        if text[i] == "{":
+            i = _object_entries(text, i + 1, path + (name,), entries)
+        else:
+            i = _skip_value(text, i)
+        entries.append((path + (name,), start, i))
+    return i
+
+
+def module_entries(relative, text):
+    """(path, file, start, end) for each export and each key nested in an exported object"""
+    code = JS_COMMENT.sub(_blank, text)
+    entries = []
+    for match in EXPORT.finditer(code):
+        name, i = match.group(1), match.end()
+        nested = []
+        if code.startswith("{", i):
+            i = _object_entries(code, i + 1, (name,), nested)
+        # through the statement's end: `as const;` or the string constant's line
+        end = code.find("\n", i)
+        entries.append(((name,), relative, match.start(), len(code) if end == -1 else end))
+        entries.extend((path, relative, start, end) for path, start, end in nested)
+    return entries
+
+
+def _bindings(relative, text, exports):
+    """local name -> exported name for the style-module exports visible in one file"""
+    if relative in exports:
+        return {name: name for name in exports[relative]}
+    stems = {os.path.splitext(os.path.basename(module))[0]: module for module in exports}
+    bindings = {}
+    for specifiers, source in IMPORT_NAMES.findall(text):
+        module = stems.get(os.path.basename(source))
+        if module is None:
+            continue
+        for specifier in specifiers.split(","):
+            parts = specifier.replace("type ", "").split(" as ")
+            name = parts[0].strip()
+            if name in exports[module]:
+                bindings[parts[-1].strip()] = name
+    return bindings
+
+
+def reference_chains(sources, exports):
+    """(file, offset, (name, key, ...)) for each property chain on an imported style-module export"""
+    chains = []
+    for relative, text in sources.items():
+        bindings = _bindings(relative, text, exports)
+        if not bindings:
+            continue
+        # Only files that import a name can use it; a local const of the same name is not a use
+        reference = re.compile(r"(?<![\w$.])(" + "|".join(map(re.escape, bindings))
+                               + r")(?![\w$])((?:\??\.[A-Za-z_$][\w$]*)*)")
+        code = IMPORT.sub(_blank, JS_COMMENT.sub(_blank, text))
+        code = EXPORT.sub(_blank, code)
+        for match in reference.finditer(code):
+            keys = tuple(key.lstrip("?.") for key in re.findall(r"\??\.[A-Za-z_$][\w$]*", match.group(2)))
+            chains.append((relative, match.start(), (bindings[match.group(1)],) + keys))
+    return chains
+
+
+def _touches(path, chain):
+    """A chain uses an entry when one is a prefix of the other (NEO_POP.colors uses every color)"""
+    size = min(len(path), len(chain))
+    return path[:size] == chain[:size]
+
+
+def dead_module_entries(sources, module_paths):
+    entries = []
+    for relative in module_paths:
+        entries.extend(module_entries(relative, sources[relative]))
+    exports = {}
+    for path, relative, *_ in entries:
+        if len(path) == 1:
+            exports.setdefault(relative, set()).add(path[0])
+    if not exports:
+        return []
+    chains = reference_chains(sources, exports)
+
+    # Uses from inside dead entries don't keep anything alive; repeat until stable
+    dead = set()
+    while True:
+        live_chains = [chain for relative, offset, chain in chains
+                       if not any(relative == f and start <= offset < end for _, f, start, end in dead)]
+        now_dead = {entry for entry in entries if not any(_touches(entry[0], chain) for chain in live_chains)}
+        if now_dead == dead:
+            break
+        dead = now_dead
+
+    # Report a dead object once rather than every key inside it
+    report = []
+    for path, relative, start, end in sorted(dead, key=lambda entry: (entry[1], entry[2])):
+        if any(other[0] == path[:len(other[0])] and len(other[0]) < len(path) for other in dead):
+            continue
+        report.append({"name": ".".join(path), "file": relative, "bytes": end - start})
+    return report
+
+
+# --- report ------------------------------------------------------------------
+
+def analyze(css_patterns=None):
+    started = time.monotonic()
+    bundle = expand([BUNDLE_PATTERN])
+    css_paths = expand(css_patterns) if css_patterns else bundle or expand([SOURCE_CSS_PATTERN])
+
+    sources = {os.path.relpath(path, REPO_ROOT): read(path) for path in expand(SOURCE_PATTERNS)}
+    stylesheets = {os.path.relpath(path, REPO_ROOT): read(path) for path in css_paths}
+    tokens, prefixes = used_tokens(sources, stylesheets)
+
+    config_path = os.path.join(REPO_ROOT, TAILWIND_CONFIG)
+    var_uses = set()
+    for text in [*sources.values(), *stylesheets.values()] + ([read(config_path)] if os.path.exists(config_path) else []):
+        var_uses.update(VAR_USE.findall(text))
+
+    report = {"source": "bundle" if css_paths == bundle and bundle else "source",
+              "stylesheets": [], "style_modules": []}
+    for relative, raw in stylesheets.items():
+        text, dead_rules, dead_selectors, declarations, spans = analyze_stylesheet(raw, tokens, prefixes)
+        dead_properties = {}
+        for name, start, end in declarations:
+            if name not in var_uses:
+                dead_properties[name] = dead_properties.get(name, 0) + end - start
+                spans.append((start, end))
+        trimmed = without_spans(text, spans)
+        report["stylesheets"].append({
+            "file": relative,
+            "bytes": len(raw),
+            "dead_rules": dead_rules,
+            "dead_selectors": dead_selectors,
+            "dead_custom_properties": [{"name": name, "bytes": size} for name, size in sorted(dead_properties.items())],
+            "saved_bytes": len(text) - len(trimmed),
+            "saved_gzip_bytes": gzip_size(COMMENT.sub("", text)) - gzip_size(COMMENT.sub("", trimmed)),
+        })
+
+    module_paths = [path for path in STYLE_MODULES if path in sources]
+    report["style_modules"] = dead_module_entries(sources, module_paths)
+    report["used_tokens"] = len(tokens)
+    report["seconds"] = round(time.monotonic() - started, 3)
+    return report
+
+
+def print_report(report, limit=20):
+    where = "production bundle" if report["source"] == "bundle" else "source stylesheets (no .next build found)"
+    print(f"Dead CSS in the {where}, against {report['used_tokens']} used tokens\n")
+    for sheet in report["stylesheets"]:
+        print(f"{sheet['file']} ({sheet['bytes']} bytes): {len(sheet['dead_rules'])} dead rules, "
+              f"{len(sheet['dead_selectors'])} dead selectors, "
+              f"{len(sheet['dead_custom_properties'])} unused custom properties")
+        for rule in sorted(sheet["dead_rules"], key=lambda r: -r["bytes"])[:limit]:
+            context = f"  [{' '.join(rule['context'])}]" if rule["context"] else ""
+            print(f"   {rule['bytes']:>6}  {rule['selector'][:90]}{context}")
+        for selector in sheet["dead_selectors"][:limit]:
+            print(f"   {selector['bytes']:>6}  {selector['selector'][:90]}  (in a live rule)")
+        if sheet["dead_custom_properties"]:
+            names = ", ".join(p["name"] for p in sheet["dead_custom_properties"])
+            print(f"          custom properties: {names}")
+        print(f"   saves {sheet['saved_bytes']} bytes ({sheet['saved_gzip_bytes']} gzipped)\n")
+
+    if report["style_modules"]:
+        print("Unused style-module entries (JS, not CSS):")
+        for entry in report["style_modules"]:
+            print(f"   {entry['bytes']:>6}  {entry['name']}  ({entry['file']})")
+        print()
+
+    total = dead_bytes(report)
+    gzipped = sum(sheet["saved_gzip_bytes"] for sheet in report["stylesheets"])
+    print(f"Removable: {total} CSS bytes ({gzipped} gzipped), "
+          f"{sum(e['bytes'] for e in report['style_modules'])} style-module bytes "
+          f"in {report['seconds']:.2f}s", file=sys.stderr)
+
+
+def dead_bytes(report):
+    return sum(sheet["saved_bytes"] for sheet in report["stylesheets"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report unused CSS rules, custom properties and style-module entries")
+    parser.add_argument("--css", action="append",
+                        help=f"stylesheet glob, repeatable (default: {BUNDLE_PATTERN}, else {SOURCE_CSS_PATTERN})")
+    parser.add_argument("--json", help="also write the full report to this file")
+    parser.add_argument("--limit", type=int, default=20, help="rules listed per stylesheet")
+    parser.add_argument("--max-dead-bytes", type=int, help="exit 1 when more CSS bytes than this are removable")
+    args = parser.parse_args(argv)
+
+    report = analyze(args.css)
+    print_report(report, args.limit)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.max_dead_bytes is not None and dead_bytes(report) > args.max_dead_bytes:
+        print(f"Over budget: {dead_bytes(report)} > {args.max_dead_bytes} removable CSS bytes", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
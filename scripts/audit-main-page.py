@@ -5,17 +5,33 @@ Tests all functionality and identifies issues without fixing them.
 """
 
 from playwright.sync_api import sync_playwright
+import argparse
 import json
 import time
 from datetime import datetime
 
+from audit_config import output_dir_from_env
+from audit_events import EventSink
+from audit_metrics import PageMetrics
+from audit_probe import probe, unnamed_buttons
+from audit_profile import PROFILER
+from audit_screenshots import ScreenshotService
+import audit_viewports
+from audit_waits import LEDGER, wait_for_hydration, wait_for_response, wait_for_ui_settle
+from perf_history import record_run
+
 # Configuration
 BASE_URL = "http://localhost:3002"
-SCREENSHOT_DIR = "/tmp/vethub-audit"
+SCREENSHOT_DIR = output_dir_from_env("/tmp/vethub-audit")
 
 issues = []
 warnings = []
 successes = []
+timings = []
+metrics = PageMetrics()
+# Created by run_audit, so importing the script doesn't touch the output directory
+shots = None
+events = None
 
 def log_issue(category, description, details=None):
     """Log an issue found during testing"""
@@ -48,11 +64,8 @@ def log_success(category, description):
     print(f"✅ PASS [{category}]: {description}")
 
 def take_screenshot(page, name):
-    """Take a screenshot with timestamp"""
-    import os
-    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
-    path = f"{SCREENSHOT_DIR}/{name}.png"
-    page.screenshot(path=path, full_page=True)
+    """Queue a screenshot; it is encoded and written in the background"""
+    path = shots.capture(page, name)
     print(f"📸 Screenshot: {path}")
     return path
 
@@ -63,7 +76,7 @@ def test_page_load(page):
     print("="*60)
 
     try:
-        page.goto(BASE_URL)
+        metrics.goto(page, BASE_URL)
         page.wait_for_load_state('networkidle')
         take_screenshot(page, "01-initial-load")
         log_success("Page Load", "Main page loads successfully")
@@ -71,16 +84,13 @@ def test_page_load(page):
         log_issue("Page Load", "Failed to load main page", str(e))
         return False
 
-    # Check for console errors
-    console_errors = []
-    page.on("console", lambda msg: console_errors.append(msg.text) if msg.type == "error" else None)
-
-    # Wait a moment for any delayed errors
-    page.wait_for_timeout(1000)
+    # Wait for hydration so errors thrown while React attaches are captured
+    wait_for_hydration(page, budget=1.0)
 
+    console_errors = events.errors()
     if console_errors:
         for err in console_errors:
-            log_issue("Console Error", "JavaScript console error", err)
+            log_issue("Console Error", "JavaScript console error", err["text"])
     else:
         log_success("Console", "No console errors on load")
 
@@ -124,7 +134,7 @@ def test_time_filters(page):
     if all_btn.is_visible():
         log_success("Time Filter", "'All' button is visible")
         all_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "02-filter-all")
     else:
         log_issue("Time Filter", "'All' button not found")
@@ -133,7 +143,7 @@ def test_time_filters(page):
     if am_btn.is_visible():
         log_success("Time Filter", "'AM' button is visible")
         am_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "03-filter-am")
 
         # Check if filter actually works - should show morning tasks
@@ -145,7 +155,7 @@ def test_time_filters(page):
     if pm_btn.is_visible():
         log_success("Time Filter", "'PM' button is visible")
         pm_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "04-filter-pm")
     else:
         log_issue("Time Filter", "'PM' button not found")
@@ -153,7 +163,7 @@ def test_time_filters(page):
     # Reset to All
     if all_btn.is_visible():
         all_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
 
 def test_view_mode_toggle(page):
     """Test By Task / By Patient view toggle"""
@@ -168,7 +178,7 @@ def test_view_mode_toggle(page):
     if by_task_btn.is_visible():
         log_success("View Mode", "'By Task' button is visible")
         by_task_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "05-view-by-task")
     else:
         log_issue("View Mode", "'By Task' button not found")
@@ -177,7 +187,7 @@ def test_view_mode_toggle(page):
     if by_patient_btn.is_visible():
         log_success("View Mode", "'By Patient' button is visible")
         by_patient_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "06-view-by-patient")
     else:
         log_issue("View Mode", "'By Patient' button not found")
@@ -185,7 +195,7 @@ def test_view_mode_toggle(page):
     # Reset to By Task
     if by_task_btn.is_visible():
         by_task_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
 
 def test_hide_done_toggle(page):
     """Test hide/show done toggle"""
@@ -200,12 +210,12 @@ def test_hide_done_toggle(page):
     if hide_btn.is_visible():
         log_success("Done Toggle", "'hide done' button visible (currently showing done)")
         hide_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "07-hide-done")
     elif show_btn.is_visible():
         log_success("Done Toggle", "'show done' button visible (currently hiding done)")
         show_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         take_screenshot(page, "07-show-done")
     else:
         log_issue("Done Toggle", "Hide/show done toggle not found")
@@ -225,7 +235,7 @@ def test_add_task_flow(page):
 
     log_success("Add Task", "'Add Task' button is visible")
     add_btn.click()
-    page.wait_for_timeout(300)
+    wait_for_ui_settle(page)
     take_screenshot(page, "08-add-task-form")
 
     # Check for input field
@@ -251,7 +261,7 @@ def test_add_task_flow(page):
     cancel_btn = page.locator("button svg").first  # X icon
     if cancel_btn.is_visible():
         cancel_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
         log_success("Add Task", "Cancel button works")
     else:
         log_warning("Add Task", "Cancel button not clearly visible")
@@ -290,8 +300,7 @@ def test_task_toggle(page):
         incomplete = page.locator("button:has-text('○')").first
         if incomplete.is_visible():
             take_screenshot(page, "09-before-toggle")
-            incomplete.click()
-            page.wait_for_timeout(500)
+            wait_for_response(page, incomplete.click, r"/api/tasks/", budget=0.5, timeout=5000)
             take_screenshot(page, "10-after-toggle")
             log_success("Task Toggle", "Clicked task toggle - check screenshots for result")
     else:
@@ -331,7 +340,7 @@ def test_general_tasks_section(page):
     by_patient_btn = page.locator("button:has-text('By Patient')").first
     if by_patient_btn.is_visible():
         by_patient_btn.click()
-        page.wait_for_timeout(300)
+        wait_for_ui_settle(page)
 
     general_section = page.locator("text=General").first
     if general_section.is_visible():
@@ -359,20 +368,19 @@ def test_responsive_layout(page):
     print("TESTING: Responsive Layout")
     print("="*60)
 
-    viewports = [
-        {"name": "mobile", "width": 375, "height": 812},
-        {"name": "tablet", "width": 768, "height": 1024},
-        {"name": "desktop", "width": 1440, "height": 900},
-    ]
-
-    for vp in viewports:
-        page.set_viewport_size({"width": vp["width"], "height": vp["height"]})
-        page.wait_for_timeout(300)
-        take_screenshot(page, f"12-responsive-{vp['name']}")
-        log_success("Responsive", f"Screenshot captured at {vp['name']} ({vp['width']}x{vp['height']})")
-
-    # Reset to desktop
-    page.set_viewport_size({"width": 1440, "height": 900})
+    # One context per device profile, loaded concurrently; the shared page keeps its desktop viewport
+    results = audit_viewports.run_matrix(BASE_URL, shots=shots, events=events, metrics=metrics,
+                                         prefix="12-responsive", storage_state=page.context.storage_state())
+    for result in results:
+        name, viewport = result["profile"], result["viewport"]
+        if result["error"]:
+            log_issue("Responsive", f"{name} ({viewport['width']}x{viewport['height']}) failed to load", result["error"])
+            continue
+        log_success("Responsive", f"Screenshot captured at {name} ({viewport['width']}x{viewport['height']})")
+        result["findings"] += audit_viewports.responsive_findings(result)
+        for _, message in result["findings"]:
+            log_warning("Responsive", f"{name}: {message}")
+    audit_viewports.print_report([audit_viewports.summary(result) for result in results])
 
 def test_accessibility(page):
     """Basic accessibility checks"""
@@ -380,20 +388,27 @@ def test_accessibility(page):
     print("TESTING: Accessibility")
     print("="*60)
 
-    # Check for buttons without accessible text
-    buttons = page.locator("button").all()
-    buttons_without_text = 0
-    for btn in buttons:
-        text = btn.inner_text().strip()
-        aria_label = btn.get_attribute("aria-label") or ""
-        if not text and not aria_label:
-            buttons_without_text += 1
+    # One in-page probe covers every button and form control
+    facts = probe(page)
 
+    # Check for buttons without accessible text
+    buttons_without_text = len(unnamed_buttons(facts["buttons"]))
     if buttons_without_text > 0:
         log_warning("Accessibility", f"{buttons_without_text} buttons found without accessible text or aria-label")
     else:
         log_success("Accessibility", "All buttons have accessible text or aria-labels")
 
+    aria = facts["aria"]
+    if aria["unnamed"]:
+        log_warning("Accessibility",
+                    f"{aria['unnamed']} of {aria['interactive']} interactive elements have no accessible name",
+                    ", ".join(aria["unnamed_examples"]))
+    if aria["images_without_alt"]:
+        log_warning("Accessibility", f"{aria['images_without_alt']} images without alt text")
+    positive = facts["focus"]["positive_tabindex"]
+    if positive:
+        log_warning("Accessibility", f"{positive} elements with a positive tabindex override the tab order")
+
     # Check for color contrast (visual check reminder)
     log_warning("Accessibility", "MANUAL CHECK NEEDED: Verify color contrast meets WCAG AA standards")
 
@@ -403,20 +418,50 @@ def analyze_dom_structure(page):
     print("ANALYZING: DOM Structure")
     print("="*60)
 
-    # Get the page content
-    content = page.content()
+    # Counted in the page, so the whole document isn't downloaded for two checks
+    facts = probe(page, patterns={"error": "Error", "boundary": "(?i)boundary"})
 
     # Check for inline styles (potential maintenance issue)
-    inline_style_count = content.count('style="')
+    inline_style_count = facts["inline_styles"]
     if inline_style_count > 50:
         log_warning("Code Quality", f"High number of inline styles ({inline_style_count}) - consider using CSS classes")
 
     # Check for error boundaries
-    if "Error" in content and "boundary" not in content.lower():
+    if facts["patterns"]["error"] and not facts["patterns"]["boundary"]:
         log_warning("Error Handling", "Check if proper error boundaries are in place")
 
-def run_audit():
-    """Run the complete audit"""
+# Run order after test_page_load
+AUDIT_TESTS = [
+    test_task_checklist_presence,
+    test_time_filters,
+    test_view_mode_toggle,
+    test_hide_done_toggle,
+    test_add_task_flow,
+    test_patient_list,
+    test_task_toggle,
+    test_patient_status_switching,
+    test_general_tasks_section,
+    test_clear_all_button,
+    test_responsive_layout,
+    test_accessibility,
+    analyze_dom_structure,
+]
+
+def run_timed(test, page):
+    """Run one audit step and record how long it took"""
+    started = time.monotonic()
+    try:
+        with PROFILER.test(test.__name__):
+            return test(page)
+    finally:
+        timings.append({"test": test.__name__, "seconds": round(time.monotonic() - started, 3)})
+
+def run_audit(only=None):
+    """Run the complete audit, or test_page_load plus the steps named in `only`"""
+    global shots, events
+    shots = ScreenshotService(SCREENSHOT_DIR)
+    events = EventSink(f"{SCREENSHOT_DIR}/events.jsonl")
+
     print("\n" + "="*60)
     print("VETHUB MAIN PAGE COMPREHENSIVE AUDIT")
     print(f"Started: {datetime.now().isoformat()}")
@@ -425,45 +470,35 @@ def run_audit():
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(viewport={"width": 1440, "height": 900})
+        metrics.attach(context)
+        events.attach_context(context)
         page = context.new_page()
 
-        # Capture console messages
-        console_messages = []
-        page.on("console", lambda msg: console_messages.append({
-            "type": msg.type,
-            "text": msg.text
-        }))
-
         # Run all tests
-        if not test_page_load(page):
+        if not run_timed(test_page_load, page):
             print("\n❌ Page failed to load - aborting further tests")
             browser.close()
+            shots.close()
+            events.close()
             return
 
-        test_task_checklist_presence(page)
-        test_time_filters(page)
-        test_view_mode_toggle(page)
-        test_hide_done_toggle(page)
-        test_add_task_flow(page)
-        test_patient_list(page)
-        test_task_toggle(page)
-        test_patient_status_switching(page)
-        test_general_tasks_section(page)
-        test_clear_all_button(page)
-        test_responsive_layout(page)
-        test_accessibility(page)
-        analyze_dom_structure(page)
+        for test in AUDIT_TESTS:
+            if only is None or test.__name__ in only:
+                run_timed(test, page)
 
         # Check for any console errors captured during tests
-        errors = [m for m in console_messages if m["type"] == "error"]
+        errors = events.errors()
         if errors:
             print("\n" + "="*60)
             print("CONSOLE ERRORS CAPTURED DURING TESTS")
             print("="*60)
             for err in errors:
-                log_issue("Console Error", err["text"])
+                log_issue("Console Error", err["text"], f"{err['count']} occurrences" if err["count"] > 1 else None)
 
+        metrics.finish()
         browser.close()
+    shots.close()
+    events.close()
 
     # Print summary
     print("\n" + "="*60)
@@ -492,17 +527,45 @@ def run_audit():
             if warning.get('details'):
                 print(f"   → {warning['details']}")
 
+    metrics.print_report()
+    LEDGER.print_report()
+    shots.print_report()
+    events.print_report()
+    PROFILER.print_report()
+
     # Save results to JSON
     results = {
         "timestamp": datetime.now().isoformat(),
         "successes": successes,
         "warnings": warnings,
-        "issues": issues
+        "issues": issues,
+        "timings": timings,
+        "page_metrics": metrics.samples,
+        "waits": LEDGER.summary(),
+        "screenshots": shots.summary(),
+        "events": events.summary()
     }
+    if PROFILER.installed:
+        results["profile"] = PROFILER.summary(PROFILER.write_collapsed(f"{SCREENSHOT_DIR}/profile.collapsed"))
 
     with open(f"{SCREENSHOT_DIR}/audit-results.json", "w") as f:
         json.dump(results, f, indent=2)
     print(f"\n📄 Full results saved to: {SCREENSHOT_DIR}/audit-results.json")
+    record_run("main-page", results, BASE_URL)
 
 if __name__ == "__main__":
-    run_audit()
+    parser = argparse.ArgumentParser(description="VetHub main page audit")
+    parser.add_argument("--only", metavar="TESTS",
+                        help="comma-separated audit steps to run after test_page_load (default: all)")
+    parser.add_argument("--no-profile", action="store_true",
+                        help="skip the per-phase test timings and the collapsed-stack profile")
+    args = parser.parse_args()
+    if not args.no_profile:
+        PROFILER.install("main-page")
+    only = None
+    if args.only:
+        only = set(args.only.split(","))
+        unknown = only - {test.__name__ for test in AUDIT_TESTS}
+        if unknown:
+            parser.error(f"unknown audit steps: {', '.join(sorted(unknown))}")
+    run_audit(only)
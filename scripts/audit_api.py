@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Persistence checks straight against /api/patients/[id].
+
+    api = PatientApi(context.request, base_url)
+    original = api.snapshot(patient_id, fields)
+    ...edit and save through the UI...
+    mismatches = api.verify(patient_id, expected)
+    api.restore(patient_id, original)
+
+context.request shares the page's cookies, so reads and writes are made as the
+signed-in user, but it is a plain HTTP client: one round-trip per call instead
+of a page reload. It is also not intercepted by context.route, so in --offline
+mode base_url has to be the fake backend's URL rather than the app's.
+
+PATCH merges roundingData on the server, so a restore only touches the fields
+that were snapshotted. Fields that did not exist before are put back as null.
+"""
+
+import time
+
+
+class PatientApi:
+    """roundingData reads, writes and comparisons for one API base URL"""
+
+    def __init__(self, request, base_url):
+        self.request = request
+        self.base_url = base_url.rstrip("/")
+        # (method, seconds) per call, for the timing report
+        self.calls = []
+
+    def _send(self, method, patient_id, data=None):
+        started = time.monotonic()
+        response = self.request.fetch(f"{self.base_url}/api/patients/{patient_id}", method=method, data=data)
+        self.calls.append((method, time.monotonic() - started))
+        if not response.ok:
+            raise RuntimeError(f"{method} /api/patients/{patient_id} returned {response.status}: {response.text()[:200]}")
+        return response.json()
+
+    def get(self, patient_id):
+        return self._send("GET", patient_id)
+
+    def rounding_data(self, patient_id):
+        return self.get(patient_id).get("roundingData") or {}
+
+    def patch_rounding(self, patient_id, fields):
+        return self._send("PATCH", patient_id, {"roundingData": fields})
+
+    def snapshot(self, patient_id, fields):
+        """Current values of fields, None for the ones not set"""
+        saved = self.rounding_data(patient_id)
+        return {field: saved.get(field) for field in fields}
+
+    def verify(self, patient_id, expected):
+        """Fields whose persisted value differs from expected, as [{field, expected, actual}]"""
+        saved = self.rounding_data(patient_id)
+        return [{"field": field, "expected": value, "actual": saved.get(field)}
+                for field, value in expected.items() if saved.get(field) != value]
+
+    def restore(self, patient_id, snapshot):
+        """Write a snapshot back in one PATCH; returns the fields that still differ"""
+        self.patch_rounding(patient_id, snapshot)
+        return self.verify(patient_id, snapshot)
+
+    def seconds(self):
+        return round(sum(seconds for _, seconds in self.calls), 3)
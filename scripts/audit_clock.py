@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Virtual clock mode for timing-dependent audit checks.
+
+Installs Playwright's controllable page clock before navigation so tests can
+jump past the rounding sheet's auto-save debounce instead of sleeping through
+it, and can check the exact debounce boundary.
+
+While the clock is paused, in-page timers and requestAnimationFrame only fire
+when the clock is advanced, so helpers here poll with Playwright-side waits
+(real time) rather than wait_for_ui_settle.
+"""
+
+import re
+
+from audit_waits import PATIENT_URL, wait_until
+
+# ROUNDING_AUTO_SAVE_DELAY in src/lib/constants.ts
+AUTO_SAVE_DEBOUNCE_MS = 2000
+BOUNDARY_MARGIN_MS = 100
+# pause_at can't go back in time, and the page clock keeps running between
+# reading Date.now() and pausing, so pause a little ahead of it
+PAUSE_LEAD_MS = 1000
+
+
+class VirtualClock:
+    """Thin wrapper around page.clock that remembers whether it is paused"""
+
+    def __init__(self, page):
+        self.page = page
+        self.paused = False
+
+    def install(self):
+        """Must be called before the first page.goto"""
+        self.page.clock.install()
+
+    def pause(self):
+        """Stop the page clock PAUSE_LEAD_MS ahead; timers due before then fire on the way"""
+        now = self.page.evaluate("Date.now()")
+        self.page.clock.pause_at(now + PAUSE_LEAD_MS)
+        self.paused = True
+
+    def advance(self, ms):
+        """Fire every timer due within the next ms milliseconds"""
+        self.page.clock.run_for(ms)
+
+    def resume(self):
+        if self.paused:
+            self.page.clock.resume()
+            self.paused = False
+
+
+def probe_debounce(page, clock, action, debounce_ms=AUTO_SAVE_DEBOUNCE_MS,
+                   margin_ms=BOUNDARY_MARGIN_MS, url=PATIENT_URL, method="PATCH"):
+    """
+    Run action() on a paused clock and check the debounce boundary.
+
+    Advances to debounce_ms - margin_ms and expects no matching request, then
+    to debounce_ms + margin_ms and expects exactly one. Returns a dict with the
+    request counts at each point and an overall "ok".
+    """
+    pattern = re.compile(url) if isinstance(url, str) else url
+    sent = []
+
+    def on_request(request):
+        if request.method == method and pattern.search(request.url):
+            sent.append(request.url)
+
+    before_ms = debounce_ms - margin_ms
+    after_ms = debounce_ms + margin_ms
+
+    # Pause before listening: saves still pending from earlier edits fire
+    # during the pause lead and must not be counted
+    clock.pause()
+    page.on("request", on_request)
+    try:
+        action()
+
+        clock.advance(before_ms)
+        # Give a premature request the chance to show up before counting
+        wait_until(page, lambda: len(sent) > 0, budget=0, timeout=250, helper="debounce_early")
+        saves_before = len(sent)
+
+        clock.advance(after_ms - before_ms)
+        wait_until(page, lambda: len(sent) > saves_before, budget=0, timeout=5000,
+                   helper="debounce_fire")
+        saves_after = len(sent)
+    finally:
+        clock.resume()
+        page.remove_listener("request", on_request)
+
+    return {
+        "debounce_ms": debounce_ms,
+        "before_ms": before_ms,
+        "saves_before": saves_before,
+        "after_ms": after_ms,
+        "saves_after": saves_after,
+        "ok": saves_before == 0 and saves_after == 1,
+    }
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Shared target configuration for the audit, benchmark and load scripts.
+"""
+
+import os
+from urllib.parse import urlparse
+
+PRODUCTION_URL = "https://empathetic-clarity-production.up.railway.app"
+LOCAL_URL = "http://localhost:3000"
+PRODUCTION_HOSTS = ("railway.app",)
+
+
+def is_production_url(url):
+    """True for the Railway deployment, where scripts would write to real patient records"""
+    host = urlparse(url).hostname or ""
+    return host.endswith(PRODUCTION_HOSTS)
+
+
+def base_url_from_env(default):
+    """$VETHUB_BASE_URL if set, so any script can be pointed at a local app"""
+    return os.environ.get("VETHUB_BASE_URL", default).rstrip("/")
+
+
+def output_dir_from_env(default):
+    """$VETHUB_AUDIT_DIR if set, so concurrent runs of one script don't share screenshots and results"""
+    return os.environ.get("VETHUB_AUDIT_DIR", default)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Bounded sink for the browser events of an audit run.
+
+attach(page) subscribes to console messages, uncaught page errors and failed
+requests. Each handler only updates counters and enqueues the event, so the
+Playwright dispatch thread never waits on stdout or the disk:
+
+  * the last CAPACITY events are kept in a ring buffer;
+  * events are counted per type (console:error, pageerror, requestfailed, ...);
+  * repeated messages are folded into one entry with an occurrence count.
+    Digits are masked in the key, so "row 12 failed" and "row 13 failed" fold;
+  * a background thread streams every event to a JSONL file and echoes the
+    first occurrence of each message when echo is on.
+
+Memory stays flat however noisy the page is: beyond MAX_DISTINCT messages,
+new ones are only counted.
+"""
+
+import json
+import queue
+import re
+import threading
+import time
+from collections import deque
+
+CAPACITY = 500
+MAX_DISTINCT = 1000
+# Writer queue; past this the stream drops events (they are still counted)
+QUEUE_SIZE = 10000
+# Console types that count as errors alongside uncaught page errors
+ERROR_TYPES = ("console:error", "pageerror")
+
+_DIGITS = re.compile(r"\d+")
+
+
+def message_key(event):
+    return (event["type"], _DIGITS.sub("#", event["text"])[:300])
+
+
+class EventSink:
+    """Collects console, page-error and failed-request events from any number of pages"""
+
+    def __init__(self, path=None, capacity=CAPACITY, echo=False):
+        self.path = path
+        self.echo = echo
+        self.recent = deque(maxlen=capacity)
+        self.counts = {}
+        self.messages = {}
+        self.folded = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(QUEUE_SIZE)
+        self._writer = None
+        # Set once the stream file has been created; later writers append to it
+        self._streamed = False
+
+    def attach(self, page):
+        with self._lock:
+            if self._writer is None and (self.path or self.echo):
+                # Started on first use, so a sink that never sees a page leaves no empty stream behind.
+                # Attaching again after close() restarts it in append mode.
+                self._writer = threading.Thread(target=self._write, args=("a" if self._streamed else "w",),
+                                                name="event-sink", daemon=True)
+                self._streamed = True
+                self._writer.start()
+        page.on("console", lambda msg: self.add({
+            "type": f"console:{msg.type}",
+            "text": msg.text,
+            "url": msg.location.get("url") if msg.location else None,
+        }))
+        page.on("pageerror", lambda error: self.add({"type": "pageerror", "text": str(error)}))
+        page.on("requestfailed", lambda request: self.add({
+            "type": "requestfailed",
+            "text": f"{request.method} {request.url}: {request.failure}",
+        }))
+
+    def attach_context(self, context):
+        """Attach to every page the context has or opens later"""
+        for page in context.pages:
+            self.attach(page)
+        context.on("page", self.attach)
+
+    def add(self, event):
+        event["time"] = time.time()
+        key = message_key(event)
+        with self._lock:
+            self.counts[event["type"]] = self.counts.get(event["type"], 0) + 1
+            self.recent.append(event)
+            entry = self.messages.get(key)
+            first = entry is None
+            if entry is not None:
+                entry["count"] += 1
+                entry["last_seen"] = event["time"]
+            elif len(self.messages) < MAX_DISTINCT:
+                self.messages[key] = {"type": event["type"], "text": event["text"], "url": event.get("url"),
+                                      "count": 1, "first_seen": event["time"], "last_seen": event["time"]}
+            else:
+                self.folded += 1
+        if self._writer:
+            try:
+                self._queue.put_nowait((event, first))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+
+    def _write(self, mode):
+        stream = open(self.path, mode, encoding="utf-8") if self.path else None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                event, first = item
+                if stream:
+                    stream.write(json.dumps(event) + "\n")
+                if self.echo and first:
+                    print(f"[Browser {event['type']}] {event['text']}")
+        finally:
+            if stream:
+                stream.close()
+
+    def errors(self, limit=None):
+        """Distinct console errors and page errors, most frequent first"""
+        with self._lock:
+            entries = [dict(e) for e in self.messages.values() if e["type"] in ERROR_TYPES]
+        entries.sort(key=lambda e: (-e["count"], e["first_seen"]))
+        return entries[:limit]
+
+    def close(self):
+        """Flush the JSONL stream; returns the summary"""
+        if self._writer:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+        return self.summary()
+
+    def summary(self, top=20):
+        with self._lock:
+            entries = sorted(self.messages.values(), key=lambda e: -e["count"])
+            return {
+                "counts": dict(self.counts),
+                "distinct": len(self.messages),
+                "folded": self.folded,
+                "dropped": self.dropped,
+                "stream": self.path,
+                "top": [dict(e) for e in entries[:top]],
+            }
+
+    def print_report(self, top=5):
+        summary = self.summary(top)
+        if not summary["counts"]:
+            print("🪵 Browser events: none")
+            return
+        counts = ", ".join(f"{count} {kind}" for kind, count in sorted(summary["counts"].items()))
+        print(f"🪵 Browser events: {counts} ({summary['distinct']} distinct)")
+        for entry in summary["top"]:
+            print(f"   x{entry['count']} [{entry['type']}] {entry['text'][:120]}")
+        if summary["dropped"]:
+            print(f"   {summary['dropped']} events not streamed (writer queue full)")
+        if self.path:
+            print(f"   Stream: {self.path}")
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Record and replay the API traffic of an audit run.
+
+ApiRecorder routes **/api/** through itself, fetches each request from the
+network and keeps the exchange. The archive is gzipped JSON, much smaller
+than a HAR because it only holds API exchanges and no page assets.
+ApiReplay serves those exchanges back through context.route, so a rerun's
+reloads never wait on the backend.
+
+Exchanges are keyed on method, path with sorted query, and the request body
+normalized: JSON keys sorted and volatile keys such as lastUpdated dropped.
+The key ignores the host, so an archive recorded against one deployment
+replays against another. When one key was recorded several times (the
+patient list before and after a save), replay returns the responses in
+recorded order and then repeats the last one.
+
+Writes (PATCH/POST/PUT/DELETE) pass through to the network during replay by
+default, so the save under test really happens; replay_writes=True serves them
+from the archive too. Requests missing from the archive also go to the
+network and are counted as misses.
+"""
+
+import base64
+import gzip
+import json
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+API_PATTERN = "**/api/**"
+WRITE_METHODS = ("PATCH", "POST", "PUT", "DELETE")
+
+# Client-side timestamps that differ on every run and would defeat the cache
+VOLATILE_KEYS = {"lastUpdated", "timestamp", "updatedAt"}
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def normalize_body(body):
+    if not body:
+        return ""
+    try:
+        return json.dumps(_strip_volatile(json.loads(body)), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+def exchange_key(method, url, body):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method} {parts.path}{'?' + query if query else ''} {normalize_body(body)}"
+
+
+class ApiRecorder:
+    """Captures every API exchange of the contexts it is attached to"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def attach(self, context):
+        context.route(API_PATTERN, self._record)
+
+    def _record(self, route):
+        request = route.request
+        response = route.fetch()
+        body = response.body()
+        entry = {
+            "key": exchange_key(request.method, request.url, request.post_data),
+            "status": response.status,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": base64.b64encode(body).decode(),
+        }
+        with self._lock:
+            self.entries.append(entry)
+        route.fulfill(response=response, body=body)
+
+    def save(self):
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": self.entries}, f, separators=(",", ":"))
+        print(f"📼 Recorded {len(self.entries)} API exchanges to {self.path}")
+
+    def summary(self):
+        return {"mode": "record", "archive": self.path, "exchanges": len(self.entries)}
+
+    def print_report(self):
+        print(f"📼 API recording: {len(self.entries)} exchanges")
+
+
+class ApiReplay:
+    """Serves recorded API exchanges, passing writes and misses through"""
+
+    def __init__(self, path, replay_writes=False):
+        self.path = path
+        self.replay_writes = replay_writes
+        self.responses = {}
+        self.hits = 0
+        self.misses = {}
+        self.passthrough = 0
+        self._served = {}
+        self._lock = threading.Lock()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for entry in json.load(f)["entries"]:
+                self.responses.setdefault(entry["key"], []).append(entry)
+
+    def attach(self, context):
+        context.route(API_PATTERN, self._replay)
+
+    def _replay(self, route):
+        request = route.request
+        if request.method in WRITE_METHODS and not self.replay_writes:
+            with self._lock:
+                self.passthrough += 1
+            route.fallback()
+            return
+
+        key = exchange_key(request.method, request.url, request.post_data)
+        with self._lock:
+            recorded = self.responses.get(key)
+            if recorded is None:
+                self.misses[key] = self.misses.get(key, 0) + 1
+            else:
+                index = self._served.get(key, 0)
+                self._served[key] = index + 1
+                entry = recorded[min(index, len(recorded) - 1)]
+                self.hits += 1
+
+        if recorded is None:
+            route.fallback()
+            return
+        route.fulfill(status=entry["status"], content_type=entry["content_type"],
+                      body=base64.b64decode(entry["body"]))
+
+    def save(self):
+        pass
+
+    def summary(self):
+        return {"mode": "replay", "archive": self.path, "hits": self.hits,
+                "misses": sum(self.misses.values()), "passthrough": self.passthrough}
+
+    def print_report(self):
+        print(f"📼 API replay: {self.hits} served from {self.path}, {self.passthrough} writes passed through, "
+              f"{sum(self.misses.values())} misses")
+        for key, count in sorted(self.misses.items(), key=lambda item: -item[1])[:5]:
+            print(f"   miss x{count}: {key[:120]}")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Web Vitals and navigation-timing collector for the Playwright audit scripts.
+
+An init script installs PerformanceObservers on every document. Navigations go
+through PageMetrics.goto / PageMetrics.reload, and each page visit is turned
+into one sample when the page is left (or at finish()), so LCP, CLS and INP
+cover everything the tests did on that page.
+"""
+
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+VITALS_INIT_JS = """
+(() => {
+  if (window.__vethubVitals) return;
+  const v = window.__vethubVitals = { fcp: null, lcp: null, cls: 0, inp: null, longTasks: 0, longTaskMs: 0 };
+  const observe = (type, onEntry, options = {}) => {
+    try {
+      new PerformanceObserver(list => list.getEntries().forEach(onEntry))
+        .observe({ type, buffered: true, ...options });
+    } catch (e) { /* entry type not supported */ }
+  };
+  observe('paint', e => { if (e.name === 'first-contentful-paint') v.fcp = e.startTime; });
+  observe('largest-contentful-paint', e => { v.lcp = e.startTime; });
+  observe('layout-shift', e => { if (!e.hadRecentInput) v.cls += e.value; });
+  observe('longtask', e => { v.longTasks += 1; v.longTaskMs += e.duration; });
+  observe('event', e => { if (e.interactionId) v.inp = Math.max(v.inp || 0, e.duration); }, { durationThreshold: 16 });
+})();
+"""
+
+COLLECT_JS = """
+() => {
+  const nav = performance.getEntriesByType('navigation')[0];
+  const resources = performance.getEntriesByType('resource');
+  const v = window.__vethubVitals || {};
+  const round = x => (x === null || x === undefined) ? null : Math.round(x * 10) / 10;
+  return {
+    ttfb_ms: nav ? round(nav.responseStart) : null,
+    dom_content_loaded_ms: nav ? round(nav.domContentLoadedEventEnd) : null,
+    load_ms: nav ? round(nav.loadEventEnd) : null,
+    fcp_ms: round(v.fcp),
+    lcp_ms: round(v.lcp),
+    cls: v.cls === undefined ? null : Math.round(v.cls * 1000) / 1000,
+    inp_ms: round(v.inp),
+    long_tasks: v.longTasks || 0,
+    long_task_ms: round(v.longTaskMs || 0),
+    js_heap_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+    transfer_bytes: (nav ? nav.transferSize : 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+    requests: resources.length + (nav ? 1 : 0),
+  };
+}
+"""
+
+
+class PageMetrics:
+    """Collects one metrics sample per page visit"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+        self._visits = {}
+
+    def attach(self, context):
+        """Install the observers on every page opened from this context"""
+        context.add_init_script(VITALS_INIT_JS)
+
+    def goto(self, page, url, label=None, **kwargs):
+        self._record(page)
+        response = page.goto(url, **kwargs)
+        self._start(page, label or "goto")
+        return response
+
+    def reload(self, page, label=None, **kwargs):
+        self._record(page)
+        response = page.reload(**kwargs)
+        self._start(page, label or "reload")
+        return response
+
+    def add(self, url, label, values):
+        """Record a sample collected elsewhere with COLLECT_JS, e.g. from an async page"""
+        with self._lock:
+            self.samples.append({"route": urlparse(url).path or "/", "label": label,
+                                 "timestamp": datetime.now().isoformat(), **values})
+
+    def finish(self):
+        """Record every page still open; call before closing the browser"""
+        for page in list(self._visits):
+            self._record(page)
+        return self.samples
+
+    def print_report(self, samples=None):
+        print("📈 Page metrics:")
+        for m in self.samples if samples is None else samples:
+            if "error" in m:
+                print(f"   {m['route']} ({m['label']}): {m['error']}")
+                continue
+            heap = f"{m['js_heap_bytes'] / 1e6:.1f}MB" if m.get("js_heap_bytes") else "n/a"
+            print(f"   {m['route']} ({m['label']}): TTFB {m['ttfb_ms']}ms, FCP {m['fcp_ms']}ms, "
+                  f"LCP {m['lcp_ms']}ms, CLS {m['cls']}, INP {m['inp_ms']}ms, "
+                  f"{m['long_tasks']} long tasks, heap {heap}, {m['transfer_bytes'] / 1024:.0f}KB")
+
+    def _start(self, page, label):
+        self._visits[page] = {
+            "route": urlparse(page.url).path or "/",
+            "label": label,
+            "timestamp": datetime.now().isoformat(),
+        }
+
+    def _record(self, page):
+        visit = self._visits.pop(page, None)
+        if visit is None or page.is_closed():
+            return
+        try:
+            visit.update(page.evaluate(COLLECT_JS))
+        except Exception as e:
+            visit["error"] = str(e)
+        with self._lock:
+            self.samples.append(visit)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Parallel execution engine for the Playwright audit scripts.
+
+Tests are scheduled by asyncio across a pool of worker lanes. The sync
+Playwright API is bound to the thread that started it, and every audit test is
+written against it, so each lane is a thread that owns one headless browser and
+hands out a fresh, isolated browser context per job.
+"""
+
+import asyncio
+import queue
+import time
+
+from playwright.sync_api import sync_playwright
+
+DEFAULT_WORKERS = 4
+
+
+def _lane(lane_id, jobs, run_job, outcomes, launch_options):
+    """Drain the shared job queue with one browser owned by this thread."""
+    with sync_playwright() as p:
+        browser = p.chromium.launch(**launch_options)
+        try:
+            while True:
+                try:
+                    index, job = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                started = time.monotonic()
+                try:
+                    result = run_job(browser, job)
+                    error = None
+                except Exception as e:
+                    result = None
+                    error = str(e)
+                outcomes[index] = {
+                    "job": job,
+                    "lane": lane_id,
+                    "result": result,
+                    "error": error,
+                    "seconds": round(time.monotonic() - started, 3),
+                }
+        finally:
+            browser.close()
+
+
+async def _run_lanes(jobs, run_job, workers, launch_options):
+    pending = queue.Queue()
+    for index, job in enumerate(jobs):
+        pending.put((index, job))
+
+    outcomes = [None] * len(jobs)
+    lanes = min(workers, len(jobs)) or 1
+    await asyncio.gather(*[
+        asyncio.to_thread(_lane, lane_id, pending, run_job, outcomes, launch_options)
+        for lane_id in range(lanes)
+    ])
+    return outcomes
+
+
+def run_jobs(jobs, run_job, workers=DEFAULT_WORKERS, launch_options=None):
+    """
+    Run run_job(browser, job) for every job across `workers` browsers.
+
+    Returns one outcome dict per job, in the same order as `jobs`, so callers
+    can merge results deterministically regardless of completion order.
+    """
+    launch_options = launch_options or {"headless": True}
+    started = time.monotonic()
+    outcomes = asyncio.run(_run_lanes(list(jobs), run_job, workers, launch_options))
+    elapsed = time.monotonic() - started
+
+    serial = sum(o["seconds"] for o in outcomes)
+    print(f"⚡ Parallel run: {len(outcomes)} jobs on {min(workers, len(outcomes))} workers "
+          f"in {elapsed:.1f}s (serial work {serial:.1f}s)")
+    return outcomes
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+One-round-trip DOM probe for the audit checks.
+
+    facts = probe(page, buttons="table button", boxes={"table": "table"}, button_texts=["Profile", "Cases"])
+
+A single page.evaluate collects everything the structural checks read, instead
+of one protocol round-trip per locator call:
+
+  * counts: number of matches per CSS selector;
+  * boxes: bounding box and scrollWidth of the first visible match per
+    selector (None when there is none), in the same viewport coordinates as
+    Locator.bounding_box;
+  * buttons: text, accessible name, box and focusability of every element
+    matching `buttons`;
+  * button_texts: buttons containing each text, matched like
+    button:has-text() (case-insensitive, whitespace collapsed);
+  * inline_styles: elements with a style attribute;
+  * aria: interactive elements with and without an accessible name, and
+    images without alt text;
+  * focus: focusable elements, and controls taken out of or reordered in the
+    tab sequence;
+  * patterns: whether each regex matches the serialized document, computed in
+    the page so the markup never crosses the wire.
+"""
+
+PROBE_JS = """
+(spec) => {
+  const clean = (text) => (text || '').replace(/\\s+/g, ' ').trim();
+  const isVisible = (el) => {
+    const rect = el.getBoundingClientRect();
+    const style = getComputedStyle(el);
+    return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+  };
+  const box = (el) => {
+    const r = el.getBoundingClientRect();
+    return {x: Math.round(r.x), y: Math.round(r.y), width: Math.round(r.width), height: Math.round(r.height)};
+  };
+  const accessibleName = (el) => {
+    const labelledBy = el.getAttribute('aria-labelledby');
+    if (labelledBy) {
+      const text = labelledBy.split(/\\s+/).map(id => clean(document.getElementById(id)?.textContent)).join(' ');
+      if (text.trim()) return text.trim();
+    }
+    const direct = el.getAttribute('aria-label') || el.getAttribute('title');
+    if (direct && direct.trim()) return clean(direct);
+    if (el.labels && el.labels.length) {
+      const text = clean(Array.from(el.labels).map(l => l.textContent).join(' '));
+      if (text) return text;
+    }
+    if (['INPUT', 'TEXTAREA'].includes(el.tagName)) return clean(el.getAttribute('placeholder'));
+    if (el.tagName === 'SELECT') return '';
+    return clean(el.innerText || el.textContent) ||
+      clean(Array.from(el.querySelectorAll('img[alt], svg title')).map(n => n.alt || n.textContent).join(' '));
+  };
+  const focusable = (el) => el.tabIndex >= 0 && !el.disabled && isVisible(el);
+  const describe = (el) => {
+    const id = el.id ? '#' + el.id : '';
+    const cls = typeof el.className === 'string' && el.className ? '.' + el.className.split(/\\s+/).slice(0, 2).join('.') : '';
+    return el.tagName.toLowerCase() + id + cls;
+  };
+
+  const counts = {};
+  for (const [name, selector] of Object.entries(spec.counts || {})) {
+    counts[name] = document.querySelectorAll(selector).length;
+  }
+  const boxes = {};
+  for (const [name, selector] of Object.entries(spec.boxes || {})) {
+    const el = Array.from(document.querySelectorAll(selector)).find(isVisible);
+    boxes[name] = el ? {...box(el), scroll_width: el.scrollWidth} : null;
+  }
+
+  const buttons = Array.from(document.querySelectorAll(spec.buttons)).map(el => {
+    const visible = isVisible(el);
+    return {
+      text: clean(el.innerText || el.textContent).slice(0, 40),
+      name: accessibleName(el).slice(0, 60),
+      box: visible ? box(el) : null,
+      focusable: focusable(el),
+      disabled: !!el.disabled,
+    };
+  });
+
+  const allButtons = Array.from(document.querySelectorAll('button')).map(el => clean(el.textContent).toLowerCase());
+  const buttonTexts = {};
+  for (const text of spec.button_texts || []) {
+    const needle = clean(text).toLowerCase();
+    buttonTexts[text] = allButtons.filter(t => t.includes(needle)).length;
+  }
+
+  const interactive = Array.from(document.querySelectorAll(
+    'button, a[href], input:not([type=hidden]), select, textarea, [role=button], [role=tab], [role=checkbox], [role=combobox]'));
+  const unnamed = interactive.filter(el => isVisible(el) && !accessibleName(el));
+  const images = Array.from(document.querySelectorAll('img')).filter(img => !img.hasAttribute('alt'));
+
+  const patterns = {};
+  if (spec.patterns && Object.keys(spec.patterns).length) {
+    const html = document.documentElement.outerHTML;
+    for (const [name, [source, flags]] of Object.entries(spec.patterns)) {
+      patterns[name] = new RegExp(source, flags).test(html);
+    }
+  }
+
+  return {
+    url: location.pathname,
+    viewport: {width: innerWidth, height: innerHeight},
+    scroll_width: document.documentElement.scrollWidth,
+    elements: document.getElementsByTagName('*').length,
+    counts,
+    boxes,
+    buttons,
+    button_texts: buttonTexts,
+    inline_styles: document.querySelectorAll('[style]').length,
+    aria: {
+      interactive: interactive.length,
+      named: interactive.length - unnamed.length,
+      unnamed: unnamed.length,
+      unnamed_examples: unnamed.slice(0, spec.examples).map(describe),
+      images_without_alt: images.length,
+    },
+    focus: {
+      focusable: interactive.filter(focusable).length,
+      removed: interactive.filter(el => el.tabIndex < 0 && el.getAttribute('tabindex') !== null).length,
+      positive_tabindex: document.querySelectorAll('[tabindex]:not([tabindex="-1"]):not([tabindex="0"])').length,
+    },
+    patterns,
+  };
+}
+"""
+
+# Minimum tap target (WCAG 2.5.5 asks 44x44; the rounding sheet's rows allow a shorter 30px)
+MIN_TAP_WIDTH = 44
+MIN_TAP_HEIGHT = 30
+EXAMPLES = 5
+
+
+def _pattern(regex):
+    """Python-style "(?i)text" into a JS (source, flags) pair"""
+    if regex.startswith("(?i)"):
+        return [regex[4:], "i"]
+    return [regex, ""]
+
+
+def probe_spec(buttons="button", counts=None, boxes=None, button_texts=(), patterns=None, examples=EXAMPLES):
+    """Argument of PROBE_JS; also usable with an async page: await page.evaluate(PROBE_JS, probe_spec(...))"""
+    return {
+        "buttons": buttons,
+        "counts": counts or {},
+        "boxes": boxes or {},
+        "button_texts": list(button_texts),
+        "patterns": {name: _pattern(regex) for name, regex in (patterns or {}).items()},
+        "examples": examples,
+    }
+
+
+def probe(page, **spec):
+    """Collect the DOM facts of the current page in one page.evaluate; see probe_spec for the options"""
+    return page.evaluate(PROBE_JS, probe_spec(**spec))
+
+
+def small_targets(buttons, min_width=MIN_TAP_WIDTH, min_height=MIN_TAP_HEIGHT):
+    """Visible buttons smaller than the minimum tap target"""
+    return [b for b in buttons if b["box"] and (b["box"]["width"] < min_width or b["box"]["height"] < min_height)]
+
+
+def unnamed_buttons(buttons):
+    """Buttons with neither visible text nor an accessible name"""
+    return [b for b in buttons if not b["text"] and not b["name"]]
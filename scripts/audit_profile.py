@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Per-test, per-phase timing for the Playwright audit scripts.
+
+    PROFILER.install()              # patch the sync Playwright classes once
+    with PROFILER.test("test_x"):   # or @PROFILER.test("test_x") on a function
+        test_x(page)
+    PROFILER.print_report()
+    PROFILER.write_collapsed(path)
+
+While a test runs, every call to a public Page, Frame, Locator, ElementHandle,
+Keyboard or Mouse method is timed and charged to a phase:
+
+  * navigation: goto, reload, wait_for_load_state, ...
+  * waits: wait_for_timeout, wait_for_selector, ... and the audit_waits helpers;
+  * locators: resolving a locator and reading from it (count, is_visible,
+    input_value, evaluate, ...);
+  * actions: click, fill, press, select_option, set_viewport_size, ...
+  * screenshots: screenshot and ScreenshotService.capture.
+
+Phases nest, and each one keeps only its self time. A click inside
+wait_for_patient_save counts as an action, and the rest of the helper counts as
+waiting. Whatever the test spends outside Playwright calls is Python overhead.
+
+Every timed call is also charged to its Python call stack from the test
+function down, e.g. "rounding;test_save_actually_works;waits:wait_for_patient_save;
+actions:Locator.click". write_collapsed writes those stacks in the collapsed
+format that flamegraph.pl, speedscope and inferno read.
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+PHASES = ["navigation", "waits", "locators", "actions", "screenshots", "python"]
+# Column headers of the slowest-tests table
+PHASE_HEADERS = {"navigation": "nav", "waits": "waits", "locators": "locate", "actions": "action",
+                 "screenshots": "shots", "python": "python"}
+
+PHASE_METHODS = {
+    "navigation": ["goto", "reload", "go_back", "go_forward", "wait_for_load_state", "wait_for_url",
+                   "set_content"],
+    "waits": ["wait_for_timeout", "wait_for_selector", "wait_for_function", "wait_for_event", "wait_for"],
+    "locators": ["count", "all", "is_visible", "is_hidden", "is_enabled", "is_disabled", "is_checked",
+                 "is_editable", "bounding_box", "input_value", "inner_text", "inner_html", "text_content",
+                 "get_attribute", "all_inner_texts", "all_text_contents", "evaluate", "evaluate_all",
+                 "evaluate_handle", "query_selector", "query_selector_all", "content", "title"],
+    "actions": ["click", "dblclick", "fill", "type", "press", "press_sequentially", "select_option", "check",
+                "uncheck", "set_checked", "hover", "focus", "blur", "tap", "dispatch_event", "set_input_files",
+                "drag_to", "scroll_into_view_if_needed", "select_text", "clear", "set_viewport_size",
+                "insert_text", "down", "up", "move", "wheel"],
+    "screenshots": ["screenshot"],
+}
+PATCHED_CLASSES = ["Page", "Frame", "Locator", "ElementHandle", "Keyboard", "Mouse"]
+
+# Frames from these files are left out of the collapsed stacks
+_THIS_FILE = os.path.abspath(__file__)
+_SKIPPED_DIRS = (os.sep + "playwright" + os.sep, os.sep + "contextlib.py")
+
+
+class _Frame:
+    __slots__ = ("phase", "path", "anchor", "started", "children")
+
+    def __init__(self, phase, path, anchor):
+        self.phase = phase
+        self.path = path
+        # Python frame the timed call was made from; nested stacks stop there
+        self.anchor = anchor
+        self.started = time.perf_counter()
+        self.children = 0.0
+
+
+class _Test(contextlib.ContextDecorator):
+    """One timed test; usable as a context manager or a decorator"""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._start_test(self.name, sys._getframe(1))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler._finish_test()
+        return False
+
+
+class Profiler:
+    """Phase and call-stack timings of the tests run in this process"""
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix
+        self.installed = False
+        self.tests = {}
+        self.stacks = {}
+        self._originals = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Code objects of profiled helpers, whose frames are on the stacks under their phase label
+        self._codes = set()
+
+    # -- setup --------------------------------------------------------------
+
+    def install(self, prefix=None):
+        """Patch the sync Playwright classes; safe to call more than once"""
+        if prefix:
+            self.prefix = prefix
+        if self.installed:
+            return self
+        import playwright.sync_api as sync_api
+
+        for class_name in PATCHED_CLASSES:
+            cls = getattr(sync_api, class_name)
+            for phase, methods in PHASE_METHODS.items():
+                for method in methods:
+                    original = cls.__dict__.get(method)
+                    if not callable(original):
+                        continue
+                    self._originals.append((cls, method, original))
+                    setattr(cls, method, self._wrap(original, phase, f"{class_name}.{method}"))
+        self.installed = True
+        return self
+
+    def uninstall(self):
+        for cls, method, original in reversed(self._originals):
+            setattr(cls, method, original)
+        self._originals = []
+        self.installed = False
+
+    def _wrap(self, function, phase, label):
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            if getattr(self._local, "stack", None) is None:
+                return function(*args, **kwargs)
+            self._push(phase, label, sys._getframe(1))
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._pop()
+        return timed
+
+    def profiled(self, phase):
+        """Decorator charging a helper's own time to phase while a test runs"""
+        def decorate(function):
+            self._codes.add(function.__code__)
+            label = function.__name__
+
+            @functools.wraps(function)
+            def timed(*args, **kwargs):
+                if getattr(self._local, "stack", None) is None:
+                    return function(*args, **kwargs)
+                self._push(phase, label, sys._getframe(1))
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self._pop()
+            return timed
+        return decorate
+
+    # -- bookkeeping ----------------------------------------------------------
+
+    def test(self, name):
+        return _Test(self, name)
+
+    def _start_test(self, name, entry):
+        root = ";".join(filter(None, [self.prefix, name]))
+        self._local.test = name
+        self._local.calls = 0
+        self._local.phases = dict.fromkeys(PHASES, 0.0)
+        self._local.stack = [_Frame("python", root, entry)]
+
+    def _finish_test(self):
+        root = self._local.stack[0]
+        total = time.perf_counter() - root.started
+        self._charge(root, total - root.children)
+        with self._lock:
+            entry = self.tests.setdefault(self._local.test, {"runs": 0, "seconds": 0.0, "calls": 0,
+                                                             "phases": dict.fromkeys(PHASES, 0.0)})
+            entry["runs"] += 1
+            entry["seconds"] += total
+            entry["calls"] += self._local.calls
+            for phase, seconds in self._local.phases.items():
+                entry["phases"][phase] += seconds
+        self._local.stack = None
+
+    def _caller_path(self, caller, stop):
+        """Names of the Python frames between stop (exclusive) and caller"""
+        names = []
+        frame = caller
+        while frame is not None and frame is not stop:
+            code = frame.f_code
+            filename = os.path.abspath(code.co_filename)
+            # Profiled helpers are already on the path under their phase label
+            if code not in self._codes and filename != _THIS_FILE \
+                    and not any(part in filename for part in _SKIPPED_DIRS):
+                names.append(code.co_name)
+            frame = frame.f_back
+        names.reverse()
+        if len(self._local.stack) == 1 and names[:1] == [self._local.test]:
+            # The test function itself is the root of the path
+            names.pop(0)
+        return names
+
+    def _push(self, phase, label, caller):
+        parent = self._local.stack[-1]
+        path = ";".join([parent.path, *self._caller_path(caller, parent.anchor), f"{phase}:{label}"])
+        self._local.stack.append(_Frame(phase, path, caller))
+        self._local.calls += 1
+
+    def _pop(self):
+        frame = self._local.stack.pop()
+        elapsed = time.perf_counter() - frame.started
+        self._local.stack[-1].children += elapsed
+        self._charge(frame, elapsed - frame.children)
+
+    def _charge(self, frame, seconds):
+        self._local.phases[frame.phase] += seconds
+        with self._lock:
+            self.stacks[frame.path] = self.stacks.get(frame.path, 0.0) + seconds
+
+    # -- output ---------------------------------------------------------------
+
+    def summary(self, collapsed=None):
+        with self._lock:
+            tests = [{"test": name, "runs": t["runs"], "seconds": round(t["seconds"], 3), "calls": t["calls"],
+                      "phases": {phase: round(s, 3) for phase, s in t["phases"].items()}}
+                     for name, t in self.tests.items()]
+        tests.sort(key=lambda t: -t["seconds"])
+        totals = {phase: round(sum(t["phases"][phase] for t in tests), 3) for phase in PHASES}
+        return {"tests": tests, "phases": totals, "seconds": round(sum(t["seconds"] for t in tests), 3),
+                "collapsed": collapsed}
+
+    def write_collapsed(self, path):
+        """Write the stacks as "frame;frame;frame microseconds" lines; returns path"""
+        with self._lock:
+            stacks = dict(self.stacks)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stack, seconds in sorted(stacks.items()):
+                micros = int(seconds * 1e6)
+                if micros > 0:
+                    f.write(f"{stack} {micros}\n")
+        return path
+
+    def print_report(self, top=15):
+        summary = self.summary()
+        if not summary["tests"]:
+            return
+        print("\n" + "=" * 60)
+        print("SLOWEST TESTS (seconds by phase)")
+        print("=" * 60)
+        header = "".join(f"{PHASE_HEADERS[phase]:>9}" for phase in PHASES)
+        print(f"{'test':<32} {'total':>7}{header} {'calls':>6}")
+        for t in summary["tests"][:top]:
+            phases = "".join(f"{t['phases'][phase]:>9.2f}" for phase in PHASES)
+            print(f"{t['test'][:32]:<32} {t['seconds']:>7.2f}{phases} {t['calls']:>6}")
+        phases = "".join(f"{summary['phases'][phase]:>9.2f}" for phase in PHASES)
+        print(f"{'all tests':<32} {summary['seconds']:>7.2f}{phases}")
+
+
+PROFILER = Profiler()
+
+
+def profiled(phase):
+    """Charge a helper's own time to phase in PROFILER"""
+    return PROFILER.profiled(phase)
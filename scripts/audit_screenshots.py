@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Screenshot service for the Playwright audit scripts.
+
+capture() only grabs the PNG buffer from the browser. Hashing, recompression
+and writing happen on a background thread pool, so a test step no longer waits
+on the disk. Shots are stored content-addressed under objects/ and every name
+is a hard link to its object, so <dir>/<name>.png still opens as before and
+identical frames across runs share one file.
+
+A shot whose pixels are identical to the previous shot of the same page is
+not encoded or stored at all; its name links to the earlier frame and the
+manifest records duplicate_of. Only exact matches count: a frame that differs
+by one character is evidence in its own right, and visual_diff.py has to see it.
+
+Modes: "full" (the whole scrollable page, default), "viewport" and "element"
+(pass a locator). Viewport shots are much cheaper on long pages but miss
+everything below the fold, so callers opt in: ScreenshotService(dir,
+mode="viewport") or VETHUB_SCREENSHOT_MODE=viewport.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from audit_profile import profiled
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it frames dedup on their PNG bytes
+    Image = None
+
+DEFAULT_MODE = os.environ.get("VETHUB_SCREENSHOT_MODE", "full")
+MODES = ("viewport", "full", "element")
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+def png_size(png):
+    """(width, height) from the PNG IHDR chunk"""
+    return struct.unpack(">II", png[16:24])
+
+
+def pixel_digest(png):
+    """sha256 of the decoded pixels, so re-encodings of one frame match; of the PNG bytes without Pillow"""
+    if Image is None:
+        return hashlib.sha256(png).hexdigest()
+    with Image.open(io.BytesIO(png)) as image:
+        digest = hashlib.sha256(f"{image.mode}{image.size}".encode())
+        digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def encode(png):
+    """Losslessly recompress a PNG from the browser; returns the original if that is smaller"""
+    if Image is None:
+        return png
+    buffer = io.BytesIO()
+    with Image.open(io.BytesIO(png)) as image:
+        image.save(buffer, "PNG", optimize=True)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(png) else png
+
+
+class _Frame:
+    """A shot in flight: its hash is published before its object is known"""
+
+    def __init__(self, name):
+        self.name = name
+        self.hashed = Future()  # (pixel digest, (width, height))
+        self.stored = Future()  # object path
+
+
+class ScreenshotService:
+    def __init__(self, directory, mode=DEFAULT_MODE, workers=DEFAULT_WORKERS, dedup=True):
+        if mode not in MODES or mode == "element":
+            raise ValueError(f"default screenshot mode must be 'viewport' or 'full', not {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.dedup = dedup
+        self.shots = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="screenshots")
+        self._lock = threading.Lock()
+        self._last = {}
+        self._pending = []
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+
+    @profiled("screenshots")
+    def capture(self, page, name, mode=None, element=None):
+        """Grab a shot and queue it for encoding; returns the path it will be linked at"""
+        mode = "element" if element is not None else (mode or self.mode)
+        if mode not in MODES:
+            raise ValueError(f"unknown screenshot mode {mode!r}")
+        if mode == "element" and element is None:
+            raise ValueError("element mode needs an element")
+
+        started = time.monotonic()
+        if mode == "element":
+            png = element.screenshot(type="png")
+        else:
+            png = page.screenshot(type="png", full_page=mode == "full")
+        return self.add(page, name, png, mode, (time.monotonic() - started) * 1000)
+
+    def add(self, page, name, png, mode, capture_ms=0.0):
+        """
+        Queue a PNG grabbed elsewhere, e.g. by an async Playwright page; returns its path.
+
+        page is only the dedup key: a shot is compared with the previous one of the same page and mode.
+        """
+        shot = {"mode": mode, "capture_ms": round(capture_ms, 1), "raw_bytes": len(png)}
+
+        frame = _Frame(name)
+        with self._lock:
+            self.shots[name] = shot
+            # Element shots are compared with earlier shots of the same kind only
+            key = (page, mode)
+            previous = self._last.get(key)
+            self._last[key] = frame
+            self._pending.append(self._pool.submit(self._process, png, shot, frame, previous))
+        return os.path.join(self.directory, f"{name}.png")
+
+    def flush(self):
+        """Wait for every queued shot to be written"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️  Screenshot failed: {e}")
+
+    def close(self):
+        """Finish writing, save the manifest and stop the pool"""
+        self.flush()
+        self._pool.shutdown()
+        with open(os.path.join(self.directory, "screenshots.json"), "w") as f:
+            json.dump(self.shots, f, indent=2)
+        return self.summary()
+
+    def summary(self):
+        shots = list(self.shots.values())
+        return {
+            "mode": self.mode,
+            "shots": len(shots),
+            "duplicates": sum(1 for s in shots if s.get("duplicate_of")),
+            "capture_ms": round(sum(s["capture_ms"] for s in shots), 1),
+            "encode_ms": round(sum(s.get("encode_ms", 0) for s in shots), 1),
+            "raw_bytes": sum(s["raw_bytes"] for s in shots),
+            "stored_bytes": sum(s.get("stored_bytes", 0) for s in shots),
+        }
+
+    def print_report(self):
+        s = self.summary()
+        print(f"📸 Screenshots ({s['mode']}): {s['shots']} shots, {s['duplicates']} duplicates skipped, "
+              f"{s['capture_ms']:.0f}ms capturing, {s['encode_ms']:.0f}ms encoding in the background, "
+              f"{s['raw_bytes'] / 1e6:.1f}MB captured, {s['stored_bytes'] / 1e6:.1f}MB stored")
+
+    def _process(self, png, shot, frame, previous):
+        started = time.monotonic()
+        try:
+            pixels, size = pixel_digest(png), png_size(png)
+        except Exception as e:
+            frame.hashed.set_exception(e)
+            frame.stored.set_exception(e)
+            raise
+        frame.hashed.set_result((pixels, size))
+        shot.update({"pixels": pixels, "width": size[0], "height": size[1]})
+
+        try:
+            if self._is_duplicate(pixels, size, previous):
+                path = previous.stored.result()
+                shot["duplicate_of"] = previous.name
+            else:
+                path = self._store(png, shot)
+            self._link(path, frame.name)
+        except Exception as e:
+            frame.stored.set_exception(e)
+            raise
+        frame.stored.set_result(path)
+        shot["object"] = os.path.relpath(path, self.directory)
+        shot["encode_ms"] = round((time.monotonic() - started) * 1000, 1)
+
+    def _is_duplicate(self, pixels, size, previous):
+        if not self.dedup or previous is None:
+            return False
+        try:
+            previous_pixels, previous_size = previous.hashed.result()
+            previous.stored.result()
+        except Exception:
+            return False
+        return size == previous_size and pixels == previous_pixels
+
+    def _store(self, png, shot):
+        digest = hashlib.sha256(png).hexdigest()
+        path = os.path.join(self.directory, "objects", digest[:2], f"{digest}.png")
+        if os.path.exists(path):
+            shot["stored_bytes"] = 0
+            return path
+        data = encode(png)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+        shot["stored_bytes"] = len(data)
+        return path
+
+    def _link(self, path, name):
+        link = os.path.join(self.directory, f"{name}.png")
+        if os.path.lexists(link):
+            os.remove(link)
+        try:
+            os.link(path, link)
+        except OSError:
+            shutil.copyfile(path, link)
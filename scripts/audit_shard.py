@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Duration-aware sharding of the Playwright audit scripts.
+
+The tests are discovered from the scripts' source with ast, so nothing is
+imported or launched to list them:
+
+  * audit-main-page.py: the steps in AUDIT_TESTS, run after test_page_load;
+  * comprehensive-rounding-test.py: the methods in ROUNDING_TESTS, with
+    PERSISTING_TESTS kept together as one unit since they edit the same row;
+  * test-acvim-tracker.py and test_rounding_sheet.py: one test function each,
+    so the whole script is one unit.
+
+Each unit's cost is its median duration_s in perf_history. Units without
+history cost the median of their script, or DEFAULT_SECONDS. Units are placed
+longest first on the shard that would finish earliest (LPT), and a shard pays
+STARTUP_SECONDS plus the script's setup tests the first time it runs a script.
+Units that edit and save the first patient row (PERSISTING_TESTS, the code
+status test and test_rounding_sheet.py) all go on one shard, where they run one after another
+instead of racing on the same record.
+
+A shard process records its own partial run under "<suite>:shard"
+(perf_history.SHARD_ENV), so the regression gate never compares one shard's
+subset against its siblings. Once every shard is done, the results files of
+each suite are merged and recorded as one run of the suite.
+
+Every shard is a sequence of script processes, each with its own browser and
+its own $VETHUB_AUDIT_DIR, so concurrent runs of one script don't overwrite
+each other's screenshots and results. The results files are merged into
+<out>/shard-report.json.
+
+Usage:
+    python scripts/audit_shard.py --shards 4 [--scripts rounding,main-page] [--offline]
+    python scripts/audit_shard.py --shards 4 --plan
+"""
+
+import argparse
+import ast
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from perf_history import SHARD_ENV, record_run, test_durations
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+DEFAULT_OUT = "/tmp/vethub-shards"
+DEFAULT_SHARDS = 4
+
+# Browser launch and first page load of a script process
+STARTUP_SECONDS = 5.0
+DEFAULT_SECONDS = 10.0
+
+SCRIPTS = {
+    "main-page": {
+        "path": os.path.join(SCRIPTS_DIR, "audit-main-page.py"),
+        "suite": "main-page",
+        "run_list": "AUDIT_TESTS",
+        "setup": ["test_page_load"],
+        "results": "audit-results.json",
+    },
+    "rounding": {
+        "path": os.path.join(SCRIPTS_DIR, "comprehensive-rounding-test.py"),
+        "suite": "rounding",
+        "offline_suite": "rounding-offline",
+        "run_list": "ROUNDING_TESTS",
+        "groups": ["PERSISTING_TESTS"],
+        # Groups and tests that edit and save the first patient row
+        "first_row": ["PERSISTING_TESTS", "test_code_dropdown_colors"],
+        "results": "deep-audit-results.json",
+    },
+    "acvim": {
+        "path": os.path.join(SCRIPTS_DIR, "test-acvim-tracker.py"),
+        "suite": "acvim",
+        "offline_suite": "acvim-offline",
+        "results": "results.json",
+    },
+    "rounding-fixes": {
+        "path": os.path.join(REPO_ROOT, "test_rounding_sheet.py"),
+        # Edits and saves the first row's signalment
+        "first_row": True,
+    },
+}
+
+
+def _list_names(node):
+    """Names in a list literal of strings or identifiers"""
+    if not isinstance(node, ast.List):
+        return None
+    names = []
+    for element in node.elts:
+        if isinstance(element, ast.Constant) and isinstance(element.value, str):
+            names.append(element.value)
+        elif isinstance(element, ast.Name):
+            names.append(element.id)
+    return names
+
+
+def discover(path):
+    """(test defs, {list name: names}) of a script: module-level functions and class methods"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    tests, lists = [], {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name.startswith("test_"):
+            tests.append(node.name)
+        elif isinstance(node, ast.ClassDef):
+            tests += [item.name for item in node.body
+                      if isinstance(item, ast.FunctionDef) and item.name.startswith("test_")]
+        elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            names = _list_names(node.value)
+            if names is not None:
+                lists[node.targets[0].id] = names
+    return tests, lists
+
+
+def script_units(name, config):
+    """
+    Schedulable units of one script as lists of test names (None means the whole script),
+    all its tests, and whether each unit writes the first patient row
+    """
+    tests, lists = discover(config["path"])
+    run_list = lists.get(config.get("run_list"))
+    if run_list is None:
+        return [None], tests, [config.get("first_row") is True]
+
+    skipped = [test for test in tests if test not in run_list and test not in config.get("setup", [])]
+    if skipped:
+        print(f"ℹ️  {name}: {', '.join(skipped)} defined but not in {config['run_list']}")
+    units, grouped = [], set()
+    for group in config.get("groups", []):
+        members = [test for test in run_list if test in lists.get(group, [])]
+        if members:
+            units.append(members)
+            grouped.update(members)
+    units += [[test] for test in run_list if test not in grouped]
+    first_row = {test for name in config.get("first_row") or [] for test in lists.get(name, [name])}
+    return units, tests, [bool(first_row.intersection(unit)) for unit in units]
+
+
+def unit_costs(config, units, all_tests, offline=False):
+    """Estimated seconds per unit, plus the script's setup cost per process"""
+    suite = config.get("offline_suite") if offline else config.get("suite")
+    history = test_durations(suite) if suite else {}
+    known = [seconds for test, seconds in history.items() if test in all_tests or test in config.get("setup", [])]
+    fallback = statistics.median(known) if known else DEFAULT_SECONDS
+    setup = STARTUP_SECONDS + sum(history.get(test, 0) for test in config.get("setup", []))
+
+    costs = []
+    for unit in units:
+        # A whole-script unit is timed under its single test function
+        tests = all_tests if unit is None else unit
+        costs.append(sum(history.get(test, fallback) for test in tests) if tests else fallback)
+    return costs, setup
+
+
+def plan_shards(units, shard_count):
+    """
+    LPT schedule of units onto shard_count shards.
+
+    units: [{"script", "tests", "cost", "setup", "first_row"}]. The setup cost is
+    charged once per script per shard. Every first_row unit goes on the shard the
+    first of them was placed on. Returns [{"index", "predicted", "runs": {script: [unit, ...]}}].
+    """
+    shards = [{"index": i, "predicted": 0.0, "runs": {}} for i in range(shard_count)]
+    first_row_shard = None
+    for unit in sorted(units, key=lambda u: -u["cost"]):
+        def finish(shard):
+            extra = 0 if unit["script"] in shard["runs"] else unit["setup"]
+            return shard["predicted"] + extra + unit["cost"]
+        candidates = shards
+        if unit.get("first_row") and first_row_shard is not None:
+            candidates = [first_row_shard]
+        shard = min(candidates, key=lambda s: (finish(s), s["index"]))
+        if unit.get("first_row"):
+            first_row_shard = shard
+        shard["predicted"] = finish(shard)
+        shard["runs"].setdefault(unit["script"], []).append(unit)
+    return [shard for shard in shards if shard["runs"]]
+
+
+def read_outcomes(script, results):
+    """(passes, warnings, failures, failure details) from one script's results file"""
+    if script == "main-page":
+        return (len(results.get("successes", [])), len(results.get("warnings", [])), len(results.get("issues", [])),
+                [f"{i['category']}: {i['description']}" for i in results.get("issues", [])])
+    if script == "rounding":
+        return (len(results.get("passes", [])), len(results.get("warnings", [])), len(results.get("failures", [])),
+                [f"{f['test']}: {f['details']}" for f in results.get("failures", [])])
+    if script == "acvim":
+        entries = results.get("results", [])
+        failures = [e for e in entries if "FAIL" in e["result"]]
+        return (sum("PASS" in e["result"] for e in entries), sum("CHECK" in e["result"] for e in entries),
+                len(failures), [f"{e['test']}: {e['result']}" for e in failures])
+    return 0, 0, 0, []
+
+
+async def run_script(shard_dir, index, script, units, offline):
+    """Run one script process for the units of one shard; returns its run record"""
+    config = SCRIPTS[script]
+    out_dir = os.path.join(shard_dir, script)
+    os.makedirs(out_dir, exist_ok=True)
+    command = [sys.executable, config["path"]]
+    tests = [test for unit in units if unit["tests"] for test in unit["tests"]]
+    if tests:
+        command += ["--only", ",".join(tests)]
+    if offline and config.get("offline_suite"):
+        command.append("--offline")
+
+    log_path = os.path.join(out_dir, "output.log")
+    started = time.monotonic()
+    with open(log_path, "w") as log:
+        process = await asyncio.create_subprocess_exec(
+            *command, cwd=REPO_ROOT, stdout=log, stderr=asyncio.subprocess.STDOUT,
+            env={**os.environ, "VETHUB_AUDIT_DIR": out_dir, SHARD_ENV: str(index), "PYTHONUNBUFFERED": "1"})
+        returncode = await process.wait()
+    record = {
+        "script": script,
+        "tests": tests or None,
+        "returncode": returncode,
+        "seconds": round(time.monotonic() - started, 3),
+        "predicted": round(sum(unit["cost"] for unit in units) + units[0]["setup"], 1),
+        "log": log_path,
+        "results": None,
+        "timings": [],
+        "passes": 0, "warnings": 0, "failures": 0, "failure_details": [],
+    }
+    results_path = os.path.join(out_dir, config["results"]) if config.get("results") else None
+    if results_path and os.path.exists(results_path):
+        with open(results_path) as f:
+            results = json.load(f)
+        record["results"] = results_path
+        record["timings"] = results.get("timings", [])
+        passes, warnings, failures, details = read_outcomes(script, results)
+        record.update(passes=passes, warnings=warnings, failures=failures, failure_details=details)
+    icon = "✅" if returncode == 0 and not record["failures"] else "❌"
+    print(f"{icon} {os.path.basename(shard_dir)} {script}: {record['seconds']:.1f}s "
+          f"(predicted {record['predicted']:.1f}s), exit {returncode}")
+    return record
+
+
+async def run_shard(shard, out, offline):
+    shard_dir = os.path.join(out, f"shard-{shard['index']}")
+    started = time.monotonic()
+    records = []
+    for script, units in shard["runs"].items():
+        records.append(await run_script(shard_dir, shard["index"], script, units, offline))
+    return {"index": shard["index"], "predicted": round(shard["predicted"], 1),
+            "seconds": round(time.monotonic() - started, 3), "runs": records}
+
+
+async def run_shards(shards, out, offline):
+    return await asyncio.gather(*[run_shard(shard, out, offline) for shard in shards])
+
+
+def build_units(scripts, offline=False):
+    units = []
+    for name in scripts:
+        config = SCRIPTS[name]
+        script_tests, all_tests, first_row = script_units(name, config)
+        costs, setup = unit_costs(config, script_tests, all_tests, offline)
+        units += [{"script": name, "tests": tests, "cost": round(cost, 3), "setup": setup, "first_row": writes}
+                  for tests, cost, writes in zip(script_tests, costs, first_row)]
+    return units
+
+
+def merge_results(parts):
+    """One perf_history results dict from the results files of a suite's shards"""
+    merged = {"timestamp": min(part.get("timestamp") or "" for part in parts) or None,
+              "timings": [], "page_metrics": [], "traces": [], "profile": {"tests": []}}
+    for part in parts:
+        for key in ("timings", "page_metrics", "traces"):
+            merged[key] += part.get(key) or []
+        merged["profile"]["tests"] += (part.get("profile") or {}).get("tests", [])
+        if part.get("auto_save_latency") and "auto_save_latency" not in merged:
+            merged["auto_save_latency"] = part["auto_save_latency"]
+    return merged
+
+
+def record_merged_runs(runs, offline=False):
+    """Record one perf_history run per suite from the shards' results files"""
+    for script, config in SCRIPTS.items():
+        suite = config.get("offline_suite") if offline else config.get("suite")
+        paths = [run["results"] for run in runs if run["script"] == script and run["results"]]
+        if not suite or not paths:
+            continue
+        parts = []
+        for path in paths:
+            with open(path) as f:
+                parts.append(json.load(f))
+        record_run(suite, merge_results(parts), next((p["url"] for p in parts if p.get("url")), None))
+
+
+def print_plan(shards):
+    for shard in shards:
+        print(f"shard-{shard['index']}: predicted {shard['predicted']:.1f}s")
+        for script, units in shard["runs"].items():
+            names = [test + ("*" if unit["first_row"] else "")
+                     for unit in units for test in (unit["tests"] or ["(whole script)"])]
+            print(f"   {script}: {', '.join(names)}")
+
+
+def print_report(report):
+    print("\n" + "=" * 60)
+    print(f"SHARDED RUN: {report['shard_count']} shards")
+    print("=" * 60)
+    print(f"{'shard':<10} {'predicted s':>12} {'actual s':>10}  scripts")
+    for shard in report["shards"]:
+        scripts = ", ".join(run["script"] for run in shard["runs"])
+        print(f"shard-{shard['index']:<4} {shard['predicted']:>12.1f} {shard['seconds']:>10.1f}  {scripts}")
+    print(f"\nWork {report['work_s']:.1f}s, wall {report['wall_s']:.1f}s, "
+          f"ideal {report['ideal_s']:.1f}s (work / shards), efficiency {report['efficiency']:.0%}")
+    totals = report["totals"]
+    print(f"✅ {totals['passes']} passes  ⚠️  {totals['warnings']} warnings  ❌ {totals['failures']} failures")
+    for shard in report["shards"]:
+        for run in shard["runs"]:
+            for detail in run["failure_details"]:
+                print(f"   [{run['script']}] {detail}")
+            if run["returncode"] != 0:
+                print(f"   [{run['script']}] exited {run['returncode']}, see {run['log']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the audit scripts in duration-balanced shards")
+    parser.add_argument("--shards", type=int, default=DEFAULT_SHARDS,
+                        help=f"concurrent script processes (default {DEFAULT_SHARDS})")
+    parser.add_argument("--scripts", default=",".join(SCRIPTS),
+                        help=f"comma-separated scripts to include (default: {','.join(SCRIPTS)})")
+    parser.add_argument("--offline", action="store_true",
+                        help="pass --offline to the scripts that support it and use their offline history")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"output directory (default {DEFAULT_OUT})")
+    parser.add_argument("--plan", action="store_true", help="print the schedule without running it")
+    args = parser.parse_args(argv)
+
+    scripts = args.scripts.split(",")
+    unknown = set(scripts) - set(SCRIPTS)
+    if unknown:
+        parser.error(f"unknown scripts: {', '.join(sorted(unknown))}")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+
+    shards = plan_shards(build_units(scripts, args.offline), args.shards)
+    print_plan(shards)
+    print("* edits the first patient row; these share one shard")
+    if args.plan:
+        return 0
+
+    os.makedirs(args.out, exist_ok=True)
+    started = time.monotonic()
+    results = asyncio.run(run_shards(shards, args.out, args.offline))
+    wall = time.monotonic() - started
+
+    runs = [run for shard in results for run in shard["runs"]]
+    work = sum(run["seconds"] for run in runs)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "shard_count": len(results),
+        "wall_s": round(wall, 3),
+        "work_s": round(work, 3),
+        "ideal_s": round(work / len(results), 3),
+        "efficiency": round(work / len(results) / wall, 3) if wall else None,
+        "totals": {key: sum(run[key] for run in runs) for key in ("passes", "warnings", "failures")},
+        "timings": [{"script": run["script"], **timing} for run in runs for timing in run["timings"]],
+        "shards": results,
+    }
+    print_report(report)
+    report_path = os.path.join(args.out, "shard-report.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Merged report saved to: {report_path}")
+    record_merged_runs(runs, args.offline)
+    return 1 if report["totals"]["failures"] or any(run["returncode"] for run in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Small statistics helpers shared by the audit, benchmark and load scripts.
+"""
+
+import math
+import statistics
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None for an empty list)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    # pct * n first, so an exact rank like p7 of 100 isn't nudged up by 0.07 * 100
+    rank = max(1, math.ceil(pct * len(ordered) / 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def distribution(values, scale=1.0, digits=1):
+    """p50/p95/max/count summary, with values multiplied by scale (e.g. 1000 for s -> ms)"""
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "max": None}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50) * scale, digits),
+        "p95": round(percentile(values, 95) * scale, digits),
+        "max": round(max(values) * scale, digits),
+    }
+
+
+def mann_kendall(values, alpha=0.01):
+    """
+    Mann-Kendall test for a monotonic trend, with the tie correction.
+
+    Returns S, the normal-approximation z and two-sided p value, and "increasing",
+    "decreasing" or "none" at significance alpha. Fewer than 4 values can't show a trend.
+    """
+    n = len(values)
+    if n < 4:
+        return {"n": n, "s": 0, "z": None, "p": None, "trend": "none"}
+    s = sum((b > a) - (b < a) for i, a in enumerate(values) for b in values[i + 1:])
+    ties = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5) - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0 or s == 0:
+        z = 0.0
+    else:
+        z = (s - 1 if s > 0 else s + 1) / math.sqrt(variance)
+    p = math.erfc(abs(z) / math.sqrt(2))
+    trend = "none"
+    if p < alpha:
+        trend = "increasing" if z > 0 else "decreasing"
+    return {"n": n, "s": s, "z": round(z, 3), "p": p, "trend": trend}
+
+
+def theil_sen_slope(xs, ys):
+    """Median of the pairwise slopes; robust to the odd GC spike"""
+    slopes = [(ys[j] - ys[i]) / (xs[j] - xs[i])
+              for i in range(len(xs)) for j in range(i + 1, len(xs)) if xs[j] != xs[i]]
+    return statistics.median(slopes) if slopes else None
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Chrome trace capture around single UI interactions.
+
+    with InteractionTrace(page, "code-select", directory) as trace:
+        code_select.select_option("Green")
+        wait_for_ui_settle(page)
+    trace.summary  # also appended to `into` when one is given
+
+The trace starts before the block and stops after it. It is parsed in Python
+into a summary of the renderer main thread:
+
+  * long tasks: top-level tasks over 50ms, their total and the blocking time
+    (the part of each long task beyond 50ms, as in Total Blocking Time);
+  * self time per category (scripting, style & layout, paint & composite), so
+    nested events are not counted twice;
+  * the top React components by self time, from the V8 CPU profile samples. A
+    sample is charged to the innermost PascalCase function on its stack, which
+    is the component React called. Minified production builds have no such
+    names, so the list is empty there.
+
+The raw trace is kept as <directory>/traces/<name>.json.gz and opens in the
+DevTools Performance panel. Tracing is per browser, so only one interaction
+per browser can be traced at a time; the parallel lanes each own a browser.
+"""
+
+import gzip
+import json
+import os
+import re
+import time
+
+CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "toplevel",
+    "v8.execute",
+    "blink.user_timing",
+    "disabled-by-default-v8.cpu_profiler",
+]
+
+LONG_TASK_MS = 50
+TOP_COMPONENTS = 10
+TOP_TASKS = 5
+
+# Trace event name -> summary category
+EVENT_CATEGORIES = {
+    "scripting": {"EvaluateScript", "FunctionCall", "TimerFire", "EventDispatch", "RunMicrotasks",
+                  "FireAnimationFrame", "FireIdleCallback", "v8.compile", "v8.compileModule", "V8.Execute",
+                  "v8.callFunction", "v8.evaluateModule", "XHRReadyStateChange", "XHRLoad", "GCEvent",
+                  "MajorGC", "MinorGC", "V8.GCScavenger", "V8.GCFinalizeMC", "ParseHTML"},
+    "layout": {"Layout", "UpdateLayoutTree", "RecalculateStyles", "UpdateLayerTree", "HitTest",
+               "UpdateLayoutTree::Recalc", "ScrollLayer"},
+    "paint": {"Paint", "PaintImage", "PrePaint", "Layerize", "CompositeLayers", "Commit",
+              "RasterTask", "Decode Image", "PaintSetup"},
+}
+CATEGORY_OF = {name: category for category, names in EVENT_CATEGORIES.items() for name in names}
+TASK_EVENTS = {"RunTask", "ThreadControllerImpl::RunTask", "ThreadControllerImpl::DoWork"}
+
+COMPONENT_NAME = re.compile(r"^[A-Z][A-Za-z0-9]*$")
+
+
+def _main_threads(events):
+    """(pid, tid) of every renderer main thread in the trace"""
+    return {(e["pid"], e["tid"]) for e in events
+            if e.get("ph") == "M" and e.get("name") == "thread_name"
+            and e.get("args", {}).get("name") == "CrRendererMain"}
+
+
+def _complete_events(events, thread):
+    """Duration events of one thread as (start, end, name), B/E pairs folded into one"""
+    spans, open_spans = [], []
+    for e in events:
+        if (e.get("pid"), e.get("tid")) != thread:
+            continue
+        ph = e.get("ph")
+        if ph == "X" and "dur" in e:
+            spans.append((e["ts"], e["ts"] + e["dur"], e["name"]))
+        elif ph == "B":
+            open_spans.append(e)
+        elif ph == "E" and open_spans:
+            begin = open_spans.pop()
+            spans.append((begin["ts"], e["ts"], begin["name"]))
+    # Parents first when two events start together
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    return spans
+
+
+def self_times(spans):
+    """Self time (µs) per span: its duration minus that of its direct children"""
+    selves = [end - start for start, end, _ in spans]
+    stack = []
+    for index, (start, end, _) in enumerate(spans):
+        while stack and spans[stack[-1]][1] <= start:
+            stack.pop()
+        if stack:
+            parent = stack[-1]
+            selves[parent] -= min(end, spans[parent][1]) - start
+        stack.append(index)
+    return selves
+
+
+def component_self_times(events, thread):
+    """Self time (ms) per React component name from the CPU profile samples of a renderer"""
+    nodes, totals = {}, {}
+    for e in events:
+        # Chunks come from the profiler thread, so match the renderer process only
+        if e.get("name") != "ProfileChunk" or e.get("pid") != thread[0]:
+            continue
+        data = e.get("args", {}).get("data", {})
+        profile = data.get("cpuProfile", {})
+        for node in profile.get("nodes", []):
+            nodes[(e.get("id"), node["id"])] = (node.get("parent"), node.get("callFrame", {}).get("functionName", ""))
+        for node_id, delta in zip(profile.get("samples", []), data.get("timeDeltas", [])):
+            key = (e.get("id"), node_id)
+            while key in nodes:
+                parent, name = nodes[key]
+                if COMPONENT_NAME.match(name):
+                    totals[name] = totals.get(name, 0) + max(delta, 0)
+                    break
+                key = (key[0], parent)
+    return {name: round(us / 1000, 1) for name, us in totals.items()}
+
+
+def summarize(trace):
+    """Main-thread summary of a parsed trace (dict or list of events)"""
+    events = trace["traceEvents"] if isinstance(trace, dict) else trace
+    threads = _main_threads(events)
+    if not threads:
+        return {"error": "no renderer main thread in trace"}
+
+    # The page's renderer is the busiest one; extensions and service workers are idle
+    by_thread = {thread: _complete_events(events, thread) for thread in threads}
+    thread = max(by_thread, key=lambda t: sum(end - start for start, end, name in by_thread[t] if name in TASK_EVENTS))
+    spans = by_thread[thread]
+    if not spans:
+        return {"error": "no main-thread events in trace"}
+
+    categories = {"scripting": 0, "layout": 0, "paint": 0, "other": 0}
+    for (_, _, name), self_time in zip(spans, self_times(spans)):
+        categories[CATEGORY_OF.get(name, "other")] += self_time
+
+    # Top-level tasks only: a RunTask nested in another is part of its parent
+    tasks, task_end = [], 0
+    for start, end, name in spans:
+        if name in TASK_EVENTS and start >= task_end:
+            tasks.append((start, end))
+            task_end = end
+    long_tasks = sorted(((end - start) / 1000 for start, end in tasks if end - start > LONG_TASK_MS * 1000),
+                        reverse=True)
+
+    components = component_self_times(events, thread)
+    return {
+        "wall_ms": round((max(end for _, end, _ in spans) - spans[0][0]) / 1000, 1),
+        "tasks": len(tasks),
+        "long_tasks": len(long_tasks),
+        "long_task_ms": round(sum(long_tasks), 1),
+        "longest_tasks_ms": [round(ms, 1) for ms in long_tasks[:TOP_TASKS]],
+        "blocking_ms": round(sum(ms - LONG_TASK_MS for ms in long_tasks), 1),
+        "scripting_ms": round(categories["scripting"] / 1000, 1),
+        "layout_ms": round(categories["layout"] / 1000, 1),
+        "paint_ms": round(categories["paint"] / 1000, 1),
+        "other_ms": round(categories["other"] / 1000, 1),
+        "components": [{"name": name, "self_ms": ms}
+                       for name, ms in sorted(components.items(), key=lambda item: -item[1])[:TOP_COMPONENTS]],
+    }
+
+
+class InteractionTrace:
+    """Context manager that traces the browser around one interaction"""
+
+    def __init__(self, page, name, directory=None, into=None):
+        self.page = page
+        self.name = name
+        self.path = os.path.join(directory, "traces", f"{name}.json.gz") if directory else None
+        self.into = into
+        self.summary = None
+
+    def __enter__(self):
+        self.browser = self.page.context.browser
+        self.browser.start_tracing(page=self.page, categories=CATEGORIES)
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.monotonic() - self.started
+        raw = self.browser.stop_tracing()
+        if self.path:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with gzip.open(self.path, "wb") as f:
+                f.write(raw)
+        try:
+            summary = summarize(json.loads(raw))
+        except ValueError as e:
+            summary = {"error": f"unreadable trace: {e}"}
+        self.summary = {"name": self.name, "seconds": round(elapsed, 3), "trace": self.path, **summary}
+        print_summary(self.summary)
+        if self.into is not None:
+            self.into.append(self.summary)
+        return False
+
+
+def print_summary(summary):
+    if "error" in summary:
+        print(f"🔬 Trace {summary['name']}: {summary['error']}")
+        return
+    print(f"🔬 Trace {summary['name']}: {summary['long_tasks']} long tasks ({summary['blocking_ms']}ms blocking), "
+          f"scripting {summary['scripting_ms']}ms, layout {summary['layout_ms']}ms, paint {summary['paint_ms']}ms")
+    if summary["components"]:
+        top = ", ".join(f"{c['name']} {c['self_ms']}ms" for c in summary["components"][:3])
+        print(f"   top components: {top}")
+
+
+def print_report(summaries):
+    """Table of every traced interaction of a run"""
+    if not summaries:
+        return
+    print("\n" + "=" * 60)
+    print("INTERACTION TRACES")
+    print("=" * 60)
+    print(f"{'interaction':<24} {'long':>5} {'block ms':>9} {'script ms':>10} {'layout ms':>10} {'paint ms':>9}  top component")
+    for s in summaries:
+        if "error" in s:
+            print(f"{s['name']:<24} {s['error']}")
+            continue
+        top = f"{s['components'][0]['name']} {s['components'][0]['self_ms']}ms" if s["components"] else "-"
+        print(f"{s['name']:<24} {s['long_tasks']:>5} {s['blocking_ms']:>9} {s['scripting_ms']:>10} "
+              f"{s['layout_ms']:>10} {s['paint_ms']:>9}  {top}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Viewport matrix for the responsive checks.
+
+    results = run_matrix(f"{BASE_URL}/rounding", probe_options={"buttons": "table button"},
+                         shots=shots, events=events, metrics=metrics, prefix="08-viewport")
+    for result in results:
+        result["findings"] += responsive_findings(result)
+    print_report([summary(result) for result in results])
+
+Instead of resizing and reloading one shared page per device, every profile in
+PROFILES gets its own browser context with the profile's viewport, pixel ratio
+and touch support. All of them load the page at the same time. Each context
+waits for hydration, takes a screenshot and reads the page with the
+audit_probe script in one round-trip. The assertions then run in Python over
+the collected facts, so the wall time of the matrix is about that of its
+slowest profile, and a new device is one more entry in PROFILES.
+
+The sync Playwright API can't drive several pages of one browser at once, so
+the matrix runs the async API on its own event loop in a worker thread. That
+also keeps it usable from inside a script's sync_playwright block. The
+matrix's contexts are separate from the caller's, so what they share with it
+is passed in: the caller's ScreenshotService, EventSink and PageMetrics (shots
+land in the same manifest, console errors in the same stream), its
+storage_state for cookies, and api_url to route /api/ to the fake backend like
+route_api.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from audit_metrics import COLLECT_JS, VITALS_INIT_JS
+from audit_probe import PROBE_JS, probe_spec, small_targets
+from audit_waits import HYDRATED_JS
+from fake_backend import route_api_async
+
+PROFILES = {
+    "phone": {"viewport": {"width": 375, "height": 812}, "device_scale_factor": 3,
+              "is_mobile": True, "has_touch": True},
+    # The tablets on the wards, in portrait
+    "ward-tablet": {"viewport": {"width": 768, "height": 1024}, "device_scale_factor": 2,
+                    "is_mobile": True, "has_touch": True},
+    "workstation": {"viewport": {"width": 1440, "height": 900}},
+}
+
+# Below this width a layout is expected to scroll its wide tables horizontally
+NARROW_WIDTH = 600
+LOAD_TIMEOUT_MS = 30000
+HYDRATION_TIMEOUT_MS = 15000
+
+
+async def _run_profile(browser, name, profile, url, spec, services, prefix, api_url, storage_state):
+    shots, events, metrics = services
+    started = time.monotonic()
+    result = {"profile": name, "viewport": profile["viewport"], "touch": profile.get("has_touch", False),
+              "load_s": None, "facts": None, "screenshot": None, "console_errors": 0, "findings": [], "error": None}
+    context = await browser.new_context(**profile, **({"storage_state": storage_state} if storage_state else {}))
+    try:
+        if api_url:
+            await route_api_async(context, api_url)
+        if metrics:
+            await context.add_init_script(VITALS_INIT_JS)
+        page = await context.new_page()
+        if events:
+            events.attach(page)
+
+        def count_error(*_):
+            result["console_errors"] += 1
+
+        page.on("console", lambda msg: count_error() if msg.type == "error" else None)
+        page.on("pageerror", count_error)
+
+        await page.goto(url, wait_until="networkidle", timeout=LOAD_TIMEOUT_MS)
+        try:
+            await page.wait_for_function(HYDRATED_JS, timeout=HYDRATION_TIMEOUT_MS)
+        except Exception:
+            # Like wait_for_hydration: go on and let the checks see what rendered
+            pass
+        result["load_s"] = round(time.monotonic() - started, 3)
+        if shots:
+            shot_started = time.monotonic()
+            png = await page.screenshot(type="png", full_page=shots.mode == "full")
+            result["screenshot"] = shots.add(page, f"{prefix}-{name}", png, shots.mode,
+                                             (time.monotonic() - shot_started) * 1000)
+        result["facts"] = await page.evaluate(PROBE_JS, spec)
+        if metrics:
+            metrics.add(page.url, f"viewport:{name}", await page.evaluate(COLLECT_JS))
+    except Exception as e:
+        result["error"] = str(e)
+    finally:
+        await context.close()
+    result["seconds"] = round(time.monotonic() - started, 3)
+    return result
+
+
+async def _run_matrix(url, profiles, spec, services, prefix, api_url, storage_state, headless):
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        try:
+            return await asyncio.gather(*[
+                _run_profile(browser, name, profile, url, spec, services, prefix, api_url, storage_state)
+                for name, profile in profiles.items()
+            ])
+        finally:
+            await browser.close()
+
+
+def run_matrix(url, profiles=None, probe_options=None, shots=None, events=None, metrics=None, prefix="viewport",
+               api_url=None, storage_state=None, headless=True):
+    """
+    Load url in one context per profile concurrently; returns one result per profile.
+
+    Each result has the profile's name, viewport, touch flag, load time, screenshot
+    path, console error count and the audit_probe facts, or an error if the page
+    could not be read. "findings" starts empty for the caller's checks. shots,
+    events and metrics are the caller's ScreenshotService, EventSink and PageMetrics;
+    storage_state is a Playwright storage state (dict or path) for the contexts.
+    """
+    profiles = profiles or PROFILES
+    spec = probe_spec(**(probe_options or {}))
+    services = (shots, events, metrics)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="viewports") as pool:
+        results = pool.submit(asyncio.run, _run_matrix(url, profiles, spec, services, prefix, api_url,
+                                                       storage_state, headless)).result()
+    elapsed = time.monotonic() - started
+    serial = sum(r["seconds"] for r in results)
+    print(f"📱 Viewport matrix: {len(results)} profiles in {elapsed:.1f}s (serial work {serial:.1f}s)")
+    return list(results)
+
+
+def responsive_findings(result):
+    """
+    (level, message) for the checks every page shares: console errors, horizontal overflow and tap targets.
+
+    level is an issue severity ("high", "medium") or "warning".
+    """
+    facts = result["facts"]
+    width = result["viewport"]["width"]
+    findings = []
+    if result["console_errors"]:
+        findings.append(("warning", f"{result['console_errors']} console errors at {width}px"))
+    if facts["scroll_width"] > width:
+        findings.append(("medium", f"Page scrolls horizontally ({facts['scroll_width']}px content in {width}px)"))
+    if result["touch"]:
+        visible = [b for b in facts["buttons"] if b["box"]]
+        small = small_targets(visible)
+        if small:
+            names = ", ".join(sorted({b["name"] or b["text"] or "(unnamed)" for b in small})[:3])
+            findings.append(("medium", f"{len(small)} of {len(visible)} buttons below minimum tap target "
+                                      f"size (e.g. {names})"))
+    return findings
+
+
+def summary(result):
+    """A result without the raw probe facts, for reports and results files"""
+    facts = result["facts"] or {}
+    return {
+        **{key: value for key, value in result.items() if key != "facts"},
+        "buttons": len(facts.get("buttons", [])),
+        "overflow_px": max(0, facts["scroll_width"] - result["viewport"]["width"]) if facts else None,
+    }
+
+
+def print_report(summaries):
+    """Per-viewport table of run_matrix summaries"""
+    if not summaries:
+        return
+    print("\n" + "=" * 60)
+    print("VIEWPORT MATRIX")
+    print("=" * 60)
+    print(f"{'profile':<14} {'viewport':>10} {'load s':>7} {'buttons':>8} {'overflow':>9} {'errors':>7}  findings")
+    for s in summaries:
+        size = f"{s['viewport']['width']}x{s['viewport']['height']}"
+        if s["error"]:
+            print(f"{s['profile']:<14} {size:>10}  ❌ {s['error'][:80]}")
+            continue
+        print(f"{s['profile']:<14} {size:>10} {s['load_s']:>7.1f} {s['buttons']:>8} {s['overflow_px']:>7}px "
+              f"{s['console_errors']:>7}  {len(s['findings']) or '-'}")
+        for level, message in s["findings"]:
+            print(f"   {'⚠️ ' if level == 'warning' else '❌'} {message}")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Event-driven wait helpers for the Playwright audit scripts.
+
+Each helper waits for the event a fixed sleep used to stand in for (a save
+request finishing, a toast appearing, React hydrating) and records the fixed
+budget it replaced, so a run can report how much waiting time it saved.
+
+Helpers never raise on timeout - like the sleeps they replace, they return and
+let the test's own assertions decide what happened. Their time counts as
+waiting in the audit_profile phase breakdown.
+"""
+
+import re
+import threading
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from audit_profile import profiled
+
+PATIENT_URL = re.compile(r"/api/patients/\d+/?(\?|$)")
+
+# True once React has attached to the document (app router hydrates the whole document)
+HYDRATED_JS = """
+() => document.readyState === 'complete' &&
+    [document, document.body].some(node =>
+        Object.keys(node).some(k => k.startsWith('__reactContainer') || k.startsWith('__reactFiber')))
+"""
+
+# Resolves after the browser has painted twice, i.e. React has committed and laid out
+TWO_FRAMES_JS = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
+
+
+class WaitLedger:
+    """Records how long each wait took against the fixed sleep it replaced"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.entries = []
+
+    def record(self, helper, budget, elapsed, ok):
+        with self._lock:
+            self.entries.append({"helper": helper, "budget": budget, "elapsed": elapsed, "ok": ok})
+
+    def summary(self):
+        with self._lock:
+            entries = list(self.entries)
+
+        by_helper = {}
+        for e in entries:
+            h = by_helper.setdefault(e["helper"], {"calls": 0, "budget_seconds": 0.0,
+                                                   "waited_seconds": 0.0, "timeouts": 0})
+            h["calls"] += 1
+            h["budget_seconds"] += e["budget"]
+            h["waited_seconds"] += e["elapsed"]
+            h["timeouts"] += 0 if e["ok"] else 1
+
+        budget = sum(e["budget"] for e in entries)
+        waited = sum(e["elapsed"] for e in entries)
+        return {
+            "waits": len(entries),
+            "budget_seconds": round(budget, 2),
+            "waited_seconds": round(waited, 2),
+            "saved_seconds": round(budget - waited, 2),
+            "by_helper": {name: {k: round(v, 2) if isinstance(v, float) else v for k, v in h.items()}
+                          for name, h in by_helper.items()},
+        }
+
+    def print_report(self):
+        s = self.summary()
+        print(f"⏱️  Waits: {s['waits']} calls, {s['waited_seconds']}s waited "
+              f"vs {s['budget_seconds']}s of fixed sleeps (saved {s['saved_seconds']}s)")
+        for name, h in sorted(s["by_helper"].items(), key=lambda kv: -kv[1]["budget_seconds"]):
+            timeouts = f", {h['timeouts']} timed out" if h["timeouts"] else ""
+            print(f"   {name}: {h['calls']}x, {h['waited_seconds']}s / {h['budget_seconds']}s{timeouts}")
+
+
+LEDGER = WaitLedger()
+
+
+def _finish(helper, budget, started, ok):
+    LEDGER.record(helper, budget, time.monotonic() - started, ok)
+    return ok
+
+
+@profiled("waits")
+def wait_for_hydration(page, budget=2.0, timeout=15000):
+    """Wait for React hydration to finish (replaces the post-load sleep)"""
+    started = time.monotonic()
+    try:
+        page.wait_for_function(HYDRATED_JS, timeout=timeout)
+        ok = True
+    except PlaywrightTimeoutError:
+        ok = False
+    return _finish("hydration", budget, started, ok)
+
+
+@profiled("waits")
+def wait_for_ui_settle(page, budget=0.3):
+    """Wait for the next painted frame after a click, fill or resize"""
+    started = time.monotonic()
+    page.evaluate(TWO_FRAMES_JS)
+    return _finish("ui_settle", budget, started, True)
+
+
+@profiled("waits")
+def wait_for_element(page, selector, budget=0.5, timeout=3000):
+    """Wait for the first element matching selector to become visible"""
+    started = time.monotonic()
+    try:
+        page.locator(selector).first.wait_for(state="visible", timeout=timeout)
+        ok = True
+    except PlaywrightTimeoutError:
+        ok = False
+    return _finish("element", budget, started, ok)
+
+
+@profiled("waits")
+def wait_for_toast(page, text="Saved", budget=1.0, timeout=5000):
+    """Wait for a toast or status message containing text"""
+    started = time.monotonic()
+    try:
+        page.get_by_text(text).first.wait_for(state="visible", timeout=timeout)
+        ok = True
+    except PlaywrightTimeoutError:
+        ok = False
+    return _finish(f"toast:{text}", budget, started, ok)
+
+
+@profiled("waits")
+def wait_for_response(page, action, url, method=None, budget=2.0, timeout=15000, helper="response"):
+    """
+    Run action() and wait for the response to the request it triggers.
+
+    url is a regex (or compiled pattern) matched against the request URL.
+    Returns the Response, or None if nothing matching completed in time.
+    """
+    pattern = re.compile(url) if isinstance(url, str) else url
+
+    def matches(response):
+        request = response.request
+        return bool(pattern.search(request.url)) and (method is None or request.method == method)
+
+    started = time.monotonic()
+    try:
+        with page.expect_response(matches, timeout=timeout) as info:
+            action()
+        response = info.value
+    except PlaywrightTimeoutError:
+        response = None
+    _finish(helper, budget, started, response is not None)
+    return response
+
+
+@profiled("waits")
+def wait_for_patient_save(page, action, budget=2.0, timeout=15000):
+    """Run action() and wait for the PATCH to /api/patients/[id] it triggers"""
+    return wait_for_response(page, action, PATIENT_URL, method="PATCH",
+                             budget=budget, timeout=timeout, helper="patient_save")
+
+
+@profiled("waits")
+def wait_for_network_quiet(page, action=None, quiet_ms=250, budget=1.0, timeout=10000):
+    """
+    Run action() (if given) and wait until no requests have been in flight for quiet_ms.
+
+    Unlike wait_for_load_state('networkidle'), this also covers fetches started by
+    client-side interactions after the page has loaded.
+    """
+    in_flight = set()
+    on_request = in_flight.add
+    on_done = in_flight.discard
+
+    page.on("request", on_request)
+    page.on("requestfinished", on_done)
+    page.on("requestfailed", on_done)
+
+    started = time.monotonic()
+    ok = False
+    try:
+        if action:
+            action()
+        quiet_since = time.monotonic()
+        while (time.monotonic() - started) * 1000 < timeout:
+            page.wait_for_timeout(50)  # Lets Playwright dispatch request events
+            if in_flight:
+                quiet_since = time.monotonic()
+            elif (time.monotonic() - quiet_since) * 1000 >= quiet_ms:
+                ok = True
+                break
+    finally:
+        page.remove_listener("request", on_request)
+        page.remove_listener("requestfinished", on_done)
+        page.remove_listener("requestfailed", on_done)
+    return _finish("network_quiet", budget, started, ok)
+
+
+@profiled("waits")
+def wait_until(page, predicate, budget=0.5, timeout=3000, helper="condition"):
+    """Poll a Python-side predicate (e.g. a flag set by a dialog handler)"""
+    started = time.monotonic()
+    ok = predicate()
+    while not ok and (time.monotonic() - started) * 1000 < timeout:
+        page.wait_for_timeout(25)  # Lets Playwright dispatch page events
+        ok = predicate()
+    return _finish(helper, budget, started, ok)
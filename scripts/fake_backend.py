@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the VetHub API routes the audit suites touch.
+
+A small asyncio HTTP server keeps patients, tasks, rounds sheets and the
+ACVIM / residency records in memory, seeded with the same fixture patients as
+the benchmarks. It mirrors what the Next.js routes return (roundingData is
+merged on PATCH, patients come back newest first, missing rounds sheets are
+null) so pages render and save exactly as against Postgres, without the WAN
+round trip and without touching real patient records.
+
+The audit scripts start it in a background thread with --offline and route
+**/api/** from the browser context to it, so the page itself still comes from
+BASE_URL. Timestamps come from a fixed seed clock, so every run starts from
+the same state.
+
+Standalone:
+    python scripts/fake_backend.py --port 4010
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from rounding_fixtures import ROUNDING_FIELD_ORDER, tsv_rows
+
+DEFAULT_PORT = 4010
+SEED_TIME = datetime(2026, 1, 5, 8, 0, tzinfo=timezone.utc)
+
+# Defaults POST /api/patients applies before the request's roundingData
+DEFAULT_ROUNDING = {"location": "IP", "icuCriteria": "N", "code": "Yellow", "ivc": "Yes", "fluids": "n/a", "cri": "n/a"}
+
+# Merged rather than replaced by PATCH /api/patients/[id]
+MERGED_PATIENT_FIELDS = ("roundingData", "mriData")
+PATIENT_FIELDS = ("status", "type", "demographics", "medicalHistory", "currentStay", "roundingData", "mriData",
+                  "stickerData", "appointmentInfo", "lastAccessedBy")
+
+TASK_FIELDS = ("title", "description", "category", "timeOfDay", "priority", "assignedTo", "dueDate", "completed")
+
+COUNTER_FIELDS = ("mriCount", "recheckCount", "newConsultCount", "newCount", "emergencyCount", "commsCount",
+                  "totalCases")
+
+
+class FakeStore:
+    """In-memory records plus the route table that serves them"""
+
+    def __init__(self):
+        self._tick = 0
+        self._ids = {}
+        self.patients = []
+        self.general_tasks = []
+        self.rounds_sheets = {}
+        self.collections = {"cases": [], "journal-club": [], "weekly-schedule": [], "surgery": []}
+        self.daily_entries = {}
+        self.profile = None
+        self.certificate_status = {"id": "singleton"}
+        self.requests = 0
+        self.unhandled = {}
+        self.routes = [
+            ("GET", r"/api/patients", self.list_patients),
+            ("POST", r"/api/patients", self.create_patient),
+            ("GET", r"/api/patients/(\d+)", self.get_patient),
+            ("PATCH", r"/api/patients/(\d+)", self.update_patient),
+            ("DELETE", r"/api/patients/(\d+)", self.delete_patient),
+            ("GET", r"/api/tasks/patients/(\d+)/tasks", self.list_patient_tasks),
+            ("POST", r"/api/tasks/patients/(\d+)/tasks", self.create_patient_task),
+            ("PATCH", r"/api/tasks/patients/(\d+)/tasks/([^/]+)", self.update_patient_task),
+            ("DELETE", r"/api/tasks/patients/(\d+)/tasks/([^/]+)", self.delete_patient_task),
+            ("GET", r"/api/tasks/general", self.list_general_tasks),
+            ("POST", r"/api/tasks/general", self.create_general_task),
+            ("PATCH", r"/api/tasks/general", self.update_general_task),
+            ("DELETE", r"/api/tasks/general", self.delete_general_task),
+            ("POST", r"/api/tasks/refresh", self.refresh_tasks),
+            ("GET", r"/api/rounds-sheets", self.get_rounds_sheet),
+            ("POST", r"/api/rounds-sheets", self.save_rounds_sheet),
+            ("DELETE", r"/api/rounds-sheets", self.delete_rounds_sheet),
+            ("GET", r"/api/acvim/profile", lambda query, body: (200, self.profile)),
+            ("POST", r"/api/acvim/profile", self.save_profile),
+            ("PUT", r"/api/acvim/profile", self.save_profile),
+            ("GET", r"/api/acvim/certificate-status", lambda query, body: (200, self.certificate_status)),
+            ("PUT", r"/api/acvim/certificate-status", self.update_certificate_status),
+            ("GET", r"/api/acvim/(cases|journal-club|weekly-schedule)", self.list_collection),
+            ("POST", r"/api/acvim/(cases|journal-club|weekly-schedule)", self.create_in_collection),
+            ("PUT", r"/api/acvim/(cases|journal-club|weekly-schedule)", self.update_in_collection),
+            ("DELETE", r"/api/acvim/(cases|journal-club|weekly-schedule)", self.delete_from_collection),
+            ("GET", r"/api/residency/(surgery)", self.list_collection),
+            ("POST", r"/api/residency/(surgery)", self.create_in_collection),
+            ("PATCH", r"/api/residency/(surgery)", self.update_in_collection),
+            ("DELETE", r"/api/residency/(surgery)", self.delete_from_collection),
+            ("GET", r"/api/residency/daily-entry", self.get_daily_entries),
+            ("POST", r"/api/residency/daily-entry", self.save_daily_entry),
+            ("POST", r"/api/residency/quick-increment", self.quick_increment),
+            ("GET", r"/api/residency/stats", self.residency_stats),
+            ("GET", r"/api/residency/milestones", self.milestones),
+            ("POST", r"/api/residency/milestones", lambda query, body: (200, {"success": True})),
+            ("GET", r"/api/residency/pending-surgeries", lambda query, body: (200, [])),
+        ]
+        self.routes = [(method, re.compile(pattern + "/?"), handler) for method, pattern, handler in self.routes]
+        self.seed()
+
+    def seed(self):
+        """Fixture patients from the rounding sheet template rows, plus one general task"""
+        for name, signalment, *values in tsv_rows():
+            rounding = dict(zip(ROUNDING_FIELD_ORDER, values))
+            rounding["signalment"] = signalment
+            self.create_patient({}, {"status": "Active", "type": "Medical",
+                                     "demographics": {"name": name}, "roundingData": rounding})
+        self.create_general_task({}, {"title": "Check controlled drug log", "timeOfDay": "morning"})
+
+    def now(self):
+        """Deterministic clock: one second per write from SEED_TIME"""
+        self._tick += 1
+        return (SEED_TIME + timedelta(seconds=self._tick)).isoformat().replace("+00:00", "Z")
+
+    def next_id(self, kind):
+        self._ids[kind] = self._ids.get(kind, 0) + 1
+        return self._ids[kind]
+
+    def dispatch(self, method, target, raw_body=b""):
+        """(status, JSON payload) for one request"""
+        self.requests += 1
+        parts = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except ValueError:
+            return 400, {"error": "Invalid JSON body"}
+
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(parts.path)
+            if match and route_method == method:
+                return handler(*match.groups(), query, body)
+
+        key = f"{method} {parts.path}"
+        self.unhandled[key] = self.unhandled.get(key, 0) + 1
+        return 404, {"error": f"{key} is not available offline"}
+
+    # Patients
+
+    def find_patient(self, patient_id):
+        return next((p for p in self.patients if p["id"] == int(patient_id)), None)
+
+    def list_patients(self, query, body):
+        patients = [p for p in self.patients
+                    if all(p.get(key) == query[key] for key in ("status", "type") if key in query)]
+        return 200, sorted(patients, key=lambda p: p["createdAt"], reverse=True)
+
+    def create_patient(self, query, body):
+        created = self.now()
+        patient = {
+            "id": self.next_id("patient"),
+            "status": body.get("status") or "Active",
+            "type": body.get("type") or "Medical",
+            "mriCancelled": False,
+            "mriCancelledAt": None,
+            "demographics": body.get("demographics") or {"name": "Unnamed Patient"},
+            "medicalHistory": body.get("medicalHistory") or {},
+            "currentStay": body.get("currentStay"),
+            "soapNotes": [],
+            "roundingData": {**DEFAULT_ROUNDING, **(body.get("roundingData") or {})},
+            "mriData": body.get("mriData"),
+            "tasks": [],
+            "stickerData": body.get("stickerData"),
+            "appointmentInfo": body.get("appointmentInfo"),
+            "createdAt": created,
+            "updatedAt": created,
+            "lastAccessedBy": body.get("lastAccessedBy"),
+        }
+        self.patients.append(patient)
+        return 201, patient
+
+    def get_patient(self, patient_id, query, body):
+        patient = self.find_patient(patient_id)
+        return (200, patient) if patient else (404, {"error": "Patient not found"})
+
+    def update_patient(self, patient_id, query, body):
+        patient = self.find_patient(patient_id)
+        if patient is None:
+            return 404, {"error": "Patient not found"}
+        for field in PATIENT_FIELDS:
+            if field not in body:
+                continue
+            if field in MERGED_PATIENT_FIELDS:
+                patient[field] = {**(patient.get(field) or {}), **(body[field] or {})}
+            else:
+                patient[field] = body[field]
+        patient["updatedAt"] = self.now()
+        return 200, patient
+
+    def delete_patient(self, patient_id, query, body):
+        patient = self.find_patient(patient_id)
+        if patient is None:
+            return 404, {"error": "Patient not found"}
+        self.patients.remove(patient)
+        return 200, {"success": True}
+
+    # Tasks
+
+    def new_task(self, body, patient_id=None):
+        created = self.now()
+        return {
+            "id": f"task-{self.next_id('task')}",
+            "patientId": patient_id,
+            **{field: body.get(field) for field in TASK_FIELDS},
+            "title": (body.get("title") or body.get("name") or "").strip(),
+            "completed": bool(body.get("completed")),
+            "completedAt": created if body.get("completed") else None,
+            "createdAt": created,
+        }
+
+    def apply_task_update(self, task, body):
+        for field in TASK_FIELDS:
+            if field in body:
+                task[field] = body[field].strip() if field == "title" else body[field]
+        if "completed" in body:
+            task["completedAt"] = self.now() if body["completed"] else None
+        return task
+
+    def list_patient_tasks(self, patient_id, query, body):
+        patient = self.find_patient(patient_id)
+        return (200, patient["tasks"]) if patient else (404, {"error": "Patient not found"})
+
+    def create_patient_task(self, patient_id, query, body):
+        patient = self.find_patient(patient_id)
+        if patient is None:
+            return 404, {"error": "Patient not found"}
+        title = (body.get("title") or body.get("name") or "").strip()
+        if not title:
+            return 400, {"error": "Task title is required"}
+        existing = next((t for t in patient["tasks"] if t["title"] == title and not t["completed"]), None)
+        if existing:
+            return 200, existing
+        task = self.new_task(body, patient["id"])
+        patient["tasks"].insert(0, task)
+        return 201, task
+
+    def update_patient_task(self, patient_id, task_id, query, body):
+        patient = self.find_patient(patient_id)
+        task = next((t for t in patient["tasks"] if t["id"] == task_id), None) if patient else None
+        return (200, self.apply_task_update(task, body)) if task else (404, {"error": "Task not found"})
+
+    def delete_patient_task(self, patient_id, task_id, query, body):
+        patient = self.find_patient(patient_id)
+        task = next((t for t in patient["tasks"] if t["id"] == task_id), None) if patient else None
+        if task is None:
+            return 404, {"error": "Task not found"}
+        patient["tasks"].remove(task)
+        return 200, {"success": True}
+
+    def list_general_tasks(self, query, body):
+        return 200, self.general_tasks
+
+    def create_general_task(self, query, body):
+        if not isinstance(body.get("title"), str) or not body["title"].strip():
+            return 400, {"error": "Task title is required"}
+        existing = next((t for t in self.general_tasks
+                         if t["title"] == body["title"].strip() and not t["completed"]), None)
+        if existing:
+            return 200, existing
+        task = self.new_task(body)
+        self.general_tasks.insert(0, task)
+        return 201, task
+
+    def update_general_task(self, query, body):
+        task = next((t for t in self.general_tasks if t["id"] == body.get("id")), None)
+        return (200, self.apply_task_update(task, body)) if task else (404, {"error": "General task not found"})
+
+    def delete_general_task(self, query, body):
+        task_id = query.get("id") or body.get("id")
+        task = next((t for t in self.general_tasks if t["id"] == task_id), None)
+        if task is None:
+            return 404, {"error": "General task not found"}
+        self.general_tasks.remove(task)
+        return 200, {"success": True}
+
+    def refresh_tasks(self, query, body):
+        return 200, {"success": True, "message": "Refreshed tasks for 0 patients, created 0 new tasks",
+                     "details": [], "today": SEED_TIME.date().isoformat()}
+
+    # Rounds sheets
+
+    def get_rounds_sheet(self, query, body):
+        if "date" in query:
+            return 200, self.rounds_sheets.get(query["date"])
+        latest = max(self.rounds_sheets.values(), key=lambda s: s["updatedAt"], default=None)
+        return 200, latest
+
+    def save_rounds_sheet(self, query, body):
+        if not body.get("date") or body.get("patients") is None:
+            return 400, {"error": "Missing date or patients"}
+        sheet = self.rounds_sheets.setdefault(body["date"], {"id": self.next_id("sheet"), "date": body["date"],
+                                                             "createdAt": self.now()})
+        sheet.update(patients=body["patients"], settings=body.get("settings"), updatedAt=self.now())
+        return 201, sheet
+
+    def delete_rounds_sheet(self, query, body):
+        if "date" not in query:
+            return 400, {"error": "Missing date parameter"}
+        self.rounds_sheets.pop(query["date"], None)
+        return 200, {"success": True}
+
+    # ACVIM and residency
+
+    def save_profile(self, query, body):
+        self.profile = {**(self.profile or {"id": "profile-1", "createdAt": self.now()}), **body,
+                        "updatedAt": self.now()}
+        return 200, self.profile
+
+    def update_certificate_status(self, query, body):
+        self.certificate_status.update(body)
+        return 200, self.certificate_status
+
+    def list_collection(self, name, query, body):
+        records = self.collections[name]
+        if "year" in query and query.get("all") != "true":
+            records = [r for r in records if r.get("residencyYear") == int(query["year"])]
+        if "dailyEntryId" in query:
+            records = [r for r in records if r.get("dailyEntryId") == query["dailyEntryId"]]
+        return 200, records
+
+    def create_in_collection(self, name, query, body):
+        record = {"residencyYear": 1, **body, "id": f"{name}-{self.next_id(name)}", "createdAt": self.now()}
+        self.collections[name].insert(0, record)
+        return 201, record
+
+    def update_in_collection(self, name, query, body):
+        record = next((r for r in self.collections[name] if r["id"] == body.get("id")), None)
+        if record is None:
+            return 404, {"error": "Not found"}
+        record.update(body)
+        return 200, record
+
+    def delete_from_collection(self, name, query, body):
+        if "id" not in query and name == "weekly-schedule" and "year" in query:
+            year = int(query["year"])
+            self.collections[name] = [r for r in self.collections[name] if r.get("residencyYear") != year]
+            return 200, {"success": True, "message": f"Cleared year {year}"}
+        before = len(self.collections[name])
+        self.collections[name] = [r for r in self.collections[name] if r["id"] != query.get("id")]
+        return (200, {"success": True}) if len(self.collections[name]) < before else (404, {"error": "Not found"})
+
+    def daily_entry(self, date):
+        return self.daily_entries.setdefault(date, {
+            "id": f"entry-{self.next_id('entry')}", "date": date, **{f: 0 for f in COUNTER_FIELDS},
+            "shiftStartTime": None, "shiftEndTime": None, "surgeries": [], "lmriEntries": [],
+        })
+
+    def get_daily_entries(self, query, body):
+        if "date" in query:
+            return 200, self.daily_entries.get(query["date"])
+        entries = [e for e in self.daily_entries.values()
+                   if query.get("startDate", "") <= e["date"] <= query.get("endDate", "9999")]
+        return 200, sorted(entries, key=lambda e: e["date"], reverse=True)
+
+    def save_daily_entry(self, query, body):
+        if not body.get("date"):
+            return 400, {"error": "Date is required"}
+        entry = self.daily_entry(body["date"])
+        entry.update({key: value for key, value in body.items() if key != "id"})
+        return 200, entry
+
+    def quick_increment(self, query, body):
+        entry = self.daily_entry(body.get("date") or SEED_TIME.date().isoformat())
+        if body.get("action") in ("clockIn", "clockOut", "updateShiftTimes"):
+            for key in ("shiftStartTime", "shiftEndTime"):
+                if key in body:
+                    entry[key] = body[key]
+            if body["action"] != "updateShiftTimes":
+                key = "shiftStartTime" if body["action"] == "clockIn" else "shiftEndTime"
+                entry[key] = body.get("time", "08:00")
+            return 200, entry
+        if body.get("field") not in COUNTER_FIELDS:
+            return 400, {"error": "Invalid field"}
+        entry[body["field"]] = max(0, entry[body["field"]] + int(body.get("delta", 1)))
+        if body["field"] == "newConsultCount":
+            entry["newCount"] = entry["newConsultCount"]
+        entry["totalCases"] = sum(entry[f] for f in ("mriCount", "recheckCount", "newConsultCount", "emergencyCount"))
+        return 200, entry
+
+    def totals(self):
+        totals = {f: sum(e[f] for e in self.daily_entries.values()) for f in COUNTER_FIELDS}
+        totals["totalAppointments"] = totals["recheckCount"] + totals["newConsultCount"] + totals["emergencyCount"]
+        return totals
+
+    def residency_stats(self, query, body):
+        return 200, {
+            "totals": self.totals(),
+            "surgeryBreakdown": {"Primary": 0, "Assistant": 0, "total": len(self.collections["surgery"])},
+            "mriTypeBreakdown": {},
+            "lmriStats": {},
+            "weeklyData": [],
+            "milestones": [],
+            "badges": [],
+            "daysUntilFreedom": None,
+            "daysLogged": len(self.daily_entries),
+        }
+
+    def milestones(self, query, body):
+        return 200, {"newMilestones": [], "uncelebrated": [], "currentTotals": self.totals()}
+
+
+class FakeBackend:
+    """Runs a FakeStore behind an asyncio HTTP server on a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, store=None):
+        self.host = host
+        self.port = port
+        self.store = store or FakeStore()
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def handle(self, reader, writer):
+        """Serve keep-alive HTTP/1.1 requests on one connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw_body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = self.store.dispatch(method, target, raw_body)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Shutting down with the connection idle; finish quietly, since
+            # asyncio's stream callback reports a cancelled handler as an error
+            pass
+        finally:
+            writer.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, name="fake-backend", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        print(f"🔌 Fake API backend on {self.url}")
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        unhandled = ", ".join(f"{key} x{count}" for key, count in sorted(self.store.unhandled.items()))
+        print(f"🔌 Fake API backend served {self.store.requests} requests"
+              + (f" (not faked: {unhandled})" if unhandled else ""))
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self.handle, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+        server.close()
+        # Connections still open (keep-alive) are cancelled and awaited, so
+        # their CancelledError doesn't surface as a traceback on close
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.run_until_complete(server.wait_closed())
+        self._loop.close()
+
+
+def route_api(context, backend_url):
+    """Send every /api/ request from the context's pages to the fake backend"""
+    def forward(route):
+        parts = urlsplit(route.request.url)
+        target = f"{backend_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        route.fulfill(response=route.fetch(url=target))
+
+    context.route("**/api/**", forward)
+
+
+async def route_api_async(context, backend_url):
+    """route_api for a context of the async Playwright API"""
+    async def forward(route):
+        parts = urlsplit(route.request.url)
+        target = f"{backend_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        await route.fulfill(response=await route.fetch(url=target))
+
+    await context.route("**/api/**", forward)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fake of the VetHub API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.host, args.port)
+
+    async def serve():
+        server = await asyncio.start_server(backend.handle, args.host, args.port)
+        print(f"🔌 Fake API backend on http://{args.host}:{args.port} (Ctrl+C to stop)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
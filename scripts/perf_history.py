@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Performance history for the audit scripts.
+
+Every audit run records its per-test timings and per-route page metrics in a
+local SQLite database, keyed by git commit. The compare command checks the
+latest run of a suite against a rolling baseline of earlier runs using a
+median/MAD robust z-score, and against absolute budgets, and exits non-zero
+when either is exceeded.
+
+Usage:
+    python scripts/perf_history.py list [--suite rounding]
+    python scripts/perf_history.py compare --suite rounding [--window 20] [--budgets FILE]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get("VETHUB_PERF_DB", os.path.join(REPO_ROOT, ".perf-history.sqlite"))
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perf-budgets.json")
+
+# Set by audit_shard in its script processes (to the shard index)
+SHARD_ENV = "VETHUB_PERF_SHARD"
+
+# Scale factor that makes the MAD a consistent estimator of the standard deviation
+MAD_SCALE = 1.4826
+DEFAULT_WINDOW = 20
+DEFAULT_THRESHOLD = 3.5
+MIN_BASELINE_RUNS = 5
+# Ignore statistically significant but practically irrelevant changes
+MIN_RELATIVE_CHANGE = 0.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    suite TEXT NOT NULL,
+    commit_sha TEXT,
+    dirty INTEGER NOT NULL DEFAULT 0,
+    base_url TEXT,
+    started_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    route TEXT NOT NULL DEFAULT '',
+    test TEXT NOT NULL DEFAULT '',
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_run ON samples(run_id);
+CREATE INDEX IF NOT EXISTS runs_suite ON runs(suite, id);
+"""
+
+# Page metric fields that are recorded; all of them are "higher is worse"
+PAGE_METRICS = [
+    "ttfb_ms", "dom_content_loaded_ms", "load_ms", "fcp_ms", "lcp_ms", "cls", "inp_ms",
+    "long_tasks", "long_task_ms", "js_heap_bytes", "transfer_bytes",
+]
+# Main-thread time of the traced interactions (audit_trace), also "higher is worse"
+TRACE_METRICS = ["blocking_ms", "scripting_ms", "layout_ms", "paint_ms"]
+
+
+def connect(path=DB_PATH):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def git_commit():
+    """(sha, dirty) for the working tree, or (None, False) outside git"""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+        return sha, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def samples_from_results(results):
+    """Yield (route, test, metric, value) from an audit results dict"""
+    for timing in results.get("timings", []):
+        yield "", timing["test"], "duration_s", timing["seconds"]
+    for page in results.get("page_metrics", []):
+        for metric in PAGE_METRICS:
+            value = page.get(metric)
+            if isinstance(value, (int, float)):
+                yield page["route"], page.get("label", ""), metric, value
+    auto_save = results.get("auto_save_latency") or {}
+    for key in ("latency_ms", "save_delay_ms", "request_ms"):
+        p95 = (auto_save.get(key) or {}).get("p95")
+        if isinstance(p95, (int, float)):
+            yield "", "test_auto_save_timing", f"auto_save_{key[:-3]}_p95_ms", p95
+    if isinstance(auto_save.get("redundant_saves"), int):
+        yield "", "test_auto_save_timing", "auto_save_redundant_saves", auto_save["redundant_saves"]
+    for test in (results.get("profile") or {}).get("tests", []):
+        for phase, seconds in test["phases"].items():
+            yield "", test["test"], f"{phase}_s", seconds
+    for trace in results.get("traces", []):
+        for metric in TRACE_METRICS:
+            if isinstance(trace.get(metric), (int, float)):
+                yield "", f"trace:{trace['name']}", metric, trace[metric]
+
+
+def record_run(suite, results, base_url=None, path=DB_PATH):
+    """Store one audit run; returns the run id. Inside an audit_shard shard the suite is tagged ":shard"."""
+    if os.environ.get(SHARD_ENV):
+        # A shard only ran part of the suite; audit_shard records the merged run
+        suite = f"{suite}:shard"
+    sha, dirty = git_commit()
+    db = connect(path)
+    with db:
+        cursor = db.execute(
+            "INSERT INTO runs (suite, commit_sha, dirty, base_url, started_at) VALUES (?, ?, ?, ?, ?)",
+            (suite, sha, int(dirty), base_url, results.get("timestamp") or datetime.now().isoformat()),
+        )
+        run_id = cursor.lastrowid
+        db.executemany(
+            "INSERT INTO samples (run_id, route, test, metric, value) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, *sample) for sample in samples_from_results(results)],
+        )
+    db.close()
+    print(f"🗄️  Recorded {suite} run #{run_id} ({(sha or 'no commit')[:8]}{'+dirty' if dirty else ''}) in {path}")
+    return run_id
+
+
+def _page_name(route, label):
+    """Comparison name of a page metric: the route plus the visit label, e.g. "/residency [mobile]" """
+    return f"{route} [{label}]" if label else route
+
+
+def _route_of(name):
+    return name.split(" [", 1)[0]
+
+
+def _run_values(db, run_id):
+    """{(name, metric): median value} for one run"""
+    grouped = {}
+    for route, test, metric, value in db.execute(
+            "SELECT route, test, metric, value FROM samples WHERE run_id = ?", (run_id,)):
+        # Page metrics are compared per route and visit label, so a phone-only load
+        # (label "viewport:phone") isn't averaged into the desktop ones; timings per test
+        key = (_page_name(route, test) if route else test, metric)
+        grouped.setdefault(key, []).append(value)
+    return {key: statistics.median(values) for key, values in grouped.items()}
+
+
+def robust_z(value, baseline):
+    """Median/MAD z-score of value against baseline, or None if the baseline has no spread"""
+    median = statistics.median(baseline)
+    mad = statistics.median(abs(x - median) for x in baseline) * MAD_SCALE
+    if mad == 0:
+        return None
+    return (value - median) / mad
+
+
+def find_regressions(current, baselines, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    for key, value in sorted(current.items()):
+        baseline = baselines.get(key, [])
+        if len(baseline) < MIN_BASELINE_RUNS:
+            continue
+        median = statistics.median(baseline)
+        if value <= median * (1 + MIN_RELATIVE_CHANGE):
+            continue
+        z = robust_z(value, baseline)
+        # A flat baseline makes any meaningful increase significant
+        if z is None or z > threshold:
+            regressions.append({
+                "key": key, "value": value, "baseline_median": median,
+                "z": None if z is None else round(z, 2), "runs": len(baseline),
+            })
+    return regressions
+
+
+def load_budgets(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_budget_violations(current, budgets):
+    """budgets: {"routes": {"/rounding": {"lcp_ms": 2500}}, "tests": {"test_x": {"duration_s": 10}}}"""
+    limits = {}
+    for section in ("routes", "tests"):
+        for name, metrics in budgets.get(section, {}).items():
+            for metric, limit in metrics.items():
+                limits[(name, metric)] = limit
+
+    violations = []
+    for key, value in sorted(current.items()):
+        name, metric = key
+        limit = limits.get(key)
+        if limit is None and name.startswith("/"):
+            # Route budgets cover every visit label; "*" route budgets apply to every page
+            limit = limits.get((_route_of(name), metric), limits.get(("*", metric)))
+        if limit is not None and value > limit:
+            violations.append({"key": key, "value": value, "budget": limit})
+    return violations
+
+
+def compare(suite, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD, budgets_path=BUDGETS_PATH,
+            path=DB_PATH):
+    """Compare the latest run of suite against its rolling baseline; returns an exit code"""
+    db = connect(path)
+    runs = [row[0] for row in db.execute(
+        "SELECT id FROM runs WHERE suite = ? ORDER BY id DESC LIMIT ?", (suite, window + 1))]
+    if not runs:
+        print(f"No runs recorded for suite '{suite}'")
+        db.close()
+        return 1
+
+    latest, previous = runs[0], runs[1:]
+    current = _run_values(db, latest)
+    baselines = {}
+    for run_id in previous:
+        for key, value in _run_values(db, run_id).items():
+            baselines.setdefault(key, []).append(value)
+    db.close()
+
+    print(f"Comparing {suite} run #{latest} against {len(previous)} previous runs")
+
+    regressions = find_regressions(current, baselines, threshold)
+    for r in regressions:
+        name, metric = r["key"]
+        z = "flat baseline" if r["z"] is None else f"z={r['z']}"
+        print(f"❌ REGRESSION {name} {metric}: {r['value']:.1f} vs median {r['baseline_median']:.1f} "
+              f"({z}, {r['runs']} runs)")
+
+    violations = find_budget_violations(current, load_budgets(budgets_path))
+    for v in violations:
+        name, metric = v["key"]
+        print(f"❌ OVER BUDGET {name} {metric}: {v['value']:.1f} > {v['budget']}")
+
+    if not regressions and not violations:
+        print("✅ No regressions or budget violations")
+        return 0
+    return 1
+
+
+def test_durations(suite, window=DEFAULT_WINDOW, path=DB_PATH):
+    """{test: median duration_s} over the last `window` runs of suite that timed it"""
+    if not os.path.exists(path):
+        return {}
+    db = connect(path)
+    durations = {}
+    for test, value in db.execute(
+            "SELECT s.test, s.value FROM samples s JOIN runs r ON r.id = s.run_id "
+            "WHERE r.suite = ? AND s.metric = 'duration_s' ORDER BY r.id DESC", (suite,)):
+        values = durations.setdefault(test, [])
+        if len(values) < window:
+            values.append(value)
+    db.close()
+    return {test: statistics.median(values) for test, values in durations.items()}
+
+
+def list_runs(suite=None, path=DB_PATH):
+    db = connect(path)
+    query = "SELECT r.id, r.suite, r.commit_sha, r.dirty, r.started_at, COUNT(s.run_id) FROM runs r " \
+            "LEFT JOIN samples s ON s.run_id = r.id"
+    params = ()
+    if suite:
+        query += " WHERE r.suite = ?"
+        params = (suite,)
+    query += " GROUP BY r.id ORDER BY r.id"
+    for run_id, run_suite, sha, dirty, started_at, count in db.execute(query, params):
+        print(f"#{run_id} {run_suite} {(sha or '-')[:8]}{'+dirty' if dirty else ''} {started_at} ({count} samples)")
+    db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit performance history")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite history path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="list recorded runs")
+    list_parser.add_argument("--suite")
+
+    compare_parser = sub.add_parser("compare", help="check the latest run for regressions")
+    compare_parser.add_argument("--suite", required=True)
+    compare_parser.add_argument("--window", type=int, default=DEFAULT_WINDOW,
+                                help="number of previous runs in the baseline")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="robust z-score above which a change is a regression")
+    compare_parser.add_argument("--budgets", default=BUDGETS_PATH, help="JSON performance budgets")
+
+    args = parser.parse_args(argv)
+    if args.command == "list":
+        list_runs(args.suite, path=args.db)
+        return 0
+    return compare(args.suite, args.window, args.threshold, args.budgets, path=args.db)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Rounding sheet benchmarks.
+
+The scale benchmark grows a synthetic census (patients expanded from the
+TSV_PASTE_DATA rows) and, at each size, measures how long /rounding takes to
+become interactive, how big the DOM is, per-keystroke input latency in a row's
+signalment input and the scroll frame rate of the table's overflow container. The
+result is a scaling curve with the first census size that stops being usable.
+
+The paste benchmark dispatches multi-row TSV paste events onto the synthetic
+census and times the preview modal, applying the rows and persisting them with
+Save All, then reads the patients back from the API to check that every value
+landed in the right patient and column.
+
+The auto-save measurement edits different rows and fields of the real sheet:
+it types into the signalment input and picks another option in the dropdowns.
+For each edit it timestamps, on the page's own clock, the last input event,
+the PATCH the debounce sends, its response, and the saving/saved indicator. The result is the latency distribution plus a count of redundant
+saves, i.e. more than one PATCH per edit.
+
+Synthetic patients are named with SYNTHETIC_PREFIX and are deleted afterwards.
+"""
+
+import json
+import re
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from audit_clock import AUTO_SAVE_DEBOUNCE_MS
+from audit_stats import distribution
+from audit_waits import PATIENT_URL, wait_for_hydration, wait_for_patient_save, wait_for_toast, wait_until
+from rounding_fixtures import (DROPDOWN_OPTIONS, ROUNDING_FIELD_ORDER, ROW_CONTROL_LABELS, SYNTHETIC_PREFIX,
+                               synthetic_patients)
+
+DEFAULT_SIZES = [25, 100, 250, 1000]
+PASTE_SIZES = [1, 10, 50, 100, 250, 500]
+# handleMultiRowPaste applies pastes up to this many rows without the preview modal
+QUICK_PASTE_MAX_ROWS = 3
+
+# Same container test_scroll_behavior scrolls
+SCROLL_CONTAINER = "[style*='overflow'], .overflow-x-auto, .overflow-auto"
+
+# Usability limits: 100ms input response (RAIL), 30fps scrolling, 5s to interactive
+MAX_KEYSTROKE_P95_MS = 100
+MIN_SCROLL_FPS = 30
+MAX_TTI_MS = 5000
+
+ROWS_RENDERED_JS = "n => document.querySelectorAll('table tbody tr').length >= n"
+
+# Same synthetic ClipboardEvent test_rounding_sheet dispatches, on the row's <tr>
+DISPATCH_PASTE_JS = """
+(row, text) => {
+  const data = new DataTransfer();
+  data.setData('text/plain', text);
+  row.dispatchEvent(new ClipboardEvent('paste', { clipboardData: data, bubbles: true, cancelable: true }));
+}
+"""
+
+DOM_STATS_JS = """
+() => ({
+  dom_nodes: document.getElementsByTagName('*').length,
+  rows: document.querySelectorAll('table tbody tr').length,
+  inputs: document.querySelectorAll('table input, table textarea, table select').length,
+})
+"""
+
+# Time from keydown to the first task after the next frame, i.e. when the keystroke is on screen
+KEY_LATENCY_JS = """
+el => {
+  window.__keyLatency = [];
+  el.addEventListener('keydown', e => {
+    const start = e.timeStamp;
+    requestAnimationFrame(() => setTimeout(() => window.__keyLatency.push(performance.now() - start), 0));
+  }, { capture: true });
+}
+"""
+
+SCROLL_FPS_JS = """
+async el => {
+  const page = document.scrollingElement;
+  const maxLeft = Math.max(1, el.scrollWidth - el.clientWidth);
+  const frames = [];
+  const start = performance.now();
+  let last = start;
+  await new Promise(resolve => {
+    const step = now => {
+      frames.push(now - last);
+      last = now;
+      el.scrollLeft = (el.scrollLeft + 20) % maxLeft;
+      page.scrollTop += 40;
+      if (now - start < 1500) requestAnimationFrame(step); else resolve();
+    };
+    requestAnimationFrame(step);
+  });
+  el.scrollLeft = 0;
+  page.scrollTop = 0;
+  frames.shift();
+  const sorted = [...frames].sort((a, b) => a - b);
+  return {
+    fps: Math.round(frames.length / ((last - start) / 1000) * 10) / 10,
+    p95_frame_ms: sorted.length ? Math.round(sorted[Math.floor(sorted.length * 0.95)] * 10) / 10 : null,
+    frames: frames.length,
+  };
+}
+"""
+
+
+class SyntheticCensus:
+    """Creates and removes synthetic patients through the API"""
+
+    def __init__(self, request, base_url):
+        self.request = request  # Playwright APIRequestContext (shares the page's cookies)
+        self.base_url = base_url
+        self.ids = []
+
+    def grow_to(self, count):
+        """Add patients until the synthetic census is `count` strong"""
+        missing = count - len(self.ids)
+        if missing <= 0:
+            return
+        started = time.monotonic()
+        for payload in synthetic_patients(missing, start=len(self.ids)):
+            response = self.request.post(f"{self.base_url}/api/patients", data=payload)
+            if not response.ok:
+                raise RuntimeError(f"Seeding failed: {response.status} {response.text()[:200]}")
+            self.ids.append(response.json()["id"])
+        print(f"🌱 Seeded {missing} synthetic patients ({len(self.ids)} total) "
+              f"in {time.monotonic() - started:.1f}s")
+
+    def remove_leftovers(self):
+        """Delete synthetic patients left behind by an interrupted run"""
+        response = self.request.get(f"{self.base_url}/api/patients")
+        if not response.ok:
+            return
+        stale = [p["id"] for p in response.json()
+                 if ((p.get("demographics") or {}).get("name") or "").startswith(SYNTHETIC_PREFIX)]
+        for patient_id in stale:
+            if patient_id not in self.ids:
+                self.request.delete(f"{self.base_url}/api/patients/{patient_id}")
+        if stale:
+            print(f"🧹 Removed {len(stale)} leftover synthetic patients")
+
+    def cleanup(self):
+        for patient_id in self.ids:
+            self.request.delete(f"{self.base_url}/api/patients/{patient_id}")
+        print(f"🧹 Deleted {len(self.ids)} synthetic patients")
+        self.ids = []
+
+
+def measure_time_to_interactive(page, metrics, url, min_rows):
+    """Navigate and wait until React has hydrated and at least min_rows rows are rendered"""
+    started = time.monotonic()
+    metrics.goto(page, url, label="benchmark")
+    wait_for_hydration(page, budget=0, timeout=120000)
+    page.wait_for_function(ROWS_RENDERED_JS, arg=min_rows, timeout=120000)
+    return round((time.monotonic() - started) * 1000, 1)
+
+
+def measure_keystroke_latency(page, text="Recheck neuro exam in AM"):
+    """Type into a synthetic patient's signalment input and return per-keystroke latencies in ms"""
+    row = page.locator("table tbody tr", has_text=SYNTHETIC_PREFIX).first
+    field = row.locator(f"[aria-label^='{ROW_CONTROL_LABELS['signalment']} for']").first
+    original = field.input_value()
+
+    field.evaluate(KEY_LATENCY_JS)
+    field.click()
+    field.press("End")
+    field.press_sequentially(text, delay=30)
+    page.wait_for_function("n => window.__keyLatency.length >= n", arg=len(text), timeout=10000)
+    latencies = page.evaluate("window.__keyLatency")
+
+    field.fill(original)
+    return latencies
+
+
+def measure_scroll(page):
+    container = page.locator(SCROLL_CONTAINER).first
+    if not container.is_visible():
+        return None
+    return container.evaluate(SCROLL_FPS_JS)
+
+
+def usability(point):
+    """List of reasons a census size is not usable (empty if it is)"""
+    problems = []
+    if point["tti_ms"] > MAX_TTI_MS:
+        problems.append(f"TTI {point['tti_ms']}ms > {MAX_TTI_MS}ms")
+    p95 = point["keystroke_ms"]["p95"]
+    if p95 is not None and p95 > MAX_KEYSTROKE_P95_MS:
+        problems.append(f"keystroke p95 {p95}ms > {MAX_KEYSTROKE_P95_MS}ms")
+    scroll = point["scroll"]
+    if scroll and scroll["fps"] < MIN_SCROLL_FPS:
+        problems.append(f"scroll {scroll['fps']}fps < {MIN_SCROLL_FPS}fps")
+    return problems
+
+
+def run_scale_benchmark(context, page, metrics, base_url, sizes=DEFAULT_SIZES):
+    """Measure /rounding at each synthetic census size; returns the scaling curve"""
+    census = SyntheticCensus(context.request, base_url)
+    census.remove_leftovers()
+    curve = []
+    try:
+        for size in sorted(sizes):
+            census.grow_to(size)
+            print(f"\n📊 Census {size}: measuring /rounding")
+
+            point = {"census": size}
+            point["tti_ms"] = measure_time_to_interactive(page, metrics, f"{base_url}/rounding", size)
+            point.update(page.evaluate(DOM_STATS_JS))
+            point["keystroke_ms"] = distribution(measure_keystroke_latency(page))
+            point["scroll"] = measure_scroll(page)
+            point["problems"] = usability(point)
+            curve.append(point)
+
+            scroll = point["scroll"] or {}
+            print(f"   TTI {point['tti_ms']}ms, {point['dom_nodes']} DOM nodes, "
+                  f"keystroke p95 {point['keystroke_ms']['p95']}ms, scroll {scroll.get('fps')}fps")
+    finally:
+        census.cleanup()
+
+    unusable = next((p["census"] for p in curve if p["problems"]), None)
+    return {"curve": curve, "first_unusable_census": unusable}
+
+
+def print_scale_report(report):
+    print("\n" + "=" * 60)
+    print("ROUNDING SHEET SCALING CURVE")
+    print("=" * 60)
+    print(f"{'census':>7} {'TTI ms':>9} {'DOM nodes':>10} {'key p50':>8} {'key p95':>8} {'scroll fps':>11}")
+    for p in report["curve"]:
+        scroll = p["scroll"] or {}
+        flag = "  ❌ " + "; ".join(p["problems"]) if p["problems"] else ""
+        print(f"{p['census']:>7} {p['tti_ms']:>9} {p['dom_nodes']:>10} {p['keystroke_ms']['p50']!s:>8} "
+              f"{p['keystroke_ms']['p95']!s:>8} {scroll.get('fps')!s:>11}{flag}")
+    if report["first_unusable_census"]:
+        print(f"\n⚠️  Sheet stops being usable at a census of {report['first_unusable_census']}")
+    else:
+        print("\n✅ Usable at every measured census size")
+
+
+def save_report(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Benchmark saved to: {path}")
+
+
+def paste_rows(count, tag):
+    """
+    TSV rows for a multi-row paste, one value per ROUNDING_FIELD_ORDER column.
+
+    Free-text cells encode their row and field so misaligned columns show up in
+    the read-back; dropdown cells rotate through valid options.
+    """
+    rows = []
+    for i in range(count):
+        row = {}
+        for field in ROUNDING_FIELD_ORDER:
+            options = DROPDOWN_OPTIONS.get(field)
+            row[field] = options[i % len(options)] if options else f"{tag} r{i} {field}"
+        rows.append(row)
+    return rows
+
+
+def patient_id_of(row):
+    """Patient id from the row's link to /?patient=ID"""
+    href = row.locator("a[href*='patient=']").first.get_attribute("href")
+    return int(re.search(r"patient=(\d+)", href).group(1))
+
+
+def check_alignment(request, base_url, start_id, rows):
+    """Read the patients back and count cells that did not land where they should"""
+    response = request.get(f"{base_url}/api/patients")
+    # RoundingSheet maps pasted rows onto active patients in API order
+    active = [p for p in response.json() if p.get("status") != "Discharged"]
+    start = next(i for i, p in enumerate(active) if p["id"] == start_id)
+
+    mismatches = []
+    for i, expected in enumerate(rows):
+        patient = active[start + i]
+        saved = patient.get("roundingData") or {}
+        for field, value in expected.items():
+            if saved.get(field) != value:
+                mismatches.append({"row": i, "patient": patient["id"], "field": field,
+                                   "expected": value, "actual": saved.get(field)})
+    return mismatches
+
+
+def measure_paste(page, base_url, size, tag):
+    """Paste `size` rows starting at the newest synthetic patient; returns timings and alignment"""
+    request = page.context.request
+    rows = paste_rows(size, tag)
+    tsv = "\n".join("\t".join(row[f] for f in ROUNDING_FIELD_ORDER) for row in rows)
+
+    start_row = page.locator("table tbody tr", has_text=SYNTHETIC_PREFIX).first
+    start_id = patient_id_of(start_row)
+
+    saved_ids = set()
+
+    def on_response(response):
+        match = PATIENT_URL.search(response.url)
+        if match and response.request.method == "PATCH" and response.ok:
+            saved_ids.add(int(re.search(r"/api/patients/(\d+)", response.url).group(1)))
+
+    result = {"rows": size, "bytes": len(tsv.encode())}
+    page.on("response", on_response)
+    try:
+        started = time.monotonic()
+        start_row.evaluate(DISPATCH_PASTE_JS, tsv)
+
+        if size > QUICK_PASTE_MAX_ROWS:
+            page.get_by_text("Paste Preview").first.wait_for(state="visible", timeout=60000)
+            result["modal_ms"] = round((time.monotonic() - started) * 1000, 1)
+            page.locator("button:has-text('Apply Paste')").click()
+            applied = wait_for_toast(page, "Multi-Row Paste Applied", budget=0, timeout=60000)
+        elif size > 1:
+            result["modal_ms"] = None
+            applied = wait_for_toast(page, "Quick Paste Applied", budget=0, timeout=10000)
+        else:
+            result["modal_ms"] = None
+            applied = wait_for_toast(page, "Pasted", budget=0, timeout=10000)
+        result["applied_ms"] = round((time.monotonic() - started) * 1000, 1) if applied else None
+
+        page.locator("button:has-text('Save All')").click()
+        persisted = wait_until(page, lambda: len(saved_ids) >= size, budget=0,
+                               timeout=60000 + size * 200, helper="paste_persisted")
+        result["persisted_ms"] = round((time.monotonic() - started) * 1000, 1) if persisted else None
+    finally:
+        page.remove_listener("response", on_response)
+
+    mismatches = check_alignment(request, base_url, start_id, rows)
+    result["misaligned_cells"] = len(mismatches)
+    result["mismatch_examples"] = mismatches[:5]
+    result["saved_patients"] = len(saved_ids)
+    return result
+
+
+def run_paste_benchmark(context, page, metrics, base_url, sizes=PASTE_SIZES):
+    """Time multi-row pastes of each size onto a synthetic census"""
+    census = SyntheticCensus(context.request, base_url)
+    census.remove_leftovers()
+    results = []
+    try:
+        census.grow_to(max(sizes))
+        for size in sorted(sizes):
+            measure_time_to_interactive(page, metrics, f"{base_url}/rounding", max(sizes))
+            print(f"\n📋 Pasting {size} row{'s' if size > 1 else ''}")
+            result = measure_paste(page, base_url, size, tag=f"PASTE{size}")
+            results.append(result)
+            print(f"   modal {result['modal_ms']}ms, applied {result['applied_ms']}ms, "
+                  f"persisted {result['persisted_ms']}ms, {result['misaligned_cells']} misaligned cells")
+    finally:
+        census.cleanup()
+
+    return {"pastes": results}
+
+
+def print_paste_report(report):
+    print("\n" + "=" * 60)
+    print("MULTI-ROW PASTE THROUGHPUT")
+    print("=" * 60)
+    print(f"{'rows':>5} {'modal ms':>9} {'applied ms':>11} {'persisted ms':>13} {'rows/s':>7} {'misaligned':>11}")
+    for r in report["pastes"]:
+        rate = round(r["rows"] / (r["persisted_ms"] / 1000), 1) if r["persisted_ms"] else None
+        print(f"{r['rows']:>5} {r['modal_ms']!s:>9} {r['applied_ms']!s:>11} {r['persisted_ms']!s:>13} "
+              f"{rate!s:>7} {r['misaligned_cells']:>11}")
+    misaligned = [r["rows"] for r in report["pastes"] if r["misaligned_cells"]]
+    if misaligned:
+        print(f"\n❌ Column alignment broken for pastes of {misaligned} rows")
+    else:
+        print("\n✅ Every pasted value landed in the right patient and column")
+
+
+# Auto-save: edits cycle over the first AUTO_SAVE_ROWS rows and the row controls
+# handleFieldChange auto-saves (typed into, or a different dropdown option)
+AUTO_SAVE_EDITS = 6
+AUTO_SAVE_ROWS = 3
+AUTO_SAVE_FIELDS = list(ROW_CONTROL_LABELS)
+AUTO_SAVE_KEY_DELAY_MS = 60
+# After the first save lands, wait this long for redundant ones before the next edit
+AUTO_SAVE_QUIET_MS = AUTO_SAVE_DEBOUNCE_MS + 500
+# A save slower than this after the last keystroke counts as slow
+MAX_AUTO_SAVE_P95_MS = AUTO_SAVE_DEBOUNCE_MS + 2000
+
+# Tags input events (one per typed character or dropdown change), patient PATCHes and
+# saving/saved indicators with the current edit id
+AUTO_SAVE_PROBE_JS = """
+() => {
+  if (window.__autoSave) return;
+  const a = window.__autoSave = { edit: 0, keys: [], requests: [], indicators: [] };
+  document.addEventListener('input', () => a.keys.push({ edit: a.edit, t: performance.now() }), true);
+  const fetch = window.fetch;
+  window.fetch = function (input, init) {
+    const url = typeof input === 'string' ? input : input.url;
+    const method = ((init && init.method) || (typeof input === 'string' ? 'GET' : input.method)).toUpperCase();
+    if (method !== 'PATCH' || !/\\/api\\/patients\\/\\d+\\/?(\\?|$)/.test(url)) return fetch.apply(this, arguments);
+    const r = { edit: a.edit, start: performance.now(), end: null, status: null };
+    a.requests.push(r);
+    return fetch.apply(this, arguments).then(
+      res => { r.end = performance.now(); r.status = res.status; return res; },
+      err => { r.end = performance.now(); r.status = 0; throw err; });
+  };
+  new MutationObserver(records => {
+    for (const record of records) {
+      for (const node of record.addedNodes) {
+        // Skip big subtrees (row re-renders); indicators are small
+        const text = node.nodeType === 3 ? node.data : (node.childElementCount < 4 ? node.textContent : '');
+        if (/Saving|Saved/.test(text || '')) {
+          a.indicators.push({ edit: a.edit, t: performance.now(), text: text.trim().slice(0, 40) });
+          return;
+        }
+      }
+    }
+  }).observe(document.body, { childList: true, subtree: true, characterData: true });
+}
+"""
+
+AUTO_SAVE_EDIT_JS = """
+id => {
+  const a = window.__autoSave;
+  const mine = list => list.filter(x => x.edit === id);
+  return { keys: mine(a.keys).map(k => k.t), requests: mine(a.requests), indicators: mine(a.indicators) };
+}
+"""
+
+
+def auto_save_edit_timing(raw):
+    """Latencies of one edit, measured from its last keystroke"""
+    saves = sorted(raw["requests"], key=lambda r: r["start"])
+    last_key = max(raw["keys"]) if raw["keys"] else None
+    timing = {"keystrokes": len(raw["keys"]), "saves": len(saves), "redundant_saves": max(0, len(saves) - 1),
+              "save_delay_ms": None, "latency_ms": None, "request_ms": None, "indicator_ms": None,
+              "saved_mid_typing": bool(saves and last_key is not None and saves[0]["start"] < last_key)}
+    if not saves or last_key is None:
+        return timing
+    first = saves[0]
+    timing["save_delay_ms"] = round(first["start"] - last_key, 1)
+    timing["status"] = first["status"]
+    if first["end"] is not None:
+        timing["latency_ms"] = round(first["end"] - last_key, 1)
+        timing["request_ms"] = round(first["end"] - first["start"], 1)
+    shown = [i["t"] for i in raw["indicators"] if i["t"] >= first["start"]]
+    if shown:
+        timing["indicator_ms"] = round(min(shown) - last_key, 1)
+    return timing
+
+
+def measure_auto_save(page, edits=AUTO_SAVE_EDITS):
+    """Type N edits across rows and fields and time each one's debounced save"""
+    page.evaluate(AUTO_SAVE_PROBE_JS)
+    rows = min(AUTO_SAVE_ROWS, page.locator("table tbody tr").count())
+    if rows == 0:
+        return {"edits": [], "error": "no patient rows"}
+
+    def control(row, field):
+        return page.locator("table tbody tr").nth(row).locator(f"[aria-label^='{ROW_CONTROL_LABELS[field]} for']").first
+
+    originals, options = {}, {}
+    results = []
+    for i in range(edits):
+        # Rows and fields step together, so consecutive edits hit different rows and fields
+        row, field = i % rows, AUTO_SAVE_FIELDS[i % len(AUTO_SAVE_FIELDS)]
+        target = control(row, field)
+        if not target.is_visible():
+            continue
+        current = target.input_value()
+        originals.setdefault((row, field), current)
+        if target.evaluate("el => el.tagName") == "SELECT":
+            options[field] = target.locator("option").evaluate_all("options => options.map(o => o.value)")
+
+        edit_id = page.evaluate("() => ++window.__autoSave.edit")
+        if field in options:
+            target.select_option(next(value for value in options[field] if value and value != current))
+        else:
+            target.click()
+            target.press("End")
+            target.press_sequentially(f" autosave probe {i}", delay=AUTO_SAVE_KEY_DELAY_MS)
+        try:
+            page.wait_for_function("id => window.__autoSave.requests.some(r => r.edit === id && r.end !== null)",
+                                   arg=edit_id, timeout=AUTO_SAVE_DEBOUNCE_MS + 10000)
+        except PlaywrightTimeoutError:
+            pass
+        # Any further PATCH for this edit lands here: one save per keystroke, or a double fire
+        page.wait_for_timeout(AUTO_SAVE_QUIET_MS)
+        timing = auto_save_edit_timing(page.evaluate(AUTO_SAVE_EDIT_JS, edit_id))
+        timing.update(row=row, field=field)
+        results.append(timing)
+        print(f"   edit {i + 1}/{edits} (row {row + 1}, {field}): save after {timing['save_delay_ms']}ms, "
+              f"done {timing['latency_ms']}ms, {timing['saves']} save{'s' if timing['saves'] != 1 else ''}")
+
+    # Restores run outside any edit window, so they aren't counted
+    page.evaluate("() => { window.__autoSave.edit = 0; }")
+    for (row, field), original in originals.items():
+        target = control(row, field)
+        if field in options:
+            # A pasted value outside the options shows as "-" anyway
+            value = original if original in options[field] else ""
+            wait_for_patient_save(page, lambda: target.select_option(value), budget=AUTO_SAVE_QUIET_MS / 1000)
+        else:
+            wait_for_patient_save(page, lambda: target.fill(original), budget=AUTO_SAVE_QUIET_MS / 1000)
+
+    def values(key):
+        return [r[key] for r in results if r[key] is not None]
+
+    return {
+        "edits": results,
+        "latency_ms": distribution(values("latency_ms")),
+        "save_delay_ms": distribution(values("save_delay_ms")),
+        "request_ms": distribution(values("request_ms")),
+        "indicator_ms": distribution(values("indicator_ms")),
+        "redundant_saves": sum(r["redundant_saves"] for r in results),
+        "redundant_per_edit": round(sum(r["redundant_saves"] for r in results) / len(results), 2) if results else None,
+        "edits_without_save": sum(1 for r in results if not r["saves"]),
+        "saved_mid_typing": sum(1 for r in results if r["saved_mid_typing"]),
+    }
+
+
+def print_auto_save_report(report):
+    print(f"\n{'auto-save':<16} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'n':>4}")
+    for key, label in (("save_delay_ms", "debounce"), ("request_ms", "request"),
+                       ("latency_ms", "keystroke->saved"), ("indicator_ms", "indicator")):
+        d = report[key]
+        print(f"{label:<16} {d['p50']!s:>8} {d['p95']!s:>8} {d['max']!s:>8} {d['count']:>4}")
+    print(f"redundant saves: {report['redundant_saves']} ({report['redundant_per_edit']} per edit), "
+          f"edits without a save: {report['edits_without_save']}, saves mid-typing: {report['saved_mid_typing']}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Shared rounding sheet fixtures for the audit, benchmark and load scripts.
+
+Field names and dropdown options mirror ROUNDING_FIELD_ORDER and
+ROUNDING_DROPDOWN_OPTIONS in src/lib/constants.ts.
+"""
+
+# Sample rows from the Google Sheets rounding template (patient, signalment, then ROUNDING_FIELD_ORDER)
+TSV_PASTE_DATA = """Harley Rivera	9yo MN Lab mix	Treatment	Critical	Green	IVDD	MRI scheduled	Gabapentin 100mg TID	Yes	Yes	No	CBC in AM	Monitor neuro status	Good patient
+Test Patient	5yo FS DSH	ICU	Monitoring	Yellow	Seizures	Post-ictal	Keppra 500mg BID	No	Yes	Yes	EEG pending	Watch for clusters	Eating well"""
+
+LONG_TEXT = "This is a very long text entry that should test how the textarea handles overflow and whether it expands properly or clips the content. " * 5
+
+SPECIAL_CHARS = "Test with special chars: <script>alert('xss')</script> & \"quotes\" 'apostrophes' émojis 🐕 日本語"
+
+# Paste / TSV column order after the patient name and signalment columns
+ROUNDING_FIELD_ORDER = [
+    "location",
+    "icuCriteria",
+    "code",
+    "problems",
+    "diagnosticFindings",
+    "therapeutics",
+    "ivc",
+    "fluids",
+    "cri",
+    "overnightDx",
+    "concerns",
+    "comments",
+]
+
+DROPDOWN_OPTIONS = {
+    "location": ["IP", "ICU"],
+    "icuCriteria": ["Yes", "No", "n/a"],
+    "code": ["Green", "Yellow", "Orange", "Red"],
+    "ivc": ["Yes", "No"],
+    "fluids": ["Yes", "No", "n/a"],
+    "cri": ["Yes", "No", "No but...", "Yes but...", "n/a"],
+}
+
+# aria-label prefixes ("<prefix> for <patient>") of the desktop row's single-value
+# controls; each one auto-saves through handleFieldChange
+ROW_CONTROL_LABELS = {
+    "signalment": "Signalment",
+    "location": "Location",
+    "icuCriteria": "ICU Criteria",
+    "code": "Code status",
+    "ivc": "IVC",
+    "fluids": "Fluids",
+    "cri": "CRI",
+}
+
+# Free-text fields clinicians type into during rounds
+TEXT_FIELDS = ["signalment"] + [f for f in ROUNDING_FIELD_ORDER if f not in DROPDOWN_OPTIONS]
+
+# Typical snippets typed into the free-text fields
+EDIT_SNIPPETS = [
+    "Gabapentin 100mg PO TID",
+    "Recheck neuro exam in AM",
+    "Ambulatory paraparesis, improving",
+    "CBC/chem pending",
+    "Eating well, BAR",
+    "Watch for seizure clusters",
+    "MRI scheduled tomorrow",
+    "Keppra 500mg PO BID",
+]
+
+# Prefix on every synthetic patient so benchmarks can find and remove them
+SYNTHETIC_PREFIX = "BENCH-"
+
+
+def tsv_rows(tsv=TSV_PASTE_DATA):
+    """Split a TSV block into lists of cells"""
+    return [line.split("\t") for line in tsv.splitlines() if line.strip()]
+
+
+def synthetic_patients(count, start=0):
+    """
+    Patient payloads for POST /api/patients, expanded from the TSV_PASTE_DATA rows.
+
+    Names are numbered from `start` so a census can be grown in steps.
+    """
+    template = tsv_rows()
+    patients = []
+    for i in range(start, start + count):
+        name, signalment, *values = template[i % len(template)]
+        rounding = dict(zip(ROUNDING_FIELD_ORDER, values))
+        rounding["signalment"] = signalment
+        patients.append({
+            "status": "Active",
+            "type": "Medical",
+            "demographics": {"name": f"{SYNTHETIC_PREFIX}{i:04d} {name}"},
+            "roundingData": rounding,
+        })
+    return patients
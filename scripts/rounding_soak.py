@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Rounding sheet soak test.
+
+Keeps one /rounding page open for hours, the way clinicians leave it open for
+a shift. Every action interval, it runs the next step of a signalment edit,
+an auto-saved signalment edit, a comment chip added and removed through the
+multi-select's inline input, and a code dropdown change on the first patient
+row. Every sample interval, it forces a garbage collection over CDP and reads
+Performance.getMetrics. A control the row doesn't render is reported and its
+actions are skipped.
+
+A metric leaks when the Mann-Kendall test finds a significant upward trend
+and the Theil-Sen slope adds more than MIN_GROWTH of the starting value over
+the run. GC noise alone doesn't flag. Action latency is trend-tested the same
+way, so a sheet that gets slower by evening shows up even without a heap leak.
+The first row's values are restored at the end.
+"""
+
+import time
+
+from audit_stats import distribution, mann_kendall, theil_sen_slope
+from audit_waits import wait_for_patient_save, wait_for_ui_settle
+
+SOAK_METRICS = ["JSHeapUsedSize", "Nodes", "JSEventListeners"]
+DEFAULT_SAMPLE_SECONDS = 60
+DEFAULT_ACTION_SECONDS = 10
+TREND_ALPHA = 0.01
+# Growth over the run, relative to the first sample, before a trend counts as a leak
+MIN_GROWTH = 0.10
+
+ACTIONS = ["edit", "autosave", "chip", "dropdown"]
+# Desktop row controls, by the aria-labels RoundingSheet gives them
+ROW_CONTROLS = {
+    "signalment": "input[aria-label^='Signalment for']",
+    "code": "select[aria-label^='Code status for']",
+    # FieldMultiSelect's inline input; Enter adds the typed text as a chip
+    "comments": "input[aria-label^='Comments for']",
+}
+ACTION_CONTROLS = {"edit": "signalment", "autosave": "signalment", "chip": "comments", "dropdown": "code"}
+CHIP_PREFIX = "SOAK chip"
+
+
+class FirstRow:
+    """Locators for the controls the soak exercises, re-resolved on every use"""
+
+    def __init__(self, page):
+        self.page = page
+        row = page.locator("table tbody tr").first
+        self.signalment = row.locator(ROW_CONTROLS["signalment"]).first
+        self.code = row.locator(ROW_CONTROLS["code"]).first
+        self.comments = row.locator(ROW_CONTROLS["comments"]).first
+        self.comments_cell = self.comments.locator("xpath=ancestor::td[1]")
+
+    def missing(self):
+        """Names of the ROW_CONTROLS the first row doesn't render"""
+        return [name for name in ROW_CONTROLS if getattr(self, name).count() == 0]
+
+    def chip(self, text):
+        return self.comments_cell.locator("span", has_text=text)
+
+    def snapshot(self, controls):
+        return {name: getattr(self, name).input_value() for name in ("signalment", "code") if name in controls}
+
+    def restore(self, original):
+        def put_back():
+            # Chips left behind by an interrupted chip step
+            for _ in range(self.chip(CHIP_PREFIX).count()):
+                self.chip(CHIP_PREFIX).first.locator("svg").click()
+            if "signalment" in original:
+                self.signalment.fill(original["signalment"])
+            if "code" in original:
+                self.code.select_option(original["code"])
+        wait_for_patient_save(self.page, put_back, budget=5.0)
+
+
+def run_action(row, name, step):
+    """One soak step; returns its duration in seconds"""
+    started = time.monotonic()
+    if name == "edit":
+        row.signalment.fill(f"SOAK-{step}")
+    elif name == "autosave":
+        wait_for_patient_save(row.page, lambda: row.signalment.fill(f"SOAK autosave {step}"), budget=5.0)
+    elif name == "chip":
+        text = f"{CHIP_PREFIX} {step}"
+        row.comments.fill(text)
+        row.comments.press("Enter")
+        row.chip(text).first.wait_for(state="visible", timeout=5000)
+        # Removing it within the debounce leaves one save of the unchanged value
+        wait_for_patient_save(row.page, lambda: row.chip(text).first.locator("svg").click(), budget=5.0)
+    elif name == "dropdown":
+        row.code.select_option("Green" if step % 2 else "Yellow")
+        wait_for_ui_settle(row.page, budget=0.5)
+    return time.monotonic() - started
+
+
+def sample_metrics(cdp):
+    """Performance.getMetrics after a forced GC, so only retained memory is counted"""
+    cdp.send("HeapProfiler.collectGarbage")
+    values = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    return {name: values.get(name) for name in SOAK_METRICS}
+
+
+def trend(times, values):
+    """Trend test plus the growth the slope implies over the whole run"""
+    result = mann_kendall(values, alpha=TREND_ALPHA)
+    slope = theil_sen_slope(times, values)
+    first = values[0] if values else None
+    growth = slope * (times[-1] - times[0]) / first if slope is not None and first else None
+    result.update(
+        first=first,
+        last=values[-1] if values else None,
+        slope_per_hour=round(slope * 3600, 3) if slope is not None else None,
+        growth=round(growth, 4) if growth is not None else None,
+        leak=result["trend"] == "increasing" and growth is not None and growth > MIN_GROWTH,
+    )
+    return result
+
+
+def run_soak(page, cdp, hours, sample_seconds=DEFAULT_SAMPLE_SECONDS, action_seconds=DEFAULT_ACTION_SECONDS):
+    """Exercise the open page for `hours`, sampling CDP metrics; returns the report"""
+    cdp.send("Performance.enable")
+    row = FirstRow(page)
+    missing = row.missing()
+    if missing:
+        print(f"   ⚠️  First row has no {', '.join(missing)} control; skipping the actions that need it")
+    active = [name for name in ACTIONS if ACTION_CONTROLS[name] not in missing]
+    original = row.snapshot([name for name in ROW_CONTROLS if name not in missing])
+
+    started = time.monotonic()
+    deadline = started + hours * 3600
+    samples, actions, failures = [], {name: [] for name in ACTIONS}, {}
+    next_sample = started
+    next_progress = started + 3600
+    step = 0
+    try:
+        while True:
+            now = time.monotonic()
+            if now >= next_sample:
+                samples.append({"t": round(now - started, 1), **sample_metrics(cdp)})
+                next_sample = now + sample_seconds
+            if now >= deadline:
+                break
+            if now >= next_progress:
+                heap = samples[-1]["JSHeapUsedSize"] or 0
+                print(f"   {len(samples)} samples after {(now - started) / 3600:.1f}h, heap {heap / 1e6:.1f}MB")
+                next_progress += 3600
+
+            if not active:
+                page.wait_for_timeout(action_seconds * 1000)
+                continue
+            name = active[step % len(active)]
+            try:
+                actions[name].append((round(now - started, 1), run_action(row, name, step)))
+            except Exception as e:
+                failures[name] = failures.get(name, 0) + 1
+                if failures[name] == 1:
+                    print(f"   ⚠️  {name} failed: {e}")
+            step += 1
+            page.wait_for_timeout(max(0, action_seconds - (time.monotonic() - now)) * 1000)
+    finally:
+        row.restore(original)
+
+    times = [s["t"] for s in samples]
+    report = {
+        "hours": hours,
+        "sample_seconds": sample_seconds,
+        "action_seconds": action_seconds,
+        "steps": step,
+        "samples": samples,
+        "metrics": {name: trend(times, [s[name] for s in samples]) for name in SOAK_METRICS
+                    if all(s[name] is not None for s in samples)},
+        "actions": {},
+        "failures": failures,
+        "missing_controls": missing,
+    }
+    for name, timed in actions.items():
+        if name not in active:
+            continue
+        durations = [seconds for _, seconds in timed]
+        report["actions"][name] = {**distribution(durations, scale=1000),
+                                   "trend": trend([t for t, _ in timed], durations)}
+    report["leaks"] = [name for name, result in report["metrics"].items() if result["leak"]]
+    report["slowing"] = [name for name, result in report["actions"].items() if result["trend"]["leak"]]
+    return report
+
+
+def print_soak_report(report):
+    print("\n" + "=" * 60)
+    print(f"SOAK TEST: {report['hours']}h, {report['steps']} actions, {len(report['samples'])} samples")
+    print("=" * 60)
+    print(f"{'metric':<18} {'first':>12} {'last':>12} {'slope/h':>12} {'growth':>8} {'MK p':>9}")
+    for name, r in report["metrics"].items():
+        p = f"{r['p']:.1e}" if r["p"] is not None else "-"
+        growth = f"{r['growth']:+.1%}" if r["growth"] is not None else "-"
+        flag = "  ❌ leak" if r["leak"] else ""
+        print(f"{name:<18} {r['first']:>12.0f} {r['last']:>12.0f} {r['slope_per_hour']!s:>12} {growth:>8} {p:>9}{flag}")
+
+    print(f"\n{'action':<10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'growth':>8}")
+    for name, r in report["actions"].items():
+        growth = f"{r['trend']['growth']:+.1%}" if r["trend"]["growth"] is not None else "-"
+        flag = "  ❌ slowing" if r["trend"]["leak"] else ""
+        print(f"{name:<10} {r['p50']!s:>8} {r['p95']!s:>8} {r['max']!s:>8} {growth:>8}{flag}")
+    for name, count in report["failures"].items():
+        print(f"⚠️  {name} failed {count} times")
+    for name in report["missing_controls"]:
+        print(f"⚠️  No {name} control on the first row; its actions were skipped")
+
+    if report["leaks"] or report["slowing"]:
+        print(f"\n❌ Growth over the shift: {', '.join(report['leaks'] + report['slowing'])}")
+    else:
+        print("\n✅ No monotonic growth in heap, DOM nodes, listeners or action latency")
@@ -5,21 +5,48 @@ Tests all 7 phases of the implementation on Railway
 """
 
 from playwright.sync_api import sync_playwright
-import time
+import argparse
+import json
 import os
+import time
+from datetime import datetime
 
-BASE_URL = "https://empathetic-clarity-production.up.railway.app"
-SCREENSHOTS_DIR = "/tmp/acvim-tests"
+from audit_config import PRODUCTION_URL, base_url_from_env, output_dir_from_env
+from audit_events import EventSink
+from audit_metrics import PageMetrics
+from audit_probe import probe
+from audit_profile import PROFILER
+from audit_screenshots import ScreenshotService
+import audit_viewports
+from audit_waits import LEDGER, wait_for_network_quiet
+from fake_backend import FakeBackend, route_api
+from perf_history import record_run
+
+BASE_URL = base_url_from_env(PRODUCTION_URL)
+SCREENSHOTS_DIR = output_dir_from_env("/tmp/acvim-tests")
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
-def test_acvim_tracker():
+def test_acvim_tracker(offline=False, backend=None):
+    if offline:
+        # Stopped however the run ends
+        with FakeBackend() as backend:
+            return test_acvim_tracker(backend=backend)
+    offline = backend is not None
     ensure_dir(SCREENSHOTS_DIR)
+    started = time.monotonic()
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(viewport={"width": 1440, "height": 900})
+        metrics = PageMetrics()
+        metrics.attach(context)
+        if backend:
+            route_api(context, backend.url)
+        shots = ScreenshotService(SCREENSHOTS_DIR)
+        events = EventSink(f"{SCREENSHOTS_DIR}/events.jsonl")
+        events.attach_context(context)
         page = context.new_page()
 
         results = []
@@ -27,9 +54,9 @@ def test_acvim_tracker():
         # Test 1: Navigate to residency page
         print("\n=== Test 1: Navigate to /residency ===")
         try:
-            page.goto(f"{BASE_URL}/residency", timeout=30000)
+            metrics.goto(page, f"{BASE_URL}/residency", timeout=30000)
             page.wait_for_load_state("networkidle")
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/01-initial-load.png", full_page=True)
+            shots.capture(page, "01-initial-load")
 
             # Check for main elements
             title = page.locator("h1").first
@@ -46,9 +73,9 @@ def test_acvim_tracker():
         print("\n=== Test 2: Check tabs ===")
         try:
             tabs = ["Profile", "Weekly", "Cases", "Journal", "Summary"]
+            found = probe(page, button_texts=tabs)["button_texts"]
             for tab in tabs:
-                tab_button = page.locator(f"button:has-text('{tab}')")
-                if tab_button.count() > 0:
+                if found[tab] > 0:
                     print(f"  Tab '{tab}' found")
                 else:
                     print(f"  Tab '{tab}' NOT FOUND")
@@ -66,7 +93,7 @@ def test_acvim_tracker():
                 results.append(("Profile form", "PASS"))
             else:
                 results.append(("Profile form", "PASS - Profile section visible"))
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/02-profile-tab.png", full_page=True)
+            shots.capture(page, "02-profile-tab")
         except Exception as e:
             results.append(("Profile form", f"FAIL - {e}"))
 
@@ -74,9 +101,8 @@ def test_acvim_tracker():
         print("\n=== Test 4: Weekly Schedule tab ===")
         try:
             weekly_tab = page.locator("button:has-text('Weekly')").first
-            weekly_tab.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/03-weekly-tab.png", full_page=True)
+            wait_for_network_quiet(page, weekly_tab.click)
+            shots.capture(page, "03-weekly-tab")
 
             # Check for schedule table or month headers
             month_headers = page.locator("text=/Month \\d+/")
@@ -98,9 +124,8 @@ def test_acvim_tracker():
         print("\n=== Test 5: Cases tab ===")
         try:
             cases_tab = page.locator("button:has-text('Cases')").first
-            cases_tab.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/04-cases-tab.png", full_page=True)
+            wait_for_network_quiet(page, cases_tab.click)
+            shots.capture(page, "04-cases-tab")
 
             # Check for Add Case button
             add_btn = page.locator("button:has-text('Add Case'), button:has-text('New Case')")
@@ -116,9 +141,8 @@ def test_acvim_tracker():
         print("\n=== Test 6: Journal Club tab ===")
         try:
             journal_tab = page.locator("button:has-text('Journal')").first
-            journal_tab.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/05-journal-tab.png", full_page=True)
+            wait_for_network_quiet(page, journal_tab.click)
+            shots.capture(page, "05-journal-tab")
 
             # Check for Add Entry button
             add_btn = page.locator("button:has-text('Add Entry'), button:has-text('New Entry'), button:has-text('Add Session')")
@@ -134,9 +158,8 @@ def test_acvim_tracker():
         print("\n=== Test 7: Summary tab (Phase 7 - Progress Bars) ===")
         try:
             summary_tab = page.locator("button:has-text('Summary')").first
-            summary_tab.click()
-            page.wait_for_timeout(1000)
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/06-summary-tab.png", full_page=True)
+            wait_for_network_quiet(page, summary_tab.click)
+            shots.capture(page, "06-summary-tab")
 
             # Check for ACVIM Requirements Progress section
             progress_section = page.locator("text=ACVIM Requirements Progress")
@@ -177,23 +200,35 @@ def test_acvim_tracker():
         except Exception as e:
             results.append(("Year selector", f"FAIL - {e}"))
 
-        # Test 10: Mobile responsiveness
-        print("\n=== Test 10: Mobile responsiveness ===")
+        # Test 10: Responsive layout, every device profile at once
+        print("\n=== Test 10: Responsive viewports ===")
         try:
-            # Resize to mobile
-            page.set_viewport_size({"width": 375, "height": 812})
-            page.goto(f"{BASE_URL}/residency")
-            page.wait_for_load_state("networkidle")
-            page.screenshot(path=f"{SCREENSHOTS_DIR}/07-mobile-view.png", full_page=True)
-
-            # Check tabs still accessible
-            tabs = page.locator("button[role='tab'], nav button")
-            print(f"  Mobile: Found {tabs.count()} navigation elements")
-            results.append(("Mobile responsiveness", "PASS"))
+            matrix = audit_viewports.run_matrix(
+                f"{BASE_URL}/residency", probe_options={"counts": {"nav": "button[role='tab'], nav button"}},
+                shots=shots, events=events, metrics=metrics, prefix="07-viewport",
+                api_url=backend.url if backend else None, storage_state=context.storage_state())
+            for result in matrix:
+                if result["error"]:
+                    results.append((f"Responsive {result['profile']}", f"FAIL - {result['error']}"))
+                    continue
+                # Check tabs still accessible
+                nav = result["facts"]["counts"]["nav"]
+                print(f"  {result['profile']}: Found {nav} navigation elements")
+                result["findings"] += audit_viewports.responsive_findings(result)
+                if not nav:
+                    results.append((f"Responsive {result['profile']}", "FAIL - No navigation elements"))
+                elif result["findings"]:
+                    results.append((f"Responsive {result['profile']}", f"CHECK - {result['findings'][0][1]}"))
+                else:
+                    results.append((f"Responsive {result['profile']}", "PASS"))
+            audit_viewports.print_report([audit_viewports.summary(result) for result in matrix])
         except Exception as e:
-            results.append(("Mobile responsiveness", f"FAIL - {e}"))
+            results.append(("Responsive viewports", f"FAIL - {e}"))
 
+        metrics.finish()
         browser.close()
+        shots.close()
+        events.close()
 
         # Print summary
         print("\n" + "=" * 50)
@@ -212,10 +247,38 @@ def test_acvim_tracker():
                 failed += 1
 
         print(f"\nTotal: {passed} passed, {failed} failed")
+        metrics.print_report()
+        LEDGER.print_report()
+        shots.print_report()
+        events.print_report()
         print(f"\nScreenshots saved to: {SCREENSHOTS_DIR}/")
 
+        run_results = {
+            "timestamp": datetime.now().isoformat(),
+            "url": BASE_URL,
+            "offline": offline,
+            "results": [{"test": name, "result": result} for name, result in results],
+            "timings": [{"test": "test_acvim_tracker", "seconds": round(time.monotonic() - started, 3)}],
+            "page_metrics": metrics.samples,
+            "screenshots": shots.summary(),
+            "events": events.summary(),
+        }
+        results_path = f"{SCREENSHOTS_DIR}/results.json"
+        with open(results_path, "w") as f:
+            json.dump(run_results, f, indent=2)
+        print(f"Results saved to: {results_path}")
+        record_run("acvim-offline" if offline else "acvim", run_results, BASE_URL)
+
         return failed == 0
 
 if __name__ == "__main__":
-    success = test_acvim_tracker()
+    parser = argparse.ArgumentParser(description="ACVIM residency tracker checks")
+    parser.add_argument("--offline", action="store_true",
+                        help="serve /api/ from an in-memory fake backend instead of the app's database")
+    args = parser.parse_args()
+    PROFILER.install("acvim")
+    with PROFILER.test("test_acvim_tracker"):
+        success = test_acvim_tracker(offline=args.offline)
+    PROFILER.print_report()
+    print(f"Profile saved to: {PROFILER.write_collapsed(f'{SCREENSHOTS_DIR}/profile.collapsed')}")
     exit(0 if success else 1)
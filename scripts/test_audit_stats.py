@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Unit tests for audit_stats.
+
+    python -m pytest scripts/test_audit_stats.py
+"""
+
+import unittest
+
+from audit_stats import distribution, percentile
+
+
+class PercentileTest(unittest.TestCase):
+    def test_empty(self):
+        self.assertIsNone(percentile([], 50))
+
+    def test_odd_length_median(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(percentile(list(range(1, 22)), 50), 11)
+        self.assertEqual(percentile([7], 50), 7)
+
+    def test_nearest_rank(self):
+        values = list(range(1, 21))
+        self.assertEqual(percentile(values, 50), 10)
+        self.assertEqual(percentile(values, 95), 19)
+        self.assertEqual(percentile(values, 100), 20)
+        self.assertEqual(percentile(values, 0), 1)
+        self.assertEqual(percentile(list(range(1, 101)), 7), 7)
+
+    def test_unsorted_input(self):
+        self.assertEqual(percentile([5, 1, 4, 2, 3], 95), 5)
+
+    def test_distribution(self):
+        summary = distribution([0.001, 0.002, 0.003], scale=1000)
+        self.assertEqual(summary, {"count": 3, "p50": 2.0, "p95": 3.0, "max": 3.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Visual regression check for the audit screenshots.
+
+Each <name>.png an audit wrote is compared with the approved baseline of the
+same name. Pixels whose largest channel difference exceeds pixel_threshold
+count as changed, and the image is split into tiles; a tile fails when the
+share of changed pixels in it exceeds its tolerance. Tiles are checked in
+bands, so a regressed shot stops at the first failing band. Only regressed
+shots are then diffed in full, to write a heatmap to visual-diffs/<name>.png.
+
+Tolerances live in visual-tolerances.json. Per-shot regions override the tile
+tolerance for the tiles they overlap, or ignore them:
+
+    "shots": {"01-initial-load": {"regions": [
+        {"x": 0, "y": 0, "width": 1440, "height": 80, "ignore": true},
+        {"x": 0, "y": 80, "width": 400, "height": 820, "tile_tolerance": 0.1}
+    ]}}
+
+Baselines are kept per suite in $VETHUB_BASELINE_DIR (default
+.visual-baselines/ in the repo root).
+
+Usage:
+    python scripts/visual_diff.py compare --suite rounding
+    python scripts/visual_diff.py approve --suite rounding [NAME ...]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_ROOT = os.environ.get("VETHUB_BASELINE_DIR", os.path.join(REPO_ROOT, ".visual-baselines"))
+TOLERANCES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "visual-tolerances.json")
+
+# Where each audit writes its screenshots (suite names match perf_history)
+SUITE_DIRS = {
+    "rounding": "/tmp/vethub-rounding-deep-audit",
+    "main-page": "/tmp/vethub-audit",
+    "acvim": "/tmp/acvim-tests",
+}
+
+DEFAULTS = {"pixel_threshold": 24, "tile_size": 32, "tile_tolerance": 0.02}
+# Tile rows checked per vectorized step before deciding whether to stop
+BAND_TILE_ROWS = 4
+DIFF_DIR = "visual-diffs"
+
+
+def load_tolerances(path=TOLERANCES_PATH):
+    if not path or not os.path.exists(path):
+        return {"default": dict(DEFAULTS), "shots": {}}
+    with open(path) as f:
+        config = json.load(f)
+    return {"default": {**DEFAULTS, **config.get("default", {})}, "shots": config.get("shots", {})}
+
+
+def shot_settings(tolerances, name):
+    settings = {**tolerances["default"], **tolerances["shots"].get(name, {})}
+    settings.setdefault("regions", [])
+    return settings
+
+
+def load_rgb(path):
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"), dtype=np.int16)
+
+
+def tolerance_grid(shape, settings):
+    """Per-tile tolerance; regions override the tiles they overlap (ignore = inf, no tolerance = the shot's)"""
+    tile = settings["tile_size"]
+    rows, cols = -(-shape[0] // tile), -(-shape[1] // tile)
+    grid = np.full((rows, cols), settings["tile_tolerance"], dtype=np.float64)
+    for region in settings["regions"]:
+        r0, c0 = region["y"] // tile, region["x"] // tile
+        r1 = -(-(region["y"] + region["height"]) // tile)
+        c1 = -(-(region["x"] + region["width"]) // tile)
+        grid[r0:r1, c0:c1] = np.inf if region.get("ignore") else region.get("tile_tolerance",
+                                                                             settings["tile_tolerance"])
+    return grid
+
+
+def changed_pixels(current, baseline, threshold):
+    return np.abs(current - baseline).max(axis=2) > threshold
+
+
+def tile_ratios(changed, tile):
+    """Share of changed pixels per tile, edge tiles included"""
+    height, width = changed.shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=np.uint32)
+    padded[:height, :width] = changed
+    counts = padded.reshape(rows, tile, cols, tile).sum(axis=(1, 3))
+
+    area = np.full((rows, cols), tile * tile, dtype=np.float64)
+    if height % tile:
+        area[-1, :] = (height % tile) * tile
+    if width % tile:
+        area[:, -1] *= (width % tile) / tile
+    return counts / area
+
+
+def first_failing_band(current, baseline, settings, grid):
+    """Index of the first band with a tile over tolerance, or None"""
+    tile = settings["tile_size"]
+    band = tile * BAND_TILE_ROWS
+    for start in range(0, current.shape[0], band):
+        changed = changed_pixels(current[start:start + band], baseline[start:start + band],
+                                 settings["pixel_threshold"])
+        if not changed.any():
+            continue
+        rows = grid[start // tile:start // tile + BAND_TILE_ROWS]
+        if (tile_ratios(changed, tile) > rows).any():
+            return start // band
+    return None
+
+
+def write_heatmap(current, changed, path):
+    """Changed pixels in red over a dimmed greyscale of the current shot"""
+    grey = (current.mean(axis=2) * 0.4).astype(np.uint8)
+    heat = np.stack([grey, grey, grey], axis=2)
+    heat[changed] = (255, 0, 0)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.fromarray(heat).save(path)
+
+
+def compare_shot(job):
+    """Compare one screenshot with its baseline; runs in a worker process"""
+    name, current_path, baseline_path, settings, diff_path = job
+    started = time.monotonic()
+    result = {"name": name}
+    if not os.path.exists(baseline_path):
+        result["status"] = "new"
+        return result
+
+    with open(current_path, "rb") as a, open(baseline_path, "rb") as b:
+        if a.read() == b.read():
+            result.update(status="identical", seconds=round(time.monotonic() - started, 4))
+            return result
+
+    current, baseline = load_rgb(current_path), load_rgb(baseline_path)
+    if current.shape != baseline.shape:
+        result.update(status="regressed", reason=f"size {baseline.shape[1]}x{baseline.shape[0]} -> "
+                                                 f"{current.shape[1]}x{current.shape[0]}")
+        return result
+
+    grid = tolerance_grid(current.shape, settings)
+    band = first_failing_band(current, baseline, settings, grid)
+    if band is None:
+        result["status"] = "within tolerance"
+    else:
+        changed = changed_pixels(current, baseline, settings["pixel_threshold"])
+        ratios = tile_ratios(changed, settings["tile_size"])
+        failing = np.argwhere(ratios > grid)
+        write_heatmap(current, changed, diff_path)
+        result.update(
+            status="regressed",
+            changed_pixels=int(changed.sum()),
+            changed_ratio=round(float(changed.mean()), 5),
+            failing_tiles=len(failing),
+            first_tile={"x": int(failing[0][1]) * settings["tile_size"],
+                        "y": int(failing[0][0]) * settings["tile_size"]},
+            heatmap=diff_path,
+        )
+    result["seconds"] = round(time.monotonic() - started, 4)
+    return result
+
+
+def screenshot_names(directory):
+    """Shot names from the screenshot service manifest, or every top-level PNG"""
+    manifest = os.path.join(directory, "screenshots.json")
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            return sorted(json.load(f))
+    return sorted(entry[:-4] for entry in os.listdir(directory) if entry.endswith(".png"))
+
+
+def compare(suite, directory, tolerances_path=TOLERANCES_PATH, workers=None):
+    """Compare every screenshot with its baseline; returns an exit code"""
+    tolerances = load_tolerances(tolerances_path)
+    baseline_dir = os.path.join(BASELINE_ROOT, suite)
+    diff_dir = os.path.join(directory, DIFF_DIR)
+    shutil.rmtree(diff_dir, ignore_errors=True)
+
+    jobs = [(name, os.path.join(directory, f"{name}.png"), os.path.join(baseline_dir, f"{name}.png"),
+             shot_settings(tolerances, name), os.path.join(diff_dir, f"{name}.png"))
+            for name in screenshot_names(directory)]
+    if not jobs:
+        print(f"No screenshots in {directory}")
+        return 1
+
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(compare_shot, jobs, chunksize=max(1, len(jobs) // 32)))
+    elapsed = time.monotonic() - started
+
+    icons = {"identical": "✅", "within tolerance": "✅", "new": "🆕", "regressed": "❌"}
+    for r in results:
+        if r["status"] == "regressed":
+            detail = r.get("reason") or (f"{r['failing_tiles']} tiles over tolerance, first at "
+                                         f"({r['first_tile']['x']}, {r['first_tile']['y']}), "
+                                         f"heatmap {r['heatmap']}")
+            print(f"{icons['regressed']} {r['name']}: {detail}")
+        elif r["status"] == "new":
+            print(f"{icons['new']} {r['name']}: no baseline yet (run approve)")
+
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in icons}
+    print(f"\n🖼️  {len(results)} screenshots in {elapsed:.2f}s: "
+          + ", ".join(f"{count} {status}" for status, count in counts.items() if count))
+
+    with open(os.path.join(directory, "visual-diff.json"), "w") as f:
+        json.dump({"suite": suite, "baselines": baseline_dir, "seconds": round(elapsed, 3),
+                   "results": results}, f, indent=2)
+    return 1 if counts["regressed"] else 0
+
+
+def approve(suite, directory, names=None):
+    """Copy the current screenshots (or just `names`) over the baselines"""
+    baseline_dir = os.path.join(BASELINE_ROOT, suite)
+    os.makedirs(baseline_dir, exist_ok=True)
+    names = names or screenshot_names(directory)
+    for name in names:
+        shutil.copyfile(os.path.join(directory, f"{name}.png"), os.path.join(baseline_dir, f"{name}.png"))
+    print(f"✅ Approved {len(names)} {suite} screenshots into {baseline_dir}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Visual regression check for audit screenshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    compare_parser = sub.add_parser("compare", help="diff screenshots against the baselines")
+    approve_parser = sub.add_parser("approve", help="accept screenshots as the new baselines")
+    for p in (compare_parser, approve_parser):
+        p.add_argument("--suite", required=True, choices=sorted(SUITE_DIRS))
+        p.add_argument("--dir", help="screenshot directory (default: where the suite writes them)")
+    compare_parser.add_argument("--tolerances", default=TOLERANCES_PATH, help="JSON tolerance config")
+    compare_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    approve_parser.add_argument("names", nargs="*", help="screenshot names (default: all)")
+
+    args = parser.parse_args(argv)
+    directory = args.dir or SUITE_DIRS[args.suite]
+    if args.command == "approve":
+        return approve(args.suite, directory, args.names)
+    return compare(args.suite, directory, args.tolerances, args.workers)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
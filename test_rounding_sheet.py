@@ -9,17 +9,37 @@ Test rounding sheet fixes:
 """
 
 from playwright.sync_api import sync_playwright
-import time
+import argparse
+import os
+import sys
 
-def test_rounding_sheet():
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from audit_clock import VirtualClock, probe_debounce
+from audit_config import output_dir_from_env
+from audit_events import EventSink
+from audit_profile import PROFILER
+from audit_waits import LEDGER, wait_for_hydration, wait_for_patient_save, wait_for_toast, wait_until
+
+# Event stream and profile; $VETHUB_AUDIT_DIR keeps sharded runs apart
+OUTPUT_DIR = output_dir_from_env('/tmp')
+
+def test_rounding_sheet(virtual_clock=False):
     with sync_playwright() as p:
         # Launch browser in headless mode
         browser = p.chromium.launch(headless=False)  # Use headless=False to see the test
         context = browser.new_context()
         page = context.new_page()
 
-        # Enable console logging
-        page.on('console', lambda msg: print(f'[Browser Console] {msg.type}: {msg.text}'))
+        clock = None
+        if virtual_clock:
+            # Installed before navigation so the debounce timers run on it
+            clock = VirtualClock(page)
+            clock.install()
+
+        # Console logging: each distinct message is echoed once, everything streams to JSONL
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        events = EventSink(os.path.join(OUTPUT_DIR, 'rounding_events.jsonl'), echo=True)
+        events.attach(page)
 
         print("🧪 Testing Rounding Sheet Fixes...")
         print("=" * 60)
@@ -28,7 +48,7 @@ def test_rounding_sheet():
         print("\n1️⃣ Navigating to rounding sheet...")
         page.goto('http://localhost:3002/rounding')
         page.wait_for_load_state('networkidle')
-        time.sleep(2)
+        wait_for_hydration(page)
 
         # Take initial screenshot
         page.screenshot(path='/tmp/rounding_initial.png', full_page=True)
@@ -47,11 +67,19 @@ def test_rounding_sheet():
                 if signalment_input.is_visible():
                     print("   Typing in signalment field...")
                     signalment_input.click()
-                    signalment_input.fill("10y MN Lab - TEST AUTO SAVE")
 
-                    # Wait for auto-save (2 seconds delay + processing)
-                    print("   Waiting for auto-save (3 seconds)...")
-                    time.sleep(3)
+                    fill = lambda: signalment_input.fill("10y MN Lab - TEST AUTO SAVE")
+                    if clock:
+                        # Jump past the 2 second debounce instead of waiting for it
+                        probe = probe_debounce(page, clock, fill)
+                        status = "✅" if probe['ok'] else "❌"
+                        print(f"   {status} Saves at {probe['before_ms']}ms: {probe['saves_before']}, "
+                              f"at {probe['after_ms']}ms: {probe['saves_after']}")
+                        wait_for_toast(page, 'Saved', budget=0)
+                    else:
+                        # Wait for the debounced auto-save request (2 seconds delay + processing)
+                        print("   Waiting for auto-save...")
+                        wait_for_patient_save(page, fill, budget=3.0)
 
                     # Check for save status indicators
                     saved_indicator = page.locator('text=/Saved|Saving/').first
@@ -91,7 +119,7 @@ def test_rounding_sheet():
                     input.dispatchEvent(event);
                 """)
 
-                time.sleep(1)
+                wait_for_toast(page, 'Pasted')
                 page.screenshot(path='/tmp/rounding_paste.png', full_page=True)
 
                 # Check if toast appeared
@@ -128,7 +156,7 @@ def test_rounding_sheet():
                 back_link = page.locator('text=Back to VetHub').first
                 if back_link.is_visible():
                     back_link.click()
-                    time.sleep(0.5)
+                    wait_until(page, lambda: dialog_triggered['value'], helper='dialog')
 
                     if dialog_triggered['value']:
                         print("   ✅ Unsaved changes warning appeared!")
@@ -170,8 +198,19 @@ def test_rounding_sheet():
         print("  2. Edit a cell and wait 2 seconds (auto-save)")
         print("  3. Paste tab-separated data (all fields should fill)")
         print("  4. Try to navigate away (warning should appear)")
+        LEDGER.print_report()
 
         browser.close()
+        events.close()
+        events.print_report()
 
 if __name__ == '__main__':
-    test_rounding_sheet()
+    parser = argparse.ArgumentParser(description='Test rounding sheet fixes')
+    parser.add_argument('--virtual-clock', action='store_true',
+                        help='fast-forward the auto-save debounce with a controllable page clock')
+    args = parser.parse_args()
+    PROFILER.install('rounding-fixes')
+    with PROFILER.test('test_rounding_sheet'):
+        test_rounding_sheet(virtual_clock=args.virtual_clock)
+    PROFILER.print_report()
+    print(f"Profile saved to: {PROFILER.write_collapsed(os.path.join(OUTPUT_DIR, 'rounding_profile.collapsed'))}")
@@ -2,55 +2,199 @@
 """
 Script to transform the SOAP Builder modal to a compact two-column layout.
 This script will update the page.tsx file with all necessary changes.
+
+The rules live in soap_modal_rules.json. They are compiled into one combined
+regex and applied in a single scan of the file. Each rule sees the original
+text rather than the previous rule's output. Where rules overlap, the earliest
+rule in the table wins.
 """
 
+import argparse
+import difflib
+import glob
+import hashlib
+import json
+import os
 import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.path.join(REPO_ROOT, "soap_modal_rules.json")
+DEFAULT_TARGET = os.path.join(REPO_ROOT, "src", "app", "page.tsx")
+TREE_PATTERN = os.path.join("src", "**", "*.tsx")
+# Files known to be up to date with a given rule table, so reruns skip them
+CACHE_PATH = os.path.join(REPO_ROOT, ".codemod-cache.json")
+
+# Group references (\1, \g<name>); rule patterns can't use them once combined
+BACKREFERENCE = re.compile(r"\\(\d|g<)")
+
+
+class Rewriter:
+    """Applies a table of {name, pattern, replacement} rules in one pass"""
+
+    def __init__(self, rules):
+        self.rules = []
+        for rule in rules:
+            if BACKREFERENCE.search(rule["pattern"]):
+                raise ValueError(f"rule {rule['name']}: backreferences inside a pattern can't be combined")
+            self.rules.append({
+                "name": rule["name"],
+                "compiled": re.compile(rule["pattern"]),
+                "replacement": rule["replacement"],
+                # Replacements with backslashes (group references, escapes) are expanded per match
+                "expand": "\\" in rule["replacement"],
+            })
+        # No wrapping groups: they would stop re from skipping ahead to the rules' first characters
+        self.combined = re.compile("|".join(f"(?:{rule['pattern']})" for rule in rules))
+        self.hits = {rule["name"]: 0 for rule in self.rules}
+
+    def _replace(self, match):
+        # The alternation picked the first rule that matches here; find it again for its groups
+        for rule in self.rules:
+            rule_match = rule["compiled"].match(match.string, match.start())
+            if rule_match:
+                break
+        self.hits[rule["name"]] += 1
+        if not rule["expand"]:
+            return rule["replacement"]
+        return rule_match.expand(rule["replacement"])
+
+    def apply(self, content):
+        return self.combined.sub(self._replace, content)
 
-def transform_file(file_path):
+
+def load_rules(path=RULES_PATH):
+    with open(path) as f:
+        return json.load(f)["rules"]
+
+
+def transform_file(file_path, rules_path=RULES_PATH):
     with open(file_path, 'r') as f:
         content = f.read()
 
-    # Store the original content for safety
-    original_content = content
-
-    # Transform all remaining input/select/textarea classes to be more compact
-    # Change px-4 py-2 to px-3 py-1.5 or px-3 py-1
-    content = re.sub(
-        r'className="(w-full\s+)?px-4 py-2 bg-slate-800 border border-slate-600 rounded-lg text-white',
-        r'className="\1px-3 py-1 bg-slate-800 border border-slate-600 rounded-lg text-sm text-white',
-        content
-    )
-
-    # Change section headers from text-xl to text-base
-    content = re.sub(
-        r'className="text-xl font-bold text-purple-400 mb-3"',
-        r'className="text-base font-bold text-purple-400"',
-        content
-    )
-
-    # Change section padding from p-4 to p-3
-    content = re.sub(
-        r'<div className="bg-slate-900/50 border border-slate-700 rounded-lg p-4">',
-        r'<div className="bg-slate-900/50 border border-slate-700 rounded-lg overflow-hidden">',
-        content
-    )
-
-    # Change gap-4 to gap-2
-    content = re.sub(r'gap-4', r'gap-2', content)
-
-    # Change button padding from px-3 py-2 to px-2 py-1 for quick fill buttons
-    content = re.sub(
-        r'className="px-3 py-2 bg-emerald-600 hover:bg-emerald-500 text-white rounded-lg font-bold text-sm"',
-        r'className="px-2 py-1 bg-emerald-600 hover:bg-emerald-500 text-white rounded text-xs font-bold"',
-        content
-    )
+    rewriter = Rewriter(load_rules(rules_path))
+    transformed = rewriter.apply(content)
 
     # Write the transformed content
-    with open(file_path, 'w') as f:
-        f.write(content)
+    if transformed != content:
+        with open(file_path, 'w') as f:
+            f.write(transformed)
 
     print("Transformation complete!")
-    print(f"Modified {file_path}")
+    print(f"Modified {file_path}" if transformed != content else f"No changes to {file_path}")
+    for name, count in rewriter.hits.items():
+        print(f"   {name}: {count}")
+    return rewriter.hits
+
+# Tree-wide runner: each worker process builds its own Rewriter once
+_worker_rewriter = None
+
+
+def _init_worker(rules):
+    global _worker_rewriter
+    _worker_rewriter = Rewriter(rules)
+
+
+def _transform_job(job):
+    """Rewrite one file in a worker; returns what changed (and the diff in dry-run mode)"""
+    path, dry_run = job
+    with open(path) as f:
+        content = f.read()
+    hits = _worker_rewriter.hits = dict.fromkeys(_worker_rewriter.hits, 0)
+    transformed = _worker_rewriter.apply(content)
+
+    result = {"path": path, "changed": transformed != content, "hits": hits, "diff": None}
+    if result["changed"] and dry_run:
+        relative = os.path.relpath(path, REPO_ROOT)
+        result["diff"] = "".join(difflib.unified_diff(content.splitlines(True), transformed.splitlines(True),
+                                                      f"a/{relative}", f"b/{relative}"))
+    elif result["changed"]:
+        with open(path, "w") as f:
+            f.write(transformed)
+    result["sha256"] = hashlib.sha256((content if dry_run else transformed).encode()).hexdigest()
+    return result
+
+
+def _file_sha(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_cache(rules_sha, path=CACHE_PATH):
+    """Per-file {mtime_ns, size, sha256} for this rule table; empty if the rules changed"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        cache = json.load(f)
+    return cache["files"] if cache.get("rules_sha256") == rules_sha else {}
+
+
+def up_to_date(path, entry):
+    """Cheap stat check first, content hash only when the stat changed"""
+    if entry is None:
+        return False
+    stat = os.stat(path)
+    if (stat.st_mtime_ns, stat.st_size) == (entry["mtime_ns"], entry["size"]):
+        return True
+    if _file_sha(path) == entry["sha256"]:
+        entry["mtime_ns"], entry["size"] = stat.st_mtime_ns, stat.st_size
+        return True
+    return False
+
+
+def transform_tree(pattern=TREE_PATTERN, rules_path=RULES_PATH, dry_run=False, workers=None, use_cache=True):
+    """Apply the rules to every file matching pattern under the repo; returns the changed paths"""
+    started = time.monotonic()
+    rules = load_rules(rules_path)
+    with open(rules_path, "rb") as f:
+        rules_sha = hashlib.sha256(f.read()).hexdigest()
+    cache = load_cache(rules_sha) if use_cache else {}
+
+    paths = sorted(glob.glob(os.path.join(REPO_ROOT, pattern), recursive=True))
+    pending = [path for path in paths if not up_to_date(path, cache.get(os.path.relpath(path, REPO_ROOT)))]
+
+    hits = {rule["name"]: 0 for rule in rules}
+    changed = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules,)) as pool:
+        futures = [pool.submit(_transform_job, (path, dry_run)) for path in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            relative = os.path.relpath(result["path"], REPO_ROOT)
+            for name, count in result["hits"].items():
+                hits[name] += count
+            if result["changed"]:
+                changed.append(relative)
+                if dry_run:
+                    # Stream diffs as workers finish; the file is not written or cached
+                    sys.stdout.write(result["diff"])
+                    continue
+            stat = os.stat(result["path"])
+            cache[relative] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": result["sha256"]}
+
+    if use_cache:
+        with open(CACHE_PATH, "w") as f:
+            json.dump({"rules_sha256": rules_sha, "files": cache}, f, indent=1, sort_keys=True)
+
+    verb = "would change" if dry_run else "changed"
+    print(f"\n{len(paths)} files, {len(paths) - len(pending)} skipped (cached), {len(changed)} {verb} "
+          f"in {time.monotonic() - started:.2f}s", file=sys.stderr)
+    for name, count in hits.items():
+        print(f"   {name}: {count}", file=sys.stderr)
+    return sorted(changed)
 
 if __name__ == "__main__":
-    transform_file("/Users/laurenjohnston/Documents/vethub2.0/src/app/page.tsx")
+    parser = argparse.ArgumentParser(description="Compact the SOAP Builder modal classes")
+    parser.add_argument("file", nargs="?", default=DEFAULT_TARGET)
+    parser.add_argument("--rules", default=RULES_PATH, help="JSON rule table")
+    parser.add_argument("--all", action="store_true", help=f"rewrite every {TREE_PATTERN} file")
+    parser.add_argument("--dry-run", action="store_true", help="with --all, print unified diffs instead of writing")
+    parser.add_argument("--workers", type=int, help="worker processes for --all (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="with --all, ignore and don't update the cache")
+    args = parser.parse_args()
+    if args.all:
+        transform_tree(rules_path=args.rules, dry_run=args.dry_run, workers=args.workers,
+                       use_cache=not args.no_cache)
+    else:
+        transform_file(args.file, args.rules)